@@ -26,6 +26,7 @@ INSTALLED_APPS = [
     "rest_framework",
     "rest_framework_simplejwt",
     "corsheaders",
+    "core",
     "users",
     "jobs",
     "resumes",
@@ -76,11 +77,15 @@ DATABASES = {
 }
 
 # MongoDB Connection using MongoEngine
+# MONGO_QUERY_CAPTURE=<file.jsonl> records query shapes for manage.py advise_indexes (core.querylog)
 import mongoengine
+from core.querylog import recorder
+MONGO_QUERY_CAPTURE = os.environ.get("MONGO_QUERY_CAPTURE", "")
 mongoengine.connect(
     db=MONGODB_NAME,
     host=MONGODB_URI,
-    alias='default'
+    alias='default',
+    event_listeners=recorder(MONGO_QUERY_CAPTURE),
 )
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -114,7 +119,7 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        "core.renderers.ORJSONRenderer",
     ],
     "DEFAULT_PARSER_CLASSES": [
         "rest_framework.parsers.JSONParser",
@@ -148,6 +153,13 @@ CORS_ALLOW_CREDENTIALS = True
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 HUGGINGFACE_API_KEY = os.environ.get("HUGGINGFACE_API_KEY")
 
+# Versioned skill taxonomy (canonical ids + synonyms); defaults to core/data/skill_taxonomy.json
+SKILL_TAXONOMY_PATH = os.environ.get("SKILL_TAXONOMY_PATH")
+
+# Offline gazetteer for job geocoding (TSV: name, admin, country, lat, lng, population, aliases);
+# defaults to core/data/gazetteer.tsv
+GAZETTEER_PATH = os.environ.get("GAZETTEER_PATH")
+
 # Email Configuration
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 EMAIL_HOST = os.environ.get("EMAIL_HOST", "smtp.gmail.com")
@@ -160,6 +172,56 @@ EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD")
 FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.environ.get("MAX_UPLOAD_SIZE", 10485760))  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = FILE_UPLOAD_MAX_MEMORY_SIZE
 
+# Background resume processing (resumes.pipeline)
+RESUME_PROCESSING_WORKERS = int(os.environ.get("RESUME_PROCESSING_WORKERS", 2))
+
+# Large text fields (core.fields.CompressedTextField): "zlib" or "zstd" (needs the zstandard package)
+TEXT_COMPRESSION = os.environ.get("TEXT_COMPRESSION", "zlib")
+
+# Resume versions are stored as deltas (resumes.versions); chains deeper than this get rebased
+RESUME_VERSION_MAX_DEPTH = int(os.environ.get("RESUME_VERSION_MAX_DEPTH", 10))
+RESUME_TEXT_CACHE_TIMEOUT = int(os.environ.get("RESUME_TEXT_CACHE_TIMEOUT", 3600))  # reconstructed version text
+
+# PDF extraction budgets (per document; the memory cap is the RSS of each pool worker)
+PDF_EXTRACTION_MAX_PAGES = int(os.environ.get("PDF_EXTRACTION_MAX_PAGES", 50))
+PDF_EXTRACTION_TIMEOUT = float(os.environ.get("PDF_EXTRACTION_TIMEOUT", 20))
+PDF_EXTRACTION_MAX_MEMORY_MB = int(os.environ.get("PDF_EXTRACTION_MAX_MEMORY_MB", 512))
+PDF_EXTRACTION_WORKERS = int(os.environ.get("PDF_EXTRACTION_WORKERS", 2))
+
+# LLM response cache (core.llm): TTL per entry, bounded entry count/size
+LLM_CACHE_ALIAS = "llm"
+LLM_CACHE_TIMEOUT = int(os.environ.get("LLM_CACHE_TIMEOUT", 7 * 24 * 3600))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", 5000))
+LLM_CACHE_MAX_ENTRY_BYTES = int(os.environ.get("LLM_CACHE_MAX_ENTRY_BYTES", 256 * 1024))
+LLM_BACKEND = os.environ.get("LLM_BACKEND")  # dotted path; defaults to core.llm.OpenAIBackend
+LLM_POOL_SIZE = int(os.environ.get("LLM_POOL_SIZE", 10))  # keep-alive HTTP connections
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", 4))  # upstream calls in flight per process
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", 30))  # per-call deadline incl. queueing and retries
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", 2))
+RESUME_PARSE_CHUNK_CHARS = int(os.environ.get("RESUME_PARSE_CHUNK_CHARS", 6000))  # longer resumes are parsed per section
+
+# Materialized job JSON (jobs.cache): in-process LRU in front of a CACHES alias (empty alias = LRU only)
+JOB_JSON_CACHE_ALIAS = os.environ.get("JOB_JSON_CACHE_ALIAS", "default") or None
+JOB_JSON_CACHE_LRU_SIZE = int(os.environ.get("JOB_JSON_CACHE_LRU_SIZE", 2000))  # entries per process
+JOB_JSON_CACHE_TIMEOUT = int(os.environ.get("JOB_JSON_CACHE_TIMEOUT", 3600))
+JOB_SEARCH_FACET_CACHE_TIMEOUT = int(os.environ.get("JOB_SEARCH_FACET_CACHE_TIMEOUT", 300))  # unfiltered search facets
+JOB_AUTOCOMPLETE_REFRESH_INTERVAL = float(os.environ.get("JOB_AUTOCOMPLETE_REFRESH_INTERVAL", 30))  # seconds between incremental passes
+JOB_FEED_POLL_LAG = float(os.environ.get("JOB_FEED_POLL_LAG", 2))  # seconds the polling change feed stays behind the clock
+
+# Description cleaning (jobs.descriptions): paragraphs shared by this many distinct postings are
+# boilerplate (manage.py learn_boilerplate); processes reload the learned set every RELOAD seconds
+DESCRIPTION_BOILERPLATE_MIN_POSTINGS = int(os.environ.get("DESCRIPTION_BOILERPLATE_MIN_POSTINGS", 20))
+DESCRIPTION_BOILERPLATE_RELOAD = int(os.environ.get("DESCRIPTION_BOILERPLATE_RELOAD", 300))
+
+# Job archival (manage.py archive_jobs): inactive jobs move to jobs_archive after this many days;
+# archived jobs no application refers to are deleted after JOB_ARCHIVE_TTL_DAYS (0 = keep forever)
+JOB_ARCHIVE_AFTER_DAYS = int(os.environ.get("JOB_ARCHIVE_AFTER_DAYS", 30))
+JOB_ARCHIVE_TTL_DAYS = int(os.environ.get("JOB_ARCHIVE_TTL_DAYS", 0))
+
+# View/download counters (core.counters): buffered in process, flushed as $inc every interval or when full
+COUNTER_FLUSH_INTERVAL = float(os.environ.get("COUNTER_FLUSH_INTERVAL", 5))  # seconds
+COUNTER_FLUSH_MAX_PENDING = int(os.environ.get("COUNTER_FLUSH_MAX_PENDING", 1000))  # distinct counters
+
 # Cache Configuration (optional - disable if Redis not available)
 if os.environ.get("REDIS_URL"):
     CACHES = {
@@ -169,13 +231,32 @@ if os.environ.get("REDIS_URL"):
             "OPTIONS": {
                 "CLIENT_CLASS": "django_redis.client.DefaultClient",
             }
-        }
+        },
+        # Size-based eviction is left to Redis' maxmemory policy
+        "llm": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": os.environ.get("REDIS_URL", "redis://127.0.0.1:6379/1"),
+            "KEY_PREFIX": "llm",
+            "TIMEOUT": LLM_CACHE_TIMEOUT,
+            "OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            }
+        },
     }
 else:
     CACHES = {
         "default": {
             "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-        }
+        },
+        # File-based so cached responses survive restarts; culls beyond MAX_ENTRIES
+        "llm": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.path.join(BASE_DIR, ".cache", "llm"),
+            "TIMEOUT": LLM_CACHE_TIMEOUT,
+            "OPTIONS": {
+                "MAX_ENTRIES": LLM_CACHE_MAX_ENTRIES,
+            }
+        },
     }
 
 # Logging Configuration
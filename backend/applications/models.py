@@ -1,5 +1,7 @@
 from mongoengine import Document, EmbeddedDocument, fields
 from datetime import datetime
+from core.fields import CompressedTextField
+from core.serialization import CompiledSerializer
 import uuid
 
 
@@ -162,7 +164,7 @@ class Application(Document):
     
     # Application materials
     documents = fields.ListField(fields.EmbeddedDocumentField(ApplicationDocument))
-    cover_letter_text = fields.StringField()
+    cover_letter_text = CompressedTextField()
     
     # Interview process
     interviews = fields.ListField(fields.EmbeddedDocumentField(InterviewRound))
@@ -209,6 +211,8 @@ class Application(Document):
             'priority',
             ('user_id', 'status'),
             ('user_id', 'created_at'),
+            # Keyset pagination order of a user's application list (core.pagination)
+            ('user_id', '-updated_at', '-application_id'),
         ]
     }
     
@@ -244,76 +248,24 @@ class Application(Document):
         self.add_timeline_event('interview_scheduled', f"{interview.round_type} interview scheduled")
         self.save()
     
-    def to_dict(self):
-        """Convert to dictionary for API responses"""
-        return {
-            'application_id': self.application_id,
-            'user_id': self.user_id,
-            'job_id': self.job_id,
-            'status': self.status,
-            'applied_date': self.applied_date.isoformat() if self.applied_date else None,
-            'application_method': self.application_method,
-            'recruiter_name': self.recruiter_name,
-            'recruiter_email': self.recruiter_email,
-            'recruiter_phone': self.recruiter_phone,
-            'hiring_manager_name': self.hiring_manager_name,
-            'hiring_manager_email': self.hiring_manager_email,
-            'documents': [
-                {
-                    'document_type': doc.document_type,
-                    'file_name': doc.file_name,
-                    'file_path': doc.file_path,
-                    'file_size': doc.file_size,
-                    'uploaded_at': doc.uploaded_at.isoformat() if doc.uploaded_at else None,
-                    'is_primary': doc.is_primary,
-                } for doc in self.documents
-            ],
-            'cover_letter_text': self.cover_letter_text,
-            'interviews': [
-                {
-                    'round_type': interview.round_type,
-                    'scheduled_date': interview.scheduled_date.isoformat() if interview.scheduled_date else None,
-                    'duration_minutes': interview.duration_minutes,
-                    'interviewer_name': interview.interviewer_name,
-                    'interviewer_title': interview.interviewer_title,
-                    'location': interview.location,
-                    'meeting_link': interview.meeting_link,
-                    'completed': interview.completed,
-                    'feedback': interview.feedback,
-                    'rating': interview.rating,
-                    'next_steps': interview.next_steps,
-                } for interview in self.interviews
-            ],
-            'offer': {
-                'base_salary': self.offer.base_salary,
-                'currency': self.offer.currency,
-                'bonus': self.offer.bonus,
-                'equity_percentage': self.offer.equity_percentage,
-                'start_date': self.offer.start_date.isoformat() if self.offer.start_date else None,
-                'benefits_summary': self.offer.benefits_summary,
-                'vacation_days': self.offer.vacation_days,
-                'remote_work_allowed': self.offer.remote_work_allowed,
-                'offer_date': self.offer.offer_date.isoformat() if self.offer.offer_date else None,
-                'response_deadline': self.offer.response_deadline.isoformat() if self.offer.response_deadline else None,
-                'accepted': self.offer.accepted,
-            } if self.offer else None,
-            'notes': self.notes,
-            'priority': self.priority,
-            'timeline': [
-                {
-                    'event_type': event.event_type,
-                    'description': event.description,
-                    'timestamp': event.timestamp.isoformat() if event.timestamp else None,
-                    'created_by_system': event.created_by_system,
-                } for event in self.timeline
-            ],
-            'next_follow_up': self.next_follow_up.isoformat() if self.next_follow_up else None,
-            'reminder_date': self.reminder_date.isoformat() if self.reminder_date else None,
-            'ai_match_score': self.ai_match_score,
-            'ai_recommendations': self.ai_recommendations,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-        }
+    # API representation (compiled from this schema on first use)
+    to_dict = CompiledSerializer([
+        'application_id', 'user_id', 'job_id', 'status', 'applied_date', 'application_method',
+        'recruiter_name', 'recruiter_email', 'recruiter_phone', 'hiring_manager_name', 'hiring_manager_email',
+        ('documents', ['document_type', 'file_name', 'file_path', 'file_size', 'uploaded_at', 'is_primary']),
+        'cover_letter_text',
+        ('interviews', [
+            'round_type', 'scheduled_date', 'duration_minutes', 'interviewer_name', 'interviewer_title',
+            'location', 'meeting_link', 'completed', 'feedback', 'rating', 'next_steps',
+        ]),
+        ('offer', [
+            'base_salary', 'currency', 'bonus', 'equity_percentage', 'start_date', 'benefits_summary',
+            'vacation_days', 'remote_work_allowed', 'offer_date', 'response_deadline', 'accepted',
+        ]),
+        'notes', 'priority',
+        ('timeline', ['event_type', 'description', 'timestamp', 'created_by_system']),
+        'next_follow_up', 'reminder_date', 'ai_match_score', 'ai_recommendations', 'created_at', 'updated_at',
+    ])
     
     def __str__(self):
         return f"Application {self.application_id} - Status: {self.status}"
\ No newline at end of file
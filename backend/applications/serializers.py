@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from core.projections import Projection
 from .models import Application
 
 class ApplicationSerializer(serializers.ModelSerializer):
@@ -6,3 +7,18 @@ class ApplicationSerializer(serializers.ModelSerializer):
         model = Application
         fields = "__all__"
         read_only_fields = ["user","updated_at"]
+
+
+# Shape of each row in the application list (detail views use Application.to_dict)
+APPLICATION_LIST_PROJECTION = Projection(Application, [
+    'application_id',
+    'job_id',
+    'status',
+    'priority',
+    'applied_date',
+    'application_method',
+    'next_follow_up',
+    'ai_match_score',
+    'created_at',
+    'updated_at',
+])
@@ -1,13 +1,31 @@
 from rest_framework import generics, permissions
+from rest_framework.response import Response
 from .models import Application
-from .serializers import ApplicationSerializer
+from .serializers import ApplicationSerializer, APPLICATION_LIST_PROJECTION
+from core.pagination import KeysetPagination
+
+class ApplicationCursorPagination(KeysetPagination):
+    ordering = (('updated_at', -1), ('application_id', -1))
 
 class ApplicationListCreateView(generics.ListCreateAPIView):
     serializer_class = ApplicationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ApplicationCursorPagination
+
+    def get_filters(self):
+        user_id = self.request.user.get('user_id') if hasattr(self.request.user, 'get') else None
+        return {'user_id': user_id}
 
     def get_queryset(self):
-        return Application.objects.filter(user=self.request.user).select_related("job").order_by("-updated_at")
+        return Application.objects(**self.get_filters()).order_by("-updated_at", "-application_id")
+
+    def list(self, request, *args, **kwargs):
+        # Rows are built from projected raw dicts; no Application documents are constructed
+        queryset = APPLICATION_LIST_PROJECTION.fetch(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(APPLICATION_LIST_PROJECTION.rows(page))
+        return Response(APPLICATION_LIST_PROJECTION.rows(queryset))
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -0,0 +1,2 @@
+from django.apps import AppConfig
+class CoreConfig(AppConfig): name='core'
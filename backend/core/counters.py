@@ -0,0 +1,136 @@
+"""
+Buffered atomic counters.
+
+View and download counts are bumped on hot read paths, where loading and
+saving the whole document would both lose concurrent increments and
+rewrite large documents (and bump ``updated_at``, invalidating cached
+JSON). Increments are instead summed in process and flushed periodically as
+unordered ``$inc`` bulk writes, one per (document, field) touched since the
+last flush; ``updated_at`` is left alone.
+
+A failed flush puts back only the increments that were not applied: the
+ops a bulk write reports as write errors, or all of them when the write was
+not acknowledged at all. They are retried at the next flush, and the buffer
+is flushed when the interpreter exits. A process killed outright loses at
+most one interval of counts.
+"""
+import atexit
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, Tuple
+
+from django.conf import settings
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+
+class CounterBuffer:
+    """In-process ``$inc`` accumulator flushed by a background thread"""
+
+    def __init__(self, interval: float, max_pending: int):
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending: Dict[type, Dict[Tuple[object, str], int]] = defaultdict(lambda: defaultdict(int))
+        self._size = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def incr(self, document, pk, field: str, amount: int = 1):
+        """Add ``amount`` to ``document`` ``pk``'s ``field`` at the next flush"""
+        with self._lock:
+            counts = self._pending[document]
+            if (pk, field) not in counts:
+                self._size += 1
+            counts[(pk, field)] += amount
+            full = self._size >= self.max_pending
+        self._ensure_thread()
+        if full:
+            self._wake.set()
+
+    def pending(self) -> int:
+        """Distinct (document, field) counters awaiting a flush"""
+        with self._lock:
+            return self._size
+
+    def _take(self):
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(lambda: defaultdict(int))
+            self._size = 0
+        return pending
+
+    def _restore(self, document, counts):
+        with self._lock:
+            for key, amount in counts.items():
+                if key not in self._pending[document]:
+                    self._size += 1
+                self._pending[document][key] += amount
+
+    def flush(self) -> int:
+        """Write all buffered increments; returns the number of documents updated"""
+        with self._flush_lock:
+            written = 0
+            for document, counts in self._take().items():
+                by_pk: Dict[object, Dict[str, int]] = defaultdict(dict)
+                for (pk, field), amount in counts.items():
+                    if amount:
+                        by_pk[pk][document._fields[field].db_field] = amount
+                if not by_pk:
+                    continue
+                pks = list(by_pk)
+                ops = [UpdateOne({'_id': pk}, {'$inc': by_pk[pk]}) for pk in pks]
+                try:
+                    document._get_collection().bulk_write(ops, ordered=False)
+                except BulkWriteError as e:
+                    # Unordered: every op not listed as a write error was applied and must not be retried
+                    failed = {pks[error['index']] for error in e.details.get('writeErrors', [])}
+                    logger.warning("Counter flush for %s: %d of %d updates failed; retrying them next interval",
+                                   document.__name__, len(failed), len(ops), exc_info=True)
+                    self._restore(document, {key: amount for key, amount in counts.items() if key[0] in failed})
+                    written += len(ops) - len(failed)
+                    continue
+                except PyMongoError:
+                    logger.warning("Counter flush for %s failed; retrying next interval",
+                                   document.__name__, exc_info=True)
+                    self._restore(document, counts)
+                    continue
+                written += len(ops)
+            return written
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='counter-flush', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Counter flush failed")
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def counters() -> CounterBuffer:
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = CounterBuffer(
+                interval=getattr(settings, 'COUNTER_FLUSH_INTERVAL', 5.0),
+                max_pending=getattr(settings, 'COUNTER_FLUSH_MAX_PENDING', 1000),
+            )
+            atexit.register(_buffer.flush)
+        return _buffer
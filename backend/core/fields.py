@@ -0,0 +1,93 @@
+"""
+MongoEngine field types shared by the apps.
+
+``CompressedTextField`` stores large text as compressed BSON binary. Loading
+a document keeps the stored bytes as they are; they are decompressed on the
+first attribute access and the result is kept on the instance, so queries
+and list endpoints that never read the field pay no decode cost. Values
+shorter than ``min_size`` bytes stay plain strings (compression would not
+pay for itself), and plain strings written before the field was compressed
+are still read as-is until ``manage.py compress_text_fields`` rewrites them.
+"""
+import zlib
+
+from bson import Binary
+from django.conf import settings
+from mongoengine import fields
+
+try:
+    import zstandard
+except ImportError:  # optional; zlib is always available
+    zstandard = None
+
+ZLIB = b'\x01'
+ZSTD = b'\x02'
+
+
+class CompressedText(bytes):
+    """Stored (still compressed) value of a ``CompressedTextField``"""
+
+
+def _codec() -> bytes:
+    name = getattr(settings, 'TEXT_COMPRESSION', 'zlib')
+    return ZSTD if name == 'zstd' and zstandard is not None else ZLIB
+
+
+def compress_text(text: str, level: int = 6) -> bytes:
+    data = text.encode('utf-8')
+    codec = _codec()
+    if codec == ZSTD:
+        return codec + zstandard.ZstdCompressor(level=level).compress(data)
+    return codec + zlib.compress(data, level)
+
+
+def decompress_text(value: bytes) -> str:
+    value = bytes(value)
+    codec, payload = value[:1], value[1:]
+    if codec == ZLIB:
+        return zlib.decompress(payload).decode('utf-8')
+    if codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed text")
+        return zstandard.ZstdDecompressor().decompress(payload).decode('utf-8')
+    raise ValueError("Unknown compressed text codec")
+
+
+class CompressedTextField(fields.BaseField):
+    """Text stored compressed and decompressed lazily on first access"""
+
+    def __init__(self, min_size=256, **kwargs):
+        self.min_size = min_size
+        super().__init__(**kwargs)
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = instance._data.get(self.name)
+        if isinstance(value, CompressedText):
+            # Decode once and cache on the instance without marking the field as changed
+            value = instance._data[self.name] = decompress_text(value)
+        return value
+
+    def to_python(self, value):
+        if isinstance(value, (bytes, Binary)) and not isinstance(value, CompressedText):
+            return CompressedText(value)
+        return value
+
+    def to_mongo(self, value):
+        if isinstance(value, CompressedText):
+            return Binary(bytes(value))
+        if isinstance(value, str) and len(value) >= self.min_size:
+            return Binary(compress_text(value))
+        return value
+
+    def prepare_query_value(self, op, value):
+        # Updates such as set__raw_text=... must be written in stored form too
+        if value is None:
+            return value
+        self.validate(value)
+        return self.to_mongo(value)
+
+    def validate(self, value):
+        if not isinstance(value, (str, CompressedText)):
+            self.error("CompressedTextField only accepts string values")
@@ -0,0 +1,205 @@
+"""
+Offline geocoding against a bundled gazetteer.
+
+Job locations are free text ("Austin, TX", "San Francisco Bay Area",
+"Remote - New York"). ``Gazetteer.geocode`` resolves them to a place without
+any network call, and ``Job.geocode()`` stores that place as a GeoJSON point
+under a ``2dsphere`` index for radius queries.
+
+Every surface form of a place is indexed. That covers the name and its
+aliases on their own and followed by the state or province (code or name)
+or the country (code or name). Forms are normalized to lower-case ASCII
+words. They live in one sorted array that serves two lookups through
+``bisect``: exact lookups for geocoding and prefix scans for typeahead.
+When a form names several places ("portland"), the most populous one wins.
+"""
+import math
+import os
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import namedtuple
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+DEFAULT_GAZETTEER = os.path.join(os.path.dirname(__file__), 'data', 'gazetteer.tsv')
+
+EARTH_RADIUS_KM = 6378.1
+
+Place = namedtuple('Place', ['name', 'admin', 'country', 'lat', 'lng', 'population'])
+
+US_STATES = {
+    'AL': 'Alabama', 'AK': 'Alaska', 'AZ': 'Arizona', 'AR': 'Arkansas', 'CA': 'California',
+    'CO': 'Colorado', 'CT': 'Connecticut', 'DE': 'Delaware', 'DC': 'District of Columbia',
+    'FL': 'Florida', 'GA': 'Georgia', 'HI': 'Hawaii', 'ID': 'Idaho', 'IL': 'Illinois', 'IN': 'Indiana',
+    'IA': 'Iowa', 'KS': 'Kansas', 'KY': 'Kentucky', 'LA': 'Louisiana', 'ME': 'Maine', 'MD': 'Maryland',
+    'MA': 'Massachusetts', 'MI': 'Michigan', 'MN': 'Minnesota', 'MS': 'Mississippi', 'MO': 'Missouri',
+    'MT': 'Montana', 'NE': 'Nebraska', 'NV': 'Nevada', 'NH': 'New Hampshire', 'NJ': 'New Jersey',
+    'NM': 'New Mexico', 'NY': 'New York', 'NC': 'North Carolina', 'ND': 'North Dakota', 'OH': 'Ohio',
+    'OK': 'Oklahoma', 'OR': 'Oregon', 'PA': 'Pennsylvania', 'RI': 'Rhode Island', 'SC': 'South Carolina',
+    'SD': 'South Dakota', 'TN': 'Tennessee', 'TX': 'Texas', 'UT': 'Utah', 'VT': 'Vermont',
+    'VA': 'Virginia', 'WA': 'Washington', 'WV': 'West Virginia', 'WI': 'Wisconsin', 'WY': 'Wyoming',
+}
+
+CA_PROVINCES = {
+    'AB': 'Alberta', 'BC': 'British Columbia', 'MB': 'Manitoba', 'NS': 'Nova Scotia', 'ON': 'Ontario',
+    'QC': 'Quebec',
+}
+
+COUNTRY_NAMES = {
+    'US': ('United States', 'USA', 'United States of America', 'America'),
+    'CA': ('Canada',), 'MX': ('Mexico',), 'BR': ('Brazil',), 'AR': ('Argentina',), 'CL': ('Chile',),
+    'CO': ('Colombia',), 'PE': ('Peru',), 'GB': ('United Kingdom', 'UK', 'England', 'Scotland', 'Great Britain'),
+    'IE': ('Ireland',), 'FR': ('France',), 'DE': ('Germany',), 'NL': ('Netherlands', 'Holland'),
+    'BE': ('Belgium',), 'LU': ('Luxembourg',), 'CH': ('Switzerland',), 'AT': ('Austria',), 'ES': ('Spain',),
+    'PT': ('Portugal',), 'IT': ('Italy',), 'DK': ('Denmark',), 'SE': ('Sweden',), 'NO': ('Norway',),
+    'FI': ('Finland',), 'PL': ('Poland',), 'CZ': ('Czech Republic', 'Czechia'), 'HU': ('Hungary',),
+    'RO': ('Romania',), 'GR': ('Greece',), 'TR': ('Turkey',), 'IL': ('Israel',),
+    'AE': ('United Arab Emirates', 'UAE'), 'EG': ('Egypt',), 'NG': ('Nigeria',), 'KE': ('Kenya',),
+    'ZA': ('South Africa',), 'IN': ('India',), 'SG': ('Singapore',), 'HK': ('Hong Kong',), 'CN': ('China',),
+    'TW': ('Taiwan',), 'KR': ('South Korea', 'Korea'), 'JP': ('Japan',), 'PH': ('Philippines',),
+    'TH': ('Thailand',), 'MY': ('Malaysia',), 'ID': ('Indonesia',), 'VN': ('Vietnam',),
+    'AU': ('Australia',), 'NZ': ('New Zealand',),
+}
+
+# Words around a place name that do not change where it is
+_NOISE_RE = re.compile(
+    r"\b(remote|hybrid|onsite|on site|in office|greater|metro(politan)?|area|region|hq|headquarters|"
+    r"office|downtown|city of)\b"
+)
+_NON_WORD_RE = re.compile(r"[^a-z0-9\s,/]+")
+_SPLIT_RE = re.compile(r"\s*[,/(;]\s*|\s+-\s+|\s+or\s+")
+
+
+def normalize_place(text: Optional[str]) -> str:
+    """Lower-case ASCII words: accents and punctuation dropped, whitespace collapsed"""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii').lower()
+    return ' '.join(_NON_WORD_RE.sub(' ', text).replace(',', ' ').replace('/', ' ').split())
+
+
+def _strip_numbers(form: str) -> str:
+    """Drop postal codes and other all-digit words ("ca 94105" -> "ca")"""
+    return ' '.join(word for word in form.split() if not word.isdigit())
+
+
+def radius_to_radians(km: float) -> float:
+    """Distance on the Earth's surface as the angle ``$centerSphere`` expects"""
+    return km / EARTH_RADIUS_KM
+
+
+def distance_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle (haversine) distance"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi, d_lambda = phi2 - phi1, math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class Gazetteer:
+    """Places with a sorted surface-form index for exact and prefix lookups"""
+
+    def __init__(self, rows: Iterable[Tuple[Place, Tuple[str, ...]]]):
+        self.places: List[Place] = []
+        entries = set()
+        for place, aliases in rows:
+            index = len(self.places)
+            self.places.append(place)
+            qualifiers = [place.admin, US_STATES.get(place.admin) if place.country == 'US' else None,
+                          CA_PROVINCES.get(place.admin) if place.country == 'CA' else None,
+                          place.country, *COUNTRY_NAMES.get(place.country, ())]
+            for form in (place.name,) + aliases:
+                form = normalize_place(form)
+                if not form:
+                    continue
+                entries.add((form, -place.population, index))
+                for qualifier in qualifiers:
+                    if qualifier:
+                        entries.add((f"{form} {normalize_place(qualifier)}", -place.population, index))
+        # Sorted by form, then most populous first
+        ordered = sorted(entries)
+        self._forms = [form for form, _, _ in ordered]
+        self._ids = [index for _, _, index in ordered]
+
+    @classmethod
+    def from_file(cls, path: str) -> 'Gazetteer':
+        rows = []
+        with open(path, encoding='utf-8') as fh:
+            for line in fh:
+                if not line.strip() or line.startswith('#'):
+                    continue
+                name, admin, country, lat, lng, population, aliases = (line.rstrip('\n').split('\t') + [''])[:7]
+                rows.append((
+                    Place(name, admin or None, country, float(lat), float(lng), int(population or 0)),
+                    tuple(alias for alias in aliases.split('|') if alias),
+                ))
+        return cls(rows)
+
+    def __len__(self):
+        return len(self.places)
+
+    def lookup(self, text: Optional[str]) -> Optional[Place]:
+        """The place a normalized form names exactly (most populous on ties)"""
+        form = normalize_place(text)
+        i = bisect_left(self._forms, form)
+        if form and i < len(self._forms) and self._forms[i] == form:
+            return self.places[self._ids[i]]
+        return None
+
+    def complete(self, prefix: Optional[str], limit: int = 10, scan: int = 500) -> List[Place]:
+        """Distinct places with a form starting with ``prefix``, most populous first"""
+        prefix = normalize_place(prefix)
+        if not prefix:
+            return []
+        seen = {}
+        i = bisect_left(self._forms, prefix)
+        end = min(len(self._forms), i + scan)
+        while i < end and self._forms[i].startswith(prefix):
+            seen.setdefault(self._ids[i], None)
+            i += 1
+        places = sorted((self.places[index] for index in seen), key=lambda place: -place.population)
+        return places[:limit]
+
+    def geocode(self, location: Optional[str] = None, city: Optional[str] = None,
+                state: Optional[str] = None, country: Optional[str] = None) -> Optional[Place]:
+        """Best place for structured fields or a free-text location, ``None`` if unknown.
+
+        A state or country that is given must match: "Paris, TX" is unknown
+        rather than Paris, France. The bare name is only used without one.
+        """
+        if city:
+            qualifiers = [qualifier for qualifier in (state, country) if qualifier]
+            for qualifier in qualifiers:
+                place = self.lookup(f"{city} {qualifier}")
+                if place:
+                    return place
+            return None if qualifiers else self.lookup(city)
+        if not location:
+            return None
+        place = self.lookup(location)
+        if place:
+            return place
+        text = _NOISE_RE.sub(' ', unicodedata.normalize('NFKD', location).encode('ascii', 'ignore')
+                             .decode('ascii').lower())
+        parts = [part for part in (_strip_numbers(normalize_place(p)) for p in _SPLIT_RE.split(text)) if part]
+        # "City, ST, Country" -> try the most specific combination first
+        for i, part in enumerate(parts):
+            qualifiers = parts[i + 1:i + 3]
+            for qualifier in qualifiers:
+                place = self.lookup(f"{part} {qualifier}")
+                if place:
+                    return place
+            # Parts that are places themselves are alternatives ("London / Paris"), not qualifiers
+            if any(not self.lookup(qualifier) for qualifier in qualifiers):
+                return None
+            place = self.lookup(part)
+            if place:
+                return place
+        return None
+
+
+@lru_cache(maxsize=1)
+def get_gazetteer() -> Gazetteer:
+    """Process-wide gazetteer loaded from ``settings.GAZETTEER_PATH``"""
+    from django.conf import settings
+    path = getattr(settings, 'GAZETTEER_PATH', None) or DEFAULT_GAZETTEER
+    return Gazetteer.from_file(path)
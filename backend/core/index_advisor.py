@@ -0,0 +1,200 @@
+"""
+Index advice from captured query shapes (see core.querylog).
+
+Each shape's redacted sample is explained (``queryPlanner`` only; nothing
+is executed) with the command of every operation it was captured from
+(``explain_command``), and each winning plan is classified: collection scan, in-memory
+sort, or the index it used. From that:
+
+* suggestions follow the equality, sort, range rule: equality predicates
+  first, then the sort keys, then range predicates, for shapes that scan
+  the collection or sort in memory;
+* unused indexes are declared indexes no captured shape's plan chose;
+* redundant indexes are key prefixes of another index with compatible
+  options (``user_id`` next to ``(user_id, status)``).
+
+Unique, TTL and ``_id`` indexes enforce behaviour rather than serve
+queries and are never reported as unused or redundant.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+RANGE_OPERATORS = {'$gt', '$gte', '$lt', '$lte', '$ne', '$nin', '$regex', '$exists', '$not', '$elemMatch', '$type'}
+EQUALITY_OPERATORS = {'$eq', '$in', '$all'}
+
+Keys = Tuple[Tuple[str, Any], ...]
+
+
+@dataclass
+class PlanSummary:
+    collscan: bool = False
+    in_memory_sort: bool = False
+    indexes: List[str] = field(default_factory=list)
+    stages: List[str] = field(default_factory=list)
+
+
+def _stages(plan: dict) -> Iterator[dict]:
+    yield plan
+    for name in ('inputStage', 'innerStage', 'outerStage', 'thenStage', 'elseStage'):
+        if isinstance(plan.get(name), dict):
+            yield from _stages(plan[name])
+    for child in plan.get('inputStages', []):
+        yield from _stages(child)
+
+
+def summarize_plan(explain: dict) -> PlanSummary:
+    planner = explain.get('queryPlanner') or {}
+    if not planner:
+        # Aggregations nest the planner under their first stage
+        for stage in explain.get('stages', []):
+            planner = stage.get('$cursor', {}).get('queryPlanner') or {}
+            if planner:
+                break
+    winning = planner.get('winningPlan') or {}
+    winning = winning.get('queryPlan', winning)  # slot-based engine
+    summary = PlanSummary()
+    for stage in _stages(winning):
+        name = stage.get('stage', '')
+        summary.stages.append(name)
+        if name == 'COLLSCAN':
+            summary.collscan = True
+        elif name == 'SORT':
+            summary.in_memory_sort = True
+        if stage.get('indexName') and stage['indexName'] not in summary.indexes:
+            summary.indexes.append(stage['indexName'])
+    return summary
+
+
+def explain_command(op: str, collection: str, query: dict, sort: List[List[Any]],
+                    distinct_key: Optional[str] = None) -> dict:
+    """The command to explain a captured predicate with, shaped like the operation it was captured from.
+
+    Counts, distincts and aggregations are planned differently from a ``find``
+    (``COUNT_SCAN``, ``DISTINCT_SCAN``, pipeline pushdown), so each is explained
+    as itself. Writes are only explained, never executed.
+    """
+    sort_doc = {name: direction for name, direction in sort} if sort else None
+    if op == 'aggregate':
+        pipeline = [{'$match': query}] + ([{'$sort': sort_doc}] if sort_doc else [])
+        return {'aggregate': collection, 'pipeline': pipeline, 'cursor': {}}
+    if op == 'count':
+        return {'count': collection, 'query': query}
+    if op == 'distinct':
+        return {'distinct': collection, 'key': distinct_key or '_id', 'query': query}
+    if op == 'findAndModify':
+        command = {'findAndModify': collection, 'query': query, 'remove': True}
+        if sort_doc:
+            command['sort'] = sort_doc
+        return command
+    if op == 'update':
+        return {'update': collection, 'updates': [{'q': query, 'u': {'$set': {'_explain': 1}}, 'multi': True}]}
+    if op == 'delete':
+        return {'delete': collection, 'deletes': [{'q': query, 'limit': 0}]}
+    command = {'find': collection, 'filter': query}
+    if sort_doc:
+        command['sort'] = sort_doc
+    return command
+
+
+def classify(shape: dict) -> Tuple[List[str], List[str], bool]:
+    """``(equality fields, range fields, uses $text)`` of a filter shape"""
+    equality: List[str] = []
+    ranges: List[str] = []
+    text = False
+    for key, value in shape.items():
+        if key == '$and':
+            for clause in value if isinstance(value, list) else []:
+                eq, rng, txt = classify(clause)
+                equality += [f for f in eq if f not in equality]
+                ranges += [f for f in rng if f not in ranges]
+                text = text or txt
+        elif key == '$text':
+            text = True
+        elif key.startswith('$'):
+            continue  # $or / $nor / $expr need per-branch indexes; not advised here
+        elif isinstance(value, dict) and any(op.startswith('$') for op in value):
+            operators = set(value)
+            if operators & RANGE_OPERATORS:
+                ranges.append(key)
+            elif operators & EQUALITY_OPERATORS:
+                equality.append(key)
+        else:
+            equality.append(key)
+    ranges = [f for f in ranges if f not in equality]
+    return equality, ranges, text
+
+
+def suggest(shape: dict, sort: List[List[Any]]) -> Optional[Keys]:
+    """Index keys for a shape by the equality, sort, range rule (None when no index can help)"""
+    equality, ranges, text = classify(shape)
+    if text:
+        return None
+    keys: "OrderedDict[str, Any]" = OrderedDict((name, 1) for name in equality)
+    for name, direction in sort:
+        if name not in keys:
+            keys[name] = direction
+    for name in ranges:
+        if name not in keys:
+            keys[name] = 1
+    if not keys or list(keys) == ['_id']:
+        return None
+    return tuple(keys.items())
+
+
+def index_keys(info: dict) -> Keys:
+    return tuple((name, direction) for name, direction in info['key'])
+
+
+def is_prefix(short: Keys, long: Keys) -> bool:
+    return len(short) < len(long) and long[:len(short)] == short
+
+
+def is_constraint(name: str, info: dict) -> bool:
+    return name == '_id_' or info.get('unique') or 'expireAfterSeconds' in info
+
+
+def redundant_indexes(indexes: Dict[str, dict]) -> List[Tuple[str, str]]:
+    """``(redundant, covering)`` pairs: the first is a key prefix of the second"""
+    found = []
+    for name, info in indexes.items():
+        if is_constraint(name, info) or info.get('sparse'):
+            continue
+        keys = index_keys(info)
+        if any(direction in ('text', '2dsphere', 'hashed') for _, direction in keys):
+            continue
+        for other, other_info in indexes.items():
+            if other == name or other_info.get('sparse'):
+                continue
+            # A partial index only covers the queries matching its filter
+            if other_info.get('partialFilterExpression') != info.get('partialFilterExpression'):
+                continue
+            if is_prefix(keys, index_keys(other_info)):
+                found.append((name, other))
+                break
+    return found
+
+
+def covered_by_existing(keys: Keys, indexes: Dict[str, dict]) -> Optional[str]:
+    for name, info in indexes.items():
+        existing = index_keys(info)
+        if existing == keys or is_prefix(keys, existing):
+            return name
+    return None
+
+
+def merge_suggestions(suggestions: Dict[Keys, int]) -> Dict[Keys, int]:
+    """Drop suggestions that are a prefix of a longer one on the same collection"""
+    merged = {}
+    for keys, count in suggestions.items():
+        longer = [other for other in suggestions if is_prefix(keys, other)]
+        if longer:
+            target = max(longer, key=len)
+            merged[target] = merged.get(target, 0) + count
+        else:
+            merged[keys] = merged.get(keys, 0) + count
+    return merged
+
+
+def format_keys(keys: Keys) -> str:
+    return '(' + ', '.join(f"{name}: {direction}" for name, direction in keys) + ')'
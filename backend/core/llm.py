@@ -0,0 +1,341 @@
+"""
+Structured-output LLM calls with a persistent response cache.
+
+Views build their prompt and JSON schema and call ``complete_json``. The
+response is cached under a hash of (model, messages, schema, temperature)
+in the ``llm`` Django cache alias, so an identical request is only sent
+upstream once per TTL. Cache misses go through a process-wide ``LLMClient``
+that bounds upstream concurrency, enforces per-call deadlines, retries
+transient failures with jittered backoff and coalesces identical in-flight
+requests. The upstream itself is a pluggable backend: ``OpenAIBackend``
+(one pooled HTTP client per process) in production and ``StubBackend`` for
+local runs and tests.
+"""
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+Messages = List[Dict[str, str]]
+
+
+class LLMError(Exception):
+    """Upstream call failed or returned something that is not the requested JSON"""
+
+
+class LLMNotConfigured(LLMError):
+    """No backend available (SDK missing or no API key)"""
+
+
+class LLMRetryableError(LLMError):
+    """Transient upstream failure (timeout, connection error, rate limit, 5xx)"""
+
+
+class LLMTimeout(LLMError):
+    """The call's deadline passed while queued, in flight or backing off"""
+
+
+class OpenAIBackend:
+    """Chat Completions with JSON-schema response format (OpenAI Python SDK v1+).
+
+    One instance lives per process and owns a keep-alive connection pool;
+    retries are handled by ``LLMClient``, so the SDK's own are disabled.
+    """
+
+    def __init__(self, api_key: Optional[str] = None):
+        try:
+            import httpx
+            import openai
+        except Exception as e:
+            raise LLMNotConfigured("OpenAI client not available on server") from e
+        api_key = api_key or os.getenv('OPENAI_API_KEY') or os.getenv('OPENAI_APIKEY')
+        if not api_key:
+            raise LLMNotConfigured("OPENAI_API_KEY not configured")
+        pool_size = getattr(settings, 'LLM_POOL_SIZE', 10)
+        self._openai = openai
+        self.client = openai.OpenAI(
+            api_key=api_key,
+            max_retries=0,
+            http_client=httpx.Client(
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            ),
+        )
+
+    def complete(self, *, model: str, messages: Messages, schema_name: str,
+                 schema: Dict[str, Any], temperature: float, timeout: float) -> str:
+        openai = self._openai
+        try:
+            completion = self.client.with_options(timeout=timeout).chat.completions.create(
+                model=model,
+                messages=messages,
+                response_format={
+                    "type": "json_schema",
+                    "json_schema": {"name": schema_name, "schema": schema},
+                },
+                temperature=temperature,
+            )
+        except (openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError,
+                openai.InternalServerError) as e:
+            raise LLMRetryableError(str(e)) from e
+        except openai.OpenAIError as e:
+            raise LLMError(str(e)) from e
+        return completion.choices[0].message.content or ""
+
+
+class StubBackend:
+    """Local stand-in for the OpenAI SDK.
+
+    ``responder`` is either a fixed JSON-serializable value or a callable
+    receiving the call kwargs and returning one (or raising, to simulate
+    upstream failures). ``delay`` simulates upstream latency and honours the
+    per-call ``timeout`` like the real SDK. Every call is
+    recorded in ``calls`` so tests can assert how often the upstream was hit.
+    """
+
+    def __init__(self, responder: Union[Any, Callable[..., Any]] = None, delay: float = 0.0):
+        self.responder = responder
+        self.delay = delay
+        self.calls: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def complete(self, **kwargs) -> str:
+        with self._lock:
+            self.calls.append(kwargs)
+        if self.delay:
+            timeout = kwargs.get('timeout')
+            if timeout is not None and self.delay > timeout:
+                # Behave like the SDK's read timeout
+                time.sleep(timeout)
+                raise LLMRetryableError("Stub upstream timed out")
+            time.sleep(self.delay)
+        value = self.responder(**kwargs) if callable(self.responder) else self.responder
+        if value is None:
+            value = [] if kwargs['schema'].get('type') == 'array' else {}
+        return value if isinstance(value, str) else json.dumps(value)
+
+
+class LLMMetrics:
+    """Thread-safe counters plus count/total/max for queue wait and upstream latency"""
+
+    COUNTERS = ('requests', 'cache_hits', 'coalesced', 'upstream_calls', 'retries', 'errors', 'timeouts')
+    TIMINGS = ('queue_wait', 'upstream_latency')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counters = {name: 0 for name in self.COUNTERS}
+            self._timings = {name: [0, 0.0, 0.0] for name in self.TIMINGS}
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            timing = self._timings[name]
+            timing[0] += 1
+            timing[1] += seconds
+            timing[2] = max(timing[2], seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            data: Dict[str, Any] = dict(self._counters)
+            for name, (count, total, peak) in self._timings.items():
+                data[name] = {
+                    'count': count,
+                    'avg_ms': round(total / count * 1000, 2) if count else 0.0,
+                    'max_ms': round(peak * 1000, 2),
+                }
+            return data
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[str] = None
+        self.error: Optional[BaseException] = None
+
+
+class LLMClient:
+    """Bounded, deadline-aware front end for a backend.
+
+    * at most ``max_concurrency`` upstream calls run at once; callers queue on a semaphore
+    * every call has a deadline covering queueing, all attempts and backoff sleeps
+    * ``LLMRetryableError`` is retried with full-jitter exponential backoff
+    * concurrent calls with the same key share a single upstream request
+    """
+
+    def __init__(self, backend, max_concurrency: int = 4, timeout: float = 30.0,
+                 max_retries: int = 2, backoff_base: float = 0.5, backoff_cap: float = 8.0):
+        self.backend = backend
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.metrics = LLMMetrics()
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._inflight: Dict[str, _Flight] = {}
+        self._inflight_lock = threading.Lock()
+
+    def complete(self, key: str, timeout: Optional[float] = None, **kwargs) -> str:
+        deadline = time.monotonic() + (timeout or self.timeout)
+        with self._inflight_lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+
+        if not leader:
+            self.metrics.incr('coalesced')
+            if not flight.done.wait(max(0.0, deadline - time.monotonic())):
+                self.metrics.incr('timeouts')
+                raise LLMTimeout("Timed out waiting for an identical in-flight LLM request")
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._call_with_retries(deadline, kwargs)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def _call_with_retries(self, deadline: float, kwargs: Dict[str, Any]) -> str:
+        attempt = 0
+        while True:
+            try:
+                return self._call_once(deadline, kwargs)
+            except LLMRetryableError:
+                if attempt >= self.max_retries:
+                    self.metrics.incr('errors')
+                    raise
+                sleep = random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+                if time.monotonic() + sleep >= deadline:
+                    self.metrics.incr('timeouts')
+                    raise LLMTimeout("LLM deadline exceeded while retrying")
+                attempt += 1
+                self.metrics.incr('retries')
+                time.sleep(sleep)
+            except LLMTimeout:
+                raise
+            except Exception:
+                self.metrics.incr('errors')
+                raise
+
+    def _call_once(self, deadline: float, kwargs: Dict[str, Any]) -> str:
+        queued = time.monotonic()
+        if not self._semaphore.acquire(timeout=max(0.0, deadline - queued)):
+            self.metrics.incr('timeouts')
+            raise LLMTimeout("Timed out waiting for an LLM concurrency slot")
+        try:
+            started = time.monotonic()
+            self.metrics.observe('queue_wait', started - queued)
+            remaining = deadline - started
+            if remaining <= 0:
+                self.metrics.incr('timeouts')
+                raise LLMTimeout("LLM deadline exceeded before the request was sent")
+            self.metrics.incr('upstream_calls')
+            try:
+                return self.backend.complete(timeout=remaining, **kwargs)
+            finally:
+                self.metrics.observe('upstream_latency', time.monotonic() - started)
+        finally:
+            self._semaphore.release()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _build_client(backend) -> LLMClient:
+    return LLMClient(
+        backend,
+        max_concurrency=getattr(settings, 'LLM_MAX_CONCURRENCY', 4),
+        timeout=getattr(settings, 'LLM_TIMEOUT', 30.0),
+        max_retries=getattr(settings, 'LLM_MAX_RETRIES', 2),
+    )
+
+
+def get_client() -> LLMClient:
+    """Process-wide client around ``settings.LLM_BACKEND`` (default OpenAI); raises LLMNotConfigured"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            path = getattr(settings, 'LLM_BACKEND', None) or 'core.llm.OpenAIBackend'
+            _client = _build_client(import_string(path)())
+        return _client
+
+
+def get_backend():
+    return get_client().backend
+
+
+def set_backend(backend):
+    """Install a backend instance (e.g. ``StubBackend``); ``None`` re-reads settings on next use"""
+    global _client
+    with _client_lock:
+        _client = _build_client(backend) if backend is not None else None
+
+
+def llm_metrics() -> Dict[str, Any]:
+    """Snapshot of the process-wide client's metrics (empty if no client was built yet)"""
+    return _client.metrics.snapshot() if _client is not None else {}
+
+
+def default_model() -> str:
+    return os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
+
+
+def cache_key(model: str, messages: Messages, schema: Dict[str, Any], temperature: float) -> str:
+    payload = json.dumps(
+        {"model": model, "messages": messages, "schema": schema, "temperature": temperature},
+        sort_keys=True, separators=(',', ':'),
+    )
+    return 'llm:' + hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _cache():
+    return caches[getattr(settings, 'LLM_CACHE_ALIAS', 'llm')]
+
+
+def complete_json(messages: Messages, schema: Dict[str, Any], *, schema_name: str,
+                  model: Optional[str] = None, temperature: float = 0.0, use_cache: bool = True,
+                  timeout: Optional[float] = None) -> Any:
+    """Return the parsed JSON answer for ``messages``, serving repeats from the response cache"""
+    model = model or default_model()
+    key = cache_key(model, messages, schema, temperature)
+    client = get_client()
+    client.metrics.incr('requests')
+    if use_cache:
+        cached = _cache().get(key)
+        if cached is not None:
+            client.metrics.incr('cache_hits')
+            return json.loads(cached)
+
+    content = client.complete(
+        key, timeout=timeout,
+        model=model, messages=messages, schema_name=schema_name, schema=schema, temperature=temperature,
+    )
+    try:
+        data = json.loads(content or "null")
+    except ValueError as e:
+        raise LLMError(f"LLM returned invalid JSON: {e}") from e
+
+    if use_cache and len(content) <= getattr(settings, 'LLM_CACHE_MAX_ENTRY_BYTES', 256 * 1024):
+        _cache().set(key, content, getattr(settings, 'LLM_CACHE_TIMEOUT', 7 * 24 * 3600))
+    return data
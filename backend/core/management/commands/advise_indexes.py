@@ -0,0 +1,121 @@
+import json
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from mongoengine import Document
+from mongoengine.connection import get_db
+from pymongo.errors import OperationFailure
+
+from core.index_advisor import (
+    covered_by_existing, explain_command, format_keys, is_constraint, merge_suggestions, redundant_indexes,
+    suggest, summarize_plan,
+)
+from core.querylog import load_shapes
+
+
+def document_collections():
+    """Collection names of every concrete MongoEngine document"""
+    pending = list(Document.__subclasses__())
+    names = set()
+    while pending:
+        doc_cls = pending.pop()
+        pending.extend(doc_cls.__subclasses__())
+        if not doc_cls._meta.get('abstract'):
+            names.add(doc_cls._get_collection_name())
+    return names
+
+
+class Command(BaseCommand):
+    help = ("Explain captured query shapes (MONGO_QUERY_CAPTURE) and report collection scans, "
+            "unused and redundant indexes, and suggested compound indexes")
+
+    def add_arguments(self, parser):
+        parser.add_argument('captures', nargs='+', help='JSONL file(s) written with MONGO_QUERY_CAPTURE set')
+        parser.add_argument('--min-count', type=int, default=1, help='Ignore shapes seen fewer times')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        try:
+            shapes = [s for s in load_shapes(options['captures']) if s['count'] >= options['min_count']]
+        except OSError as e:
+            raise CommandError(str(e))
+        db = get_db()
+        shapes = [s for s in shapes if s['db'] == db.name]
+        collections = sorted(document_collections() | {s['collection'] for s in shapes})
+
+        report = {}
+        for name in collections:
+            collection = db[name]
+            indexes = collection.index_information()
+            ours = [s for s in shapes if s['collection'] == name]
+            if not ours and not indexes:
+                continue
+            report[name] = self._analyse(db, collection, indexes, ours)
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2, default=str))
+            return
+        self._print(report)
+        self.stdout.write(self.style.SUCCESS(
+            f"Analysed {len(shapes)} query shape(s) across {len(report)} collection(s)"
+        ))
+
+    def _analyse(self, db, collection, indexes, shapes):
+        used = defaultdict(int)
+        scans, suggestions = [], defaultdict(int)
+        for entry in shapes:
+            plans = {}
+            for op in entry['ops']:
+                command = explain_command(op, collection.name, entry['sample'], entry['sort'],
+                                          entry.get('distinct_key'))
+                try:
+                    plans[op] = summarize_plan(db.command('explain', command, verbosity='queryPlanner'))
+                except OperationFailure as e:
+                    scans.append({'shape': entry['shape'], 'sort': entry['sort'], 'count': entry['count'],
+                                  'op': op, 'error': str(e)})
+            for index in {index for plan in plans.values() for index in plan.indexes}:
+                used[index] += entry['count']
+            problems = [(op, plan) for op, plan in plans.items() if plan.collscan or plan.in_memory_sort]
+            if not problems:
+                continue
+            keys = suggest(entry['shape'], entry['sort'])
+            for op, plan in problems:
+                scans.append({
+                    'shape': entry['shape'], 'sort': entry['sort'], 'count': entry['count'], 'op': op,
+                    'problem': 'COLLSCAN' if plan.collscan else 'in-memory SORT',
+                    'suggested': format_keys(keys) if keys else None,
+                })
+            if keys and not covered_by_existing(keys, indexes):
+                suggestions[keys] += entry['count']
+
+        return {
+            'scans': scans,
+            'used': dict(used),
+            'unused': [
+                name for name, info in indexes.items()
+                if name not in used and not is_constraint(name, info)
+            ],
+            'redundant': [{'index': a, 'covered_by': b} for a, b in redundant_indexes(indexes)],
+            'suggested': [
+                {'keys': format_keys(keys), 'queries': count}
+                for keys, count in sorted(merge_suggestions(suggestions).items(), key=lambda item: -item[1])
+            ],
+        }
+
+    def _print(self, report):
+        for name, result in report.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for scan in result['scans']:
+                problem = scan.get('problem') or f"explain failed: {scan['error']}"
+                sort = f" sort {scan['sort']}" if scan['sort'] else ''
+                self.stdout.write(f"  {problem} ({scan['op']}) x{scan['count']}: {json.dumps(scan['shape'])}{sort}")
+            for index, count in sorted(result['used'].items(), key=lambda item: -item[1]):
+                self.stdout.write(f"  used      {index} ({count} queries)")
+            for index in result['unused']:
+                self.stdout.write(self.style.WARNING(f"  unused    {index}"))
+            for pair in result['redundant']:
+                self.stdout.write(self.style.WARNING(f"  redundant {pair['index']} (prefix of {pair['covered_by']})"))
+            for suggestion in result['suggested']:
+                self.stdout.write(self.style.NOTICE(
+                    f"  suggest   {suggestion['keys']} ({suggestion['queries']} queries)"
+                ))
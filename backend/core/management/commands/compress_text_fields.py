@@ -0,0 +1,101 @@
+import time
+
+from bson import Binary
+from django.core.management.base import BaseCommand
+from mongoengine import Document
+from pymongo import UpdateOne
+
+from core.fields import CompressedTextField, compress_text, decompress_text
+
+
+def compressed_fields():
+    """``(document class, field)`` for every concrete document with a CompressedTextField"""
+    pending = list(Document.__subclasses__())
+    while pending:
+        doc_cls = pending.pop()
+        pending.extend(doc_cls.__subclasses__())
+        if doc_cls._meta.get('abstract'):
+            continue
+        for field in doc_cls._fields.values():
+            if isinstance(field, CompressedTextField):
+                yield doc_cls, field
+
+
+class Command(BaseCommand):
+    help = "Rewrite plain-string values of compressed text fields in stored form (or back, with --decompress)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be rewritten')
+        parser.add_argument('--decompress', action='store_true', help='Store values as plain strings again')
+        parser.add_argument(
+            '--measure', type=int, default=0, metavar='N',
+            help='Time loading N full documents per collection before and after',
+        )
+
+    def handle(self, *args, **options):
+        for doc_cls, field in compressed_fields():
+            collection = doc_cls._get_collection()
+            label = f"{collection.name}.{field.db_field}"
+            before = self._stats(collection)
+            latency_before = self._list_latency(doc_cls, options['measure'])
+
+            rewritten, raw_bytes, stored_bytes = self._rewrite(collection, field, options)
+
+            verb = 'Would rewrite' if options['dry_run'] else 'Rewrote'
+            self.stdout.write(self.style.SUCCESS(
+                f"{label}: {verb} {rewritten} value(s), {raw_bytes} -> {stored_bytes} bytes"
+            ))
+            if options['dry_run']:
+                continue
+            after = self._stats(collection)
+            self.stdout.write(
+                f"  collection size {before['size']} -> {after['size']} bytes, "
+                f"avg document {before['avgObjSize']} -> {after['avgObjSize']} bytes"
+            )
+            if options['measure']:
+                latency_after = self._list_latency(doc_cls, options['measure'])
+                self.stdout.write(
+                    f"  loading {options['measure']} documents: {latency_before:.1f} -> {latency_after:.1f} ms"
+                )
+
+    def _rewrite(self, collection, field, options):
+        name = field.db_field
+        wanted = 'binData' if options['decompress'] else 'string'
+        rewritten = raw_bytes = stored_bytes = 0
+        ops = []
+        for doc in collection.find({name: {'$type': wanted}}, {name: 1}).batch_size(options['batch_size']):
+            value = doc[name]
+            if options['decompress']:
+                new_value = decompress_text(value)
+                raw_bytes += len(value)
+                stored_bytes += len(new_value.encode('utf-8'))
+            else:
+                if len(value) < field.min_size:
+                    continue
+                new_value = Binary(compress_text(value))
+                raw_bytes += len(value.encode('utf-8'))
+                stored_bytes += len(new_value)
+            rewritten += 1
+            # Matching the old value skips documents written concurrently
+            ops.append(UpdateOne({'_id': doc['_id'], name: value}, {'$set': {name: new_value}}))
+            if len(ops) >= options['batch_size']:
+                self._flush(collection, ops, options['dry_run'])
+        self._flush(collection, ops, options['dry_run'])
+        return rewritten, raw_bytes, stored_bytes
+
+    def _flush(self, collection, ops, dry_run):
+        if ops and not dry_run:
+            collection.bulk_write(ops, ordered=False)
+        ops.clear()
+
+    def _stats(self, collection):
+        stats = collection.database.command('collStats', collection.name)
+        return {'size': stats.get('size', 0), 'avgObjSize': stats.get('avgObjSize', 0)}
+
+    def _list_latency(self, doc_cls, count):
+        if not count:
+            return 0.0
+        started = time.perf_counter()
+        list(doc_cls.objects.limit(count))
+        return (time.perf_counter() - started) * 1000
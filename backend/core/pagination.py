@@ -0,0 +1,141 @@
+"""
+Keyset (cursor) pagination for MongoEngine querysets.
+
+Pages are selected with a range condition on the sort key instead of
+``skip()``, so fetching page 1,000 costs the same as page 1 when an index
+covers the ordering. The cursor is the sort key of the last row served,
+encoded opaquely. Rows missing a sort key are left out of the list, since
+a range condition can neither reach nor step past them; sort on fields that
+are always set. ``count()`` is not run per page: a total is only returned
+when asked for (``?count=1``) and is approximate, either the collection's
+estimated document count for unfiltered lists or a briefly cached count.
+Views with a filtered queryset expose its filter as ``get_filters()``
+(MongoEngine query kwargs) so the count covers the same rows.
+"""
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from mongoengine import fields
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .projections import _resolve
+
+
+class KeysetPagination(BasePagination):
+    """Subclasses set ``ordering`` to ``(field, 1 | -1)`` pairs ending in a unique field"""
+
+    ordering: Sequence[Tuple[str, int]] = ()
+    page_size = None
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    count_cache_timeout = 60
+
+    def get_page_size(self, request) -> int:
+        default = self.page_size or getattr(settings, 'REST_FRAMEWORK', {}).get('PAGE_SIZE') or 20
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, default))
+        except ValueError:
+            size = default
+        return max(1, min(size, self.max_page_size))
+
+    def _keys(self, document) -> List[Tuple[str, str, int, Any]]:
+        """``(field name, stored path, direction, field)`` per ordering key"""
+        return [
+            (name, '.'.join(_resolve(document, name)), direction, document._fields[name])
+            for name, direction in self.ordering
+        ]
+
+    def encode_cursor(self, values: List[Any]) -> str:
+        payload = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor: str, keys) -> List[Any]:
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            if not isinstance(values, list) or len(values) != len(keys):
+                raise ValueError
+            return [
+                datetime.fromisoformat(v) if isinstance(field, fields.DateTimeField) and v is not None else v
+                for v, (_, _, _, field) in zip(values, keys)
+            ]
+        except (ValueError, TypeError):
+            raise NotFound("Invalid cursor")
+
+    def _after(self, keys, values) -> List[Dict[str, Any]]:
+        """Clauses for rows strictly after ``values`` in the ordering (lexicographic over the keys)"""
+        clauses = []
+        for i, (_, path, direction, _) in enumerate(keys):
+            clause = {keys[j][1]: values[j] for j in range(i)}
+            clause[path] = {'$gt' if direction > 0 else '$lt': values[i]}
+            clauses.append(clause)
+        return clauses
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.view = view
+        self.page_size = self.get_page_size(request)
+        self.document = queryset._document
+        keys = self._keys(self.document)
+        queryset = queryset.order_by(*[('-' if d < 0 else '') + name for name, _, d, _ in keys])
+        # Null or missing keys sort outside every range, so those rows would be skipped or repeated
+        raw: Dict[str, Any] = {path: {'$ne': None} for _, path, _, _ in keys}
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            raw['$or'] = self._after(keys, self.decode_cursor(cursor, keys))
+        queryset = queryset.filter(__raw__=raw)
+
+        rows = list(queryset.limit(self.page_size + 1))
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_cursor = None
+        if self.has_next and rows:
+            last = rows[-1]
+            if isinstance(last, dict):
+                values = []
+                for _, path, _, _ in keys:
+                    value = last
+                    for part in path.split('.'):
+                        value = value.get(part) if isinstance(value, dict) else None
+                    values.append(value)
+            else:
+                values = [getattr(last, name) for name, _, _, _ in keys]
+            self.next_cursor = self.encode_cursor(values)
+        return rows
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.next_cursor:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor)
+
+    def get_count(self) -> Optional[int]:
+        """Approximate total, only when requested with ``?count=1``"""
+        if self.request.query_params.get(self.count_query_param) not in ('1', 'true'):
+            return None
+        filters = self.view.get_filters() if hasattr(self.view, 'get_filters') else {}
+        collection = self.document._get_collection()
+        if not filters:
+            return collection.estimated_document_count()
+        digest = hashlib.sha1(json.dumps(filters, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        key = f"count:{collection.name}:{digest}"
+        return cache.get_or_set(key, self.document.objects(**filters).count, self.count_cache_timeout)
+
+    def get_meta(self) -> Dict[str, Any]:
+        meta = {'next': self.get_next_link()}
+        count = self.get_count()
+        if count is not None:
+            meta['count'] = count
+        return meta
+
+    def get_paginated_response(self, data):
+        return Response({**self.get_meta(), 'results': data})
@@ -0,0 +1,72 @@
+"""
+Declared projections for list endpoints.
+
+A ``Projection`` names the document fields a list response shows. The same
+declaration drives both the query (``.only()`` plus ``as_pymongo()``, so
+MongoDB returns just those fields and MongoEngine never builds documents)
+and the rendering of each raw dict into the response row, so the response
+shape cannot drift from what is fetched. Field paths are checked against
+the document when the projection is declared; a typo or a renamed field
+fails at import instead of silently rendering ``None``.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Tuple
+
+from django.core.exceptions import ImproperlyConfigured
+from mongoengine import fields as me_fields
+
+
+def _resolve(document, path: str) -> Tuple[str, ...]:
+    """Translate a dotted attribute path into its stored (``db_field``) path"""
+    stored = []
+    owner = document
+    parts = path.split('.')
+    for i, part in enumerate(parts):
+        field = getattr(owner, '_fields', {}).get(part)
+        if field is None:
+            raise ImproperlyConfigured(f"{document.__name__} has no field {path!r}")
+        stored.append('_id' if field.primary_key else field.db_field)
+        if i < len(parts) - 1:
+            if not isinstance(field, me_fields.EmbeddedDocumentField):
+                raise ImproperlyConfigured(f"{document.__name__}.{path}: {part!r} is not an embedded document")
+            owner = field.document_type
+    return tuple(stored)
+
+
+def _render(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class Projection:
+    """The fields a list response shows, used for both the query and the row rendering"""
+
+    def __init__(self, document, paths: Iterable[str]):
+        self.document = document
+        self.paths = tuple(paths)
+        self._stored = [(path.split('.'), _resolve(document, path)) for path in self.paths]
+
+    def fetch(self, queryset):
+        """Restrict ``queryset`` to the projected fields and return raw dicts"""
+        return queryset.only(*self.paths).as_pymongo()
+
+    def mongo_projection(self) -> Dict[str, int]:
+        """``$project``/find projection of the stored paths, for aggregation pipelines"""
+        return {'.'.join(stored): 1 for _, stored in self._stored}
+
+    def row(self, raw: Dict[str, Any]) -> Dict[str, Any]:
+        """Render one raw document as a response row (nested paths become nested dicts)"""
+        out: Dict[str, Any] = {}
+        for names, stored in self._stored:
+            value = raw
+            for key in stored:
+                value = value.get(key) if isinstance(value, dict) else None
+            target = out
+            for name in names[:-1]:
+                target = target.setdefault(name, {})
+            target[names[-1]] = _render(value)
+        return out
+
+    def rows(self, raws: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [self.row(raw) for raw in raws]
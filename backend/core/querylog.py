@@ -0,0 +1,183 @@
+"""
+Query shape capture through pymongo command monitoring.
+
+With ``MONGO_QUERY_CAPTURE`` set to a file path, a ``QueryShapeRecorder`` is
+attached to the MongoEngine connection and records every read and write
+predicate the process sends: the collection, the filter with its values
+replaced by ``1`` (the shape), the sort, how often the shape was seen and
+one sample to ``explain`` later. The sample is redacted (``redact``): each
+value is replaced by a placeholder of the same type, so the planner sees
+the same predicates while emails, ids and free text never reach the file.
+Shapes are appended to the file as
+JSON lines when the process exits, so a test run or a load run leaves
+behind the workload that ``manage.py advise_indexes`` analyses. Several
+processes may append to the same file; ``load_shapes`` merges them.
+"""
+import atexit
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId, Regex, json_util
+from pymongo import monitoring
+
+SKIP_DATABASES = ('admin', 'config', 'local')
+
+# Operator arguments that are part of the query's structure rather than user data
+STRUCTURAL_OPERATORS = frozenset(('$exists', '$type', '$size', '$options', '$meta', '$mod', '$language'))
+
+_PLACEHOLDER_DATE = datetime(2000, 1, 1)
+_PLACEHOLDER_ID = ObjectId('0' * 24)
+
+
+def shape_of(value: Any) -> Any:
+    """``value`` with every literal replaced by 1 (operators and field names are kept)"""
+    if isinstance(value, dict):
+        return {key: shape_of(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)) and value and all(isinstance(item, dict) for item in value):
+        return [shape_of(item) for item in value]
+    return 1
+
+
+def redact(value: Any) -> Any:
+    """``value`` with every literal replaced by a placeholder of the same type.
+
+    Structure (operators, field names, list lengths, booleans, nulls, structural
+    operator arguments) is kept, as are regex anchors and flags, so an explain
+    of the redacted filter picks the same plan as the real one.
+    """
+    if isinstance(value, dict):
+        return {
+            key: item if key in STRUCTURAL_OPERATORS else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return type(value)(0)
+    if isinstance(value, str):
+        return 's'
+    if isinstance(value, datetime):
+        return _PLACEHOLDER_DATE
+    if isinstance(value, ObjectId):
+        return _PLACEHOLDER_ID
+    if isinstance(value, (Regex, re.Pattern)):
+        anchored = isinstance(value.pattern, str) and value.pattern.startswith('^')
+        return Regex('^s' if anchored else 's', value.flags)
+    if isinstance(value, bytes):
+        return b''
+    return str(type(value).__name__)
+
+
+def _predicates(name: str, command: dict) -> List[Tuple[dict, list]]:
+    """``(filter, sort)`` pairs a command would select documents with"""
+    def sort_pairs(sort):
+        return [[key, direction] for key, direction in (sort or {}).items()]
+
+    if name == 'find':
+        return [(command.get('filter') or {}, sort_pairs(command.get('sort')))]
+    if name == 'count':
+        return [(command.get('query') or {}, [])]
+    if name == 'distinct':
+        return [(command.get('query') or {}, [])]
+    if name == 'findAndModify':
+        return [(command.get('query') or {}, sort_pairs(command.get('sort')))]
+    if name == 'update':
+        return [(op.get('q') or {}, []) for op in command.get('updates', [])]
+    if name == 'delete':
+        return [(op.get('q') or {}, []) for op in command.get('deletes', [])]
+    if name == 'aggregate':
+        pipeline = command.get('pipeline') or []
+        match = pipeline[0].get('$match') if pipeline else None
+        if match is None:
+            return []
+        sort = pipeline[1].get('$sort') if len(pipeline) > 1 else None
+        return [(match, sort_pairs(sort))]
+    return []
+
+
+class QueryShapeRecorder(monitoring.CommandListener):
+    """Collects distinct query shapes (with counts and a sample) and writes them out at exit"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._shapes: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        atexit.register(self.dump)
+
+    def started(self, event):
+        if event.database_name in SKIP_DATABASES:
+            return
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str) or collection.startswith('system.'):
+            return
+        key = event.command.get('key') if event.command_name == 'distinct' else None
+        for query, sort in _predicates(event.command_name, event.command):
+            self.record(event.database_name, collection, event.command_name, query, sort, key)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def record(self, database: str, collection: str, op: str, query: dict, sort: list,
+               distinct_key: Optional[str] = None):
+        shape = shape_of(query)
+        key = json.dumps([database, collection, shape, sort], sort_keys=True)
+        with self._lock:
+            entry = self._shapes.get(key)
+            if entry is None:
+                entry = self._shapes[key] = {
+                    'db': database, 'collection': collection, 'ops': [op], 'count': 1,
+                    'shape': shape, 'sort': sort, 'sample': redact(query),
+                }
+            else:
+                entry['count'] += 1
+                if op not in entry['ops']:
+                    entry['ops'].append(op)
+            if distinct_key:
+                entry.setdefault('distinct_key', distinct_key)
+
+    def dump(self):
+        with self._lock:
+            shapes, self._shapes = list(self._shapes.values()), {}
+        if not shapes:
+            return
+        payload = ''.join(json_util.dumps(entry) + '\n' for entry in shapes).encode('utf-8')
+        # One O_APPEND write per process keeps concurrent writers' lines intact
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, payload)
+        finally:
+            os.close(fd)
+
+
+def recorder(path: Optional[str]) -> List[monitoring.CommandListener]:
+    """``event_listeners`` for the Mongo connection (empty unless capture is enabled)"""
+    return [QueryShapeRecorder(path)] if path else []
+
+
+def load_shapes(paths: Iterable[str]) -> List[dict]:
+    """Captured shapes from one or more files, merged across processes and runs"""
+    merged: Dict[str, dict] = {}
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json_util.loads(line)
+                key = json.dumps([entry['db'], entry['collection'], entry['shape'], entry['sort']], sort_keys=True)
+                if key in merged:
+                    merged[key]['count'] += entry['count']
+                    merged[key]['ops'] = sorted(set(merged[key]['ops']) | set(entry['ops']))
+                    if 'distinct_key' in entry:
+                        merged[key].setdefault('distinct_key', entry['distinct_key'])
+                else:
+                    merged[key] = entry
+    return sorted(merged.values(), key=lambda entry: -entry['count'])
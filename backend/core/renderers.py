@@ -0,0 +1,48 @@
+"""
+orjson-backed DRF renderer.
+
+Encodes responses with orjson (several times faster than the stdlib encoder
+DRF uses) and falls back to DRF's encoder for types orjson does not know
+(Decimal, lazy translation strings, ObjectId, ...). Datetimes are passed to
+DRF's encoder too, so their format is unchanged. Without orjson installed
+it behaves exactly like ``rest_framework.renderers.JSONRenderer``.
+"""
+from bson import ObjectId
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is used instead
+    orjson = None
+
+_fallback = JSONEncoder()
+
+
+def _default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    return _fallback.default(obj)
+
+
+def _options():
+    return orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def dumps(data) -> bytes:
+    """Encode ``data`` the way API responses are encoded"""
+    if orjson is None:
+        return JSONRenderer().render(data)
+    return orjson.dumps(data, default=_default, option=_options())
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        option = _options()
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_default, option=option)
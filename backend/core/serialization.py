@@ -0,0 +1,113 @@
+"""
+Schema-driven, compiled ``to_dict`` serializers for MongoEngine documents.
+
+A model declares the shape of its API representation once::
+
+    to_dict = CompiledSerializer([
+        'job_id', 'title', 'created_at',
+        ('company', ['name', 'industry']),
+    ])
+
+Entries are field names, or ``(name, sub_schema)`` for embedded documents
+and lists of embedded documents. On first use the schema is checked against
+the document's fields and compiled into plain Python functions that read
+``_data`` directly (skipping the field descriptors), format datetimes with
+``isoformat()`` and build the output with dict/list literals. Fields with a
+custom descriptor (e.g. ``CompressedTextField``'s lazy decompression) are
+still read through attribute access.
+"""
+import threading
+from typing import Any, Callable, Dict, List, Sequence, Tuple, Union
+
+from mongoengine import fields
+
+from .fields import CompressedTextField
+
+SchemaEntry = Union[str, Tuple[str, Sequence['SchemaEntry']]]
+
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def _list(value):
+    return list(value) if value is not None else None
+
+
+class _Compiler:
+    def __init__(self, document):
+        self.document = document
+        self.functions: List[str] = []
+        self.counter = 0
+
+    def compile(self, schema: Sequence[SchemaEntry]) -> Callable[[Any], Dict[str, Any]]:
+        name = self._function(self.document, schema, self.document.__name__)
+        namespace: Dict[str, Any] = {'_iso': _iso, '_list': _list}
+        source = "\n\n".join(self.functions)
+        exec(compile(source, f"<to_dict {self.document.__name__}>", 'exec'), namespace)
+        function = namespace[name]
+        function.__source__ = source
+        return function
+
+    def _function(self, owner, schema: Sequence[SchemaEntry], label: str) -> str:
+        self.counter += 1
+        name = f"_to_dict_{self.counter}"
+        items = [self._item(owner, entry, label) for entry in schema]
+        body = ",\n        ".join(items)
+        self.functions.append(f"def {name}(obj):\n    d = obj._data\n    return {{\n        {body},\n    }}")
+        return name
+
+    def _item(self, owner, entry: SchemaEntry, label: str) -> str:
+        name, sub_schema = (entry, None) if isinstance(entry, str) else entry
+        field = owner._fields.get(name)
+        if field is None:
+            raise ValueError(f"{label} has no field {name!r}")
+        path = f"{label}.{name}"
+        raw = f"d.get({name!r})"
+
+        if sub_schema is not None:
+            if isinstance(field, fields.EmbeddedDocumentField):
+                nested = self._function(field.document_type, sub_schema, path)
+                return f"{name!r}: None if (v := {raw}) is None else {nested}(v)"
+            if isinstance(field, fields.ListField) and isinstance(field.field, fields.EmbeddedDocumentField):
+                nested = self._function(field.field.document_type, sub_schema, path)
+                return f"{name!r}: [{nested}(v) for v in ({raw} or ())]"
+            raise ValueError(f"{path} is not an embedded document; it cannot take a sub-schema")
+
+        if isinstance(field, fields.EmbeddedDocumentField) or (
+            isinstance(field, fields.ListField) and isinstance(field.field, fields.EmbeddedDocumentField)
+        ):
+            raise ValueError(f"{path} is an embedded document; declare its sub-schema")
+        if isinstance(field, CompressedTextField):
+            return f"{name!r}: obj.{name}"
+        if isinstance(field, fields.DateTimeField):
+            return f"{name!r}: _iso({raw})"
+        if isinstance(field, fields.ListField):
+            return f"{name!r}: _list({raw})"
+        return f"{name!r}: {raw}"
+
+
+class CompiledSerializer:
+    """Class attribute turning a schema into a compiled ``to_dict`` method"""
+
+    def __init__(self, schema: Sequence[SchemaEntry]):
+        self.schema = schema
+        self._function = None
+        self._lock = threading.Lock()
+
+    def __set_name__(self, owner, name):
+        self.owner = owner
+
+    def compiled(self) -> Callable[[Any], Dict[str, Any]]:
+        # Compiled lazily: the document's fields are only complete once its class is built
+        if self._function is None:
+            with self._lock:
+                if self._function is None:
+                    self._function = _Compiler(self.owner).compile(self.schema)
+        return self._function
+
+    def __get__(self, instance, owner):
+        function = self.compiled()
+        if instance is None:
+            return function
+        return function.__get__(instance, owner)
@@ -0,0 +1,121 @@
+import json
+import os
+from collections import namedtuple
+from functools import lru_cache
+from typing import Iterable, List, Optional, Set, Tuple
+
+from .text import SkillMatcher, normalize_text
+
+DEFAULT_SKILL_TAXONOMY = os.path.join(os.path.dirname(__file__), 'data', 'skill_taxonomy.json')
+
+# Shared with resumes.models.Skill.category
+SKILL_CATEGORIES = [
+    ('programming', 'Programming Languages'),
+    ('framework', 'Frameworks & Libraries'),
+    ('database', 'Databases'),
+    ('tool', 'Tools & Software'),
+    ('cloud', 'Cloud Platforms'),
+    ('soft_skill', 'Soft Skills'),
+    ('language', 'Languages'),
+    ('other', 'Other')
+]
+
+SkillEntry = namedtuple('SkillEntry', ['id', 'key', 'name', 'category', 'synonyms'])
+
+
+class SkillTaxonomy:
+    """Interned table of canonical skills.
+
+    Every surface form (canonical key, display name and synonyms) maps to a
+    stable integer id from the taxonomy file, so "golang" and "go" or
+    "k8s" and "kubernetes" resolve to the same skill. Ids are never reused
+    across taxonomy versions; pipelines store and compare ids, not names.
+    """
+
+    def __init__(self, data: dict):
+        self.version = data.get('version', 1)
+        self._by_id = {}
+        self._by_form = {}
+        valid_categories = {key for key, _ in SKILL_CATEGORIES}
+
+        for item in data.get('skills', []):
+            entry = SkillEntry(
+                id=int(item['id']),
+                key=item['key'],
+                name=item.get('name') or item['key'],
+                category=item.get('category') or 'other',
+                synonyms=tuple(item.get('synonyms') or ()),
+            )
+            if entry.id in self._by_id:
+                raise ValueError(f"Duplicate skill id {entry.id} in taxonomy")
+            if entry.category not in valid_categories:
+                raise ValueError(f"Unknown category '{entry.category}' for skill '{entry.key}'")
+            self._by_id[entry.id] = entry
+            for form in (entry.key, entry.name) + entry.synonyms:
+                form = normalize_text(form).strip()
+                owner = self._by_form.setdefault(form, entry.id)
+                if owner != entry.id:
+                    raise ValueError(f"Skill form '{form}' maps to both {owner} and {entry.id}")
+
+        self.matcher = SkillMatcher(self._by_form.keys(), self._by_form.values())
+
+    @classmethod
+    def from_file(cls, path: str) -> 'SkillTaxonomy':
+        with open(path, encoding='utf-8') as fh:
+            return cls(json.load(fh))
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __contains__(self, skill_id):
+        return skill_id in self._by_id
+
+    def entries(self) -> List[SkillEntry]:
+        return list(self._by_id.values())
+
+    def get(self, skill_id: int) -> Optional[SkillEntry]:
+        return self._by_id.get(skill_id)
+
+    def name(self, skill_id: int) -> Optional[str]:
+        entry = self._by_id.get(skill_id)
+        return entry.name if entry else None
+
+    def names(self, skill_ids: Iterable[int]) -> List[str]:
+        """Display names for ``skill_ids``, sorted for stable API output"""
+        return sorted(self._by_id[i].name for i in skill_ids if i in self._by_id)
+
+    def resolve(self, name: Optional[str]) -> Optional[int]:
+        """Canonical id for a skill name or synonym, ``None`` if not in the taxonomy"""
+        return self._by_form.get(normalize_text(name).strip())
+
+    def resolve_many(self, names: Iterable[str]) -> List[int]:
+        """Distinct canonical ids for ``names`` in first-seen order; unknown names are skipped"""
+        ids = []
+        for name in names or []:
+            skill_id = self.resolve(name)
+            if skill_id is not None and skill_id not in ids:
+                ids.append(skill_id)
+        return ids
+
+    def split(self, names: Iterable[str]) -> Tuple[Set[int], Set[str]]:
+        """Split ``names`` into known canonical ids and normalized names outside the taxonomy"""
+        ids, unknown = set(), set()
+        for name in names or []:
+            skill_id = self.resolve(name)
+            if skill_id is not None:
+                ids.add(skill_id)
+            elif normalize_text(name).strip():
+                unknown.add(normalize_text(name).strip())
+        return ids, unknown
+
+    def extract(self, text: Optional[str]) -> Set[int]:
+        """Canonical ids of every taxonomy skill mentioned in ``text`` (single linear pass)"""
+        return self.matcher.find(text)
+
+
+@lru_cache(maxsize=1)
+def get_taxonomy() -> SkillTaxonomy:
+    """Process-wide taxonomy loaded from ``settings.SKILL_TAXONOMY_PATH``"""
+    from django.conf import settings
+    path = getattr(settings, 'SKILL_TAXONOMY_PATH', None) or DEFAULT_SKILL_TAXONOMY
+    return SkillTaxonomy.from_file(path)
@@ -0,0 +1,460 @@
+import re
+import threading
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+from mongoengine import fields
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from applications.models import Application
+from applications.serializers import APPLICATION_LIST_PROJECTION
+from jobs.autocomplete import PrefixIndex
+from jobs.models import MAX_SEARCH_TERMS, Job
+from jobs.serializers import JOB_LIST_PROJECTION
+from resumes.models import Resume
+from resumes.serializers import RESUME_LIST_PROJECTION
+
+from .counters import CounterBuffer
+from .geo import DEFAULT_GAZETTEER, Gazetteer
+from .index_advisor import explain_command
+from .llm import (
+    LLMClient, LLMError, LLMRetryableError, LLMTimeout, StubBackend, cache_key, complete_json, get_backend,
+    set_backend,
+)
+from .querylog import redact
+from .text import SkillMatcher
+
+SAMPLE_DATE = datetime(2025, 3, 4, 5, 6, 7)
+
+
+def _sample(field):
+    """A non-default value for ``field`` (the first choice for choice fields)"""
+    if field.choices:
+        choice = field.choices[0]
+        return choice[0] if isinstance(choice, (list, tuple)) else choice
+    if isinstance(field, fields.DateTimeField):
+        return SAMPLE_DATE
+    if isinstance(field, fields.BooleanField):
+        return True
+    if isinstance(field, fields.IntField):
+        return 7
+    if isinstance(field, fields.FloatField):
+        return 42.5
+    if isinstance(field, fields.ListField):
+        return [f'{field.name}-item']
+    return f'{field.name}-value'
+
+
+def _populate(document, paths):
+    """Set every projected path on ``document`` and return the expected rendered values"""
+    expected = {}
+    for path in paths:
+        *parents, name = path.split('.')
+        owner = document
+        for parent in parents:
+            if owner[parent] is None:
+                owner[parent] = owner._fields[parent].document_type()
+            owner = owner[parent]
+        value = _sample(owner._fields[name])
+        owner[name] = value
+        expected[path] = value.isoformat() if isinstance(value, datetime) else value
+    return expected
+
+
+def _flatten(data, prefix=''):
+    flat = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f'{prefix}{key}.'))
+        else:
+            flat[f'{prefix}{key}'] = value
+    return flat
+
+
+class ListProjectionTests(SimpleTestCase):
+    """Each list projection renders exactly its declared paths, consistently with ``to_dict``"""
+
+    cases = (
+        (JOB_LIST_PROJECTION, lambda: Job(title='Engineer', description='Build things')),
+        (RESUME_LIST_PROJECTION, lambda: Resume(user_id='user-1')),
+        (APPLICATION_LIST_PROJECTION, lambda: Application(user_id='user-1', job_id='job-1')),
+    )
+
+    def test_rows_match_paths_and_serializer(self):
+        for projection, make in self.cases:
+            with self.subTest(document=projection.document.__name__):
+                document = make()
+                expected = _populate(document, projection.paths)
+                row = _flatten(projection.row(document.to_mongo().to_dict()))
+
+                self.assertEqual(set(row), set(projection.paths))
+                self.assertEqual(row, expected)
+
+                serialized = _flatten(document.to_dict())
+                shared = set(row) & set(serialized)
+                self.assertTrue(shared)
+                self.assertEqual({path: row[path] for path in shared},
+                                 {path: serialized[path] for path in shared})
+
+    def test_query_projection_covers_paths(self):
+        for projection, _ in self.cases:
+            with self.subTest(document=projection.document.__name__):
+                self.assertEqual(len(projection.mongo_projection()), len(projection.paths))
+
+
+class _FailingCollection:
+    """Fails the ops at ``failing`` indexes of a bulk write, or the whole call with ``error``"""
+
+    def __init__(self, failing=(), error=None):
+        self.failing = failing
+        self.error = error
+
+    def bulk_write(self, ops, ordered=True):
+        if self.error:
+            raise self.error
+        if self.failing:
+            raise BulkWriteError({
+                'writeErrors': [{'index': i, 'code': 2, 'errmsg': 'failed'} for i in self.failing],
+                'nModified': len(ops) - len(self.failing),
+            })
+
+
+class CounterBufferTests(SimpleTestCase):
+    """Failed flushes only retry the increments that were not applied"""
+
+    def flush_with(self, collection):
+        buffer = CounterBuffer(interval=60, max_pending=1000)
+        with patch.object(CounterBuffer, '_ensure_thread'):
+            for pk in ('a', 'b', 'c'):
+                buffer.incr(Job, pk, 'view_count', 2)
+        with patch.object(Job, '_get_collection', return_value=collection), \
+                self.assertLogs('core.counters', 'WARNING'):
+            written = buffer.flush()
+        return buffer, written
+
+    def test_partial_failure_retries_only_failed_ops(self):
+        buffer, written = self.flush_with(_FailingCollection(failing=(1,)))
+
+        self.assertEqual(written, 2)
+        self.assertEqual(dict(buffer._pending[Job]), {('b', 'view_count'): 2})
+
+    def test_unacknowledged_failure_retries_everything(self):
+        buffer, written = self.flush_with(_FailingCollection(error=AutoReconnect('connection reset')))
+
+        self.assertEqual(written, 0)
+        self.assertEqual(buffer.pending(), 3)
+
+
+class QueryShapeTests(SimpleTestCase):
+    """Captured samples keep their structure but none of their values"""
+
+    def test_redact_keeps_types_and_structure(self):
+        query = {
+            'email': 'jane@example.com',
+            'user_id': {'$in': ['user-1', 'user-2']},
+            'created_at': {'$gte': datetime(2025, 3, 4)},
+            'view_count': {'$gt': 17},
+            'is_active': True,
+            'external_id': {'$type': 'string', '$exists': True},
+            'title': re.compile('^Senior', re.IGNORECASE),
+            '$text': {'$search': 'python django'},
+        }
+        redacted = redact(query)
+
+        self.assertEqual(redacted['email'], 's')
+        self.assertEqual(redacted['user_id'], {'$in': ['s', 's']})
+        self.assertIsInstance(redacted['created_at']['$gte'], datetime)
+        self.assertNotEqual(redacted['created_at']['$gte'], query['created_at']['$gte'])
+        self.assertEqual(redacted['view_count'], {'$gt': 0})
+        self.assertIs(redacted['is_active'], True)
+        self.assertEqual(redacted['external_id'], query['external_id'])
+        self.assertEqual((redacted['title'].pattern, redacted['title'].flags & re.IGNORECASE), ('^s', re.IGNORECASE))
+        self.assertEqual(redacted['$text'], {'$search': 's'})
+
+    def test_explain_uses_the_captured_operation(self):
+        sort = [['created_at', -1]]
+        self.assertEqual(explain_command('count', 'jobs', {'a': 's'}, []), {'count': 'jobs', 'query': {'a': 's'}})
+        self.assertEqual(
+            explain_command('aggregate', 'jobs', {'a': 's'}, sort),
+            {'aggregate': 'jobs', 'pipeline': [{'$match': {'a': 's'}}, {'$sort': {'created_at': -1}}], 'cursor': {}},
+        )
+        self.assertEqual(explain_command('distinct', 'jobs', {}, [], 'company.name')['key'], 'company.name')
+        self.assertEqual(
+            explain_command('find', 'jobs', {'a': 's'}, sort),
+            {'find': 'jobs', 'filter': {'a': 's'}, 'sort': {'created_at': -1}},
+        )
+
+
+class SkillMatcherTests(SimpleTestCase):
+    """Matches only count on word boundaries, where '.', '#' and '+' can continue a word"""
+
+    matcher = SkillMatcher(['c', 'c#', 'c++', 'js', 'node.js', 'go', 'r', '.net'])
+
+    def test_boundaries(self):
+        cases = {
+            'Built APIs in Node.js and Go': {'node.js', 'go'},
+            'Strong C# and C++ skills': {'c#', 'c++'},
+            'Embedded C, some C++': {'c', 'c++'},
+            'Mostly js.': {'js'},
+            'I write JS. Also C.': {'js', 'c'},
+            'Worked at Google on R&D': {'r'},
+            'Five years of .NET': {'.net'},
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(self.matcher.find(text), expected)
+
+    def test_joined_punctuation_is_not_a_boundary(self):
+        cases = {'next.js': set(), 'bundle.js.map': set(), 'c.d': set(), 'c#.net': set(), 'c++/js': {'c++', 'js'}}
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(self.matcher.find(text), expected)
+
+
+class GeocodeTests(SimpleTestCase):
+    """Qualified place names resolve only to a place matching the qualifier"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.gazetteer = Gazetteer.from_file(DEFAULT_GAZETTEER)
+
+    def assertPlace(self, place, expected):
+        self.assertEqual((place.name, place.admin, place.country) if place else None, expected)
+
+    def test_free_text_locations(self):
+        cases = {
+            'Paris, TX': None,
+            'London, ON': None,
+            'Paris': ('Paris', None, 'FR'),
+            'London, UK': ('London', None, 'GB'),
+            'Austin, TX': ('Austin', 'TX', 'US'),
+            'San Francisco, CA 94105': ('San Francisco', 'CA', 'US'),
+            'Remote - New York, NY': ('New York', 'NY', 'US'),
+            'London / Paris': ('London', None, 'GB'),
+            'Toronto, ON, Canada': ('Toronto', 'ON', 'CA'),
+        }
+        for location, expected in cases.items():
+            with self.subTest(location=location):
+                self.assertPlace(self.gazetteer.geocode(location), expected)
+
+    def test_structured_fields(self):
+        self.assertPlace(self.gazetteer.geocode(city='Paris', state='TX', country='USA'), None)
+        self.assertPlace(self.gazetteer.geocode(city='London', state='ON'), None)
+        self.assertPlace(self.gazetteer.geocode(city='Austin', state='TX', country='USA'), ('Austin', 'TX', 'US'))
+        self.assertPlace(self.gazetteer.geocode(city='Paris', country='France'), ('Paris', None, 'FR'))
+        self.assertPlace(self.gazetteer.geocode(city='Paris'), ('Paris', None, 'FR'))
+
+
+class SearchTermsTests(SimpleTestCase):
+    """Descriptions with too many distinct terms index their most frequent ones"""
+
+    def test_keeps_most_frequent_terms(self):
+        terms = {f'rare{i:05d}': 1 for i in range(MAX_SEARCH_TERMS)}
+        terms.update({'zookeeper': 5, 'python': 3})
+        job = Job(title='Engineer', description_terms=terms)
+        job.refresh_search_terms()
+
+        self.assertEqual(len(job.search_terms), MAX_SEARCH_TERMS)
+        self.assertIn('zookeeper', job.search_terms)
+        self.assertIn('python', job.search_terms)
+        self.assertEqual(job.search_terms, sorted(job.search_terms))
+
+
+MESSAGES = [{'role': 'user', 'content': 'Extract the skills'}]
+SCHEMA = {'type': 'object', 'properties': {'skills': {'type': 'array'}}}
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-default'},
+    'llm': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-llm'},
+})
+class LLMResponseCacheTests(SimpleTestCase):
+    """Identical requests are answered from the response cache"""
+
+    def setUp(self):
+        set_backend(StubBackend({'skills': ['python']}))
+        self.addCleanup(set_backend, None)
+
+    def test_key_covers_every_input(self):
+        key = cache_key('model-a', MESSAGES, SCHEMA, 0.0)
+        self.assertEqual(key, cache_key('model-a', [dict(reversed(list(MESSAGES[0].items())))], SCHEMA, 0.0))
+        for other in (
+            cache_key('model-b', MESSAGES, SCHEMA, 0.0),
+            cache_key('model-a', [{'role': 'user', 'content': 'Parse the resume'}], SCHEMA, 0.0),
+            cache_key('model-a', MESSAGES, {'type': 'array'}, 0.0),
+            cache_key('model-a', MESSAGES, SCHEMA, 0.7),
+        ):
+            self.assertNotEqual(key, other)
+
+    def test_repeat_is_served_from_cache(self):
+        first = complete_json(MESSAGES, SCHEMA, schema_name='skills', model='model-a')
+        second = complete_json(MESSAGES, SCHEMA, schema_name='skills', model='model-a')
+
+        self.assertEqual(first, {'skills': ['python']})
+        self.assertEqual(second, first)
+        self.assertEqual(len(get_backend().calls), 1)
+
+        complete_json(MESSAGES, SCHEMA, schema_name='skills', model='model-b')
+        complete_json(MESSAGES, SCHEMA, schema_name='skills', model='model-a', use_cache=False)
+        self.assertEqual(len(get_backend().calls), 3)
+
+
+class LLMClientTests(SimpleTestCase):
+    """Single-flight, concurrency bound, retries and deadlines of ``LLMClient``"""
+
+    def call(self, client, key='key', **kwargs):
+        return client.complete(key, model='model', messages=MESSAGES, schema_name='skills', schema=SCHEMA,
+                               temperature=0.0, **kwargs)
+
+    def run_threads(self, targets):
+        threads = [threading.Thread(target=target) for target in targets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+    def gated(self, result):
+        """A responder that blocks until released, and an event set once the first call arrives"""
+        arrived, release = threading.Event(), threading.Event()
+
+        def responder(**kwargs):
+            arrived.set()
+            release.wait(5)
+            return result() if callable(result) else result
+        return responder, arrived, release
+
+    def test_identical_calls_share_one_request(self):
+        responder, arrived, release = self.gated({'skills': ['go']})
+        backend = StubBackend(responder)
+        client = LLMClient(backend)
+        results = []
+
+        leader = threading.Thread(target=lambda: results.append(self.call(client)))
+        leader.start()
+        arrived.wait(5)
+        followers = [threading.Thread(target=lambda: results.append(self.call(client))) for _ in range(4)]
+        for thread in followers:
+            thread.start()
+        while client.metrics.snapshot()['coalesced'] < 4:
+            time.sleep(0.005)
+        release.set()
+        for thread in [leader] + followers:
+            thread.join(5)
+
+        self.assertEqual(len(backend.calls), 1)
+        self.assertEqual(results, ['{"skills": ["go"]}'] * 5)
+
+    def test_followers_reraise_the_leaders_exception(self):
+        failure = LLMError('upstream rejected the request')
+
+        def fail():
+            raise failure
+        responder, arrived, release = self.gated(fail)
+        client = LLMClient(StubBackend(responder))
+        errors = []
+
+        def run():
+            try:
+                self.call(client)
+            except LLMError as e:
+                errors.append(e)
+        leader = threading.Thread(target=run)
+        leader.start()
+        arrived.wait(5)
+        followers = [threading.Thread(target=run) for _ in range(3)]
+        for thread in followers:
+            thread.start()
+        while client.metrics.snapshot()['coalesced'] < 3:
+            time.sleep(0.005)
+        release.set()
+        for thread in [leader] + followers:
+            thread.join(5)
+
+        self.assertEqual(len(errors), 4)
+        for error in errors:
+            self.assertIs(error, failure)
+
+    def test_upstream_concurrency_is_bounded(self):
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+
+        def responder(**kwargs):
+            with lock:
+                state['running'] += 1
+                state['peak'] = max(state['peak'], state['running'])
+            time.sleep(0.05)
+            with lock:
+                state['running'] -= 1
+            return {}
+        client = LLMClient(StubBackend(responder), max_concurrency=2)
+
+        self.run_threads([lambda key=f'key-{i}': self.call(client, key) for i in range(6)])
+
+        self.assertEqual(state['peak'], 2)
+        self.assertEqual(client.metrics.snapshot()['upstream_calls'], 6)
+        self.assertEqual(client.metrics.snapshot()['queue_wait']['count'], 6)
+
+    def test_retryable_errors_are_retried(self):
+        attempts = []
+
+        def responder(**kwargs):
+            attempts.append(kwargs)
+            if len(attempts) < 3:
+                raise LLMRetryableError('rate limited')
+            return {'skills': []}
+        client = LLMClient(StubBackend(responder), max_retries=2, backoff_base=0.001)
+
+        self.assertEqual(self.call(client), '{"skills": []}')
+        self.assertEqual(client.metrics.snapshot()['retries'], 2)
+
+        attempts.clear()
+        client = LLMClient(StubBackend(responder), max_retries=1, backoff_base=0.001)
+        with self.assertRaises(LLMRetryableError):
+            self.call(client)
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(client.metrics.snapshot()['errors'], 1)
+
+    def test_deadline_covers_attempts_and_queueing(self):
+        client = LLMClient(StubBackend(delay=1.0), max_retries=2, backoff_base=0.001)
+        started = time.monotonic()
+        with self.assertRaises(LLMTimeout):
+            self.call(client, timeout=0.1)
+        self.assertLess(time.monotonic() - started, 0.5)
+
+        responder, arrived, release = self.gated({})
+        client = LLMClient(StubBackend(responder), max_concurrency=1)
+        holder = threading.Thread(target=lambda: self.call(client, 'slow'))
+        holder.start()
+        arrived.wait(5)
+        try:
+            with self.assertRaises(LLMTimeout):
+                self.call(client, 'queued', timeout=0.05)
+        finally:
+            release.set()
+            holder.join(5)
+        self.assertEqual(client.metrics.snapshot()['timeouts'], 1)
+
+
+class PrefixIndexTests(SimpleTestCase):
+    """Terms no active job carries stop completing, except where unused terms are kept on purpose"""
+
+    def test_zero_count_terms_are_not_suggested(self):
+        index = PrefixIndex(compact_at=2)
+        index.add('Senior Engineer')
+        index.add('Sales Engineer', 2)
+        index.add('Senior Engineer', -1)
+        self.assertEqual(index.complete('eng'), [('Sales Engineer', 2)])
+
+        index.add('Site Reliability Engineer')  # triggers a merge that drops the unused keys
+        self.assertEqual([term for term, _ in index.complete('s')], ['Sales Engineer', 'Site Reliability Engineer'])
+
+        index.add('Senior Engineer')
+        self.assertEqual(index.complete('senior'), [('Senior Engineer', 1)])
+
+    def test_keep_unused_completes_seeded_terms(self):
+        index = PrefixIndex(keep_unused=True)
+        index.add('Kubernetes', 0)
+        self.assertEqual(index.complete('kub'), [('Kubernetes', 0)])
@@ -0,0 +1,138 @@
+import re
+from collections import Counter, deque
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+TOKEN_RE = re.compile(r"[A-Za-z]{2,}")
+_WS_RE = re.compile(r"\s+")
+
+# Function words dropped from term counts; they carry no signal for matching or TF-IDF
+STOP_WORDS = frozenset('''
+    about above after again against all also am an and any are as at be because been before being
+    below between both but by can could did do does doing down during each few for from further
+    had has have having he her here hers herself him himself his how if in into is it its itself
+    just me more most my myself no nor not now of off on once only or other our ours ourselves
+    out over own same she should so some such than that the their theirs them themselves then
+    there these they this those through to too under until up very was we well were what when
+    where which while who whom why will with would you your yours yourself yourselves
+'''.split())
+
+
+def tokenize(text: Optional[str]) -> Set[str]:
+    """Lower-cased set of alphabetic tokens (2+ letters) in ``text``"""
+    return set(t.lower() for t in TOKEN_RE.findall(text or ""))
+
+
+def term_counts(text: Optional[str]) -> Dict[str, int]:
+    """Occurrences of each lower-cased alphabetic token in ``text``, stop words excluded"""
+    counts = Counter(t.lower() for t in TOKEN_RE.findall(text or ""))
+    return {term: n for term, n in counts.items() if term not in STOP_WORDS}
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Lower-case and collapse whitespace runs so multi-word patterns match across line breaks"""
+    return _WS_RE.sub(' ', (text or '').lower())
+
+
+def _joins(text: str, i: int, step: int) -> bool:
+    """Whether ``text[i]``, just outside a match, continues the word (``step`` points away from the match).
+
+    Besides letters and digits, ``#`` and ``+`` continue it ("c#" and "c++" are not "c"), and so
+    does ``.`` between word characters ("node.js" is not "js"). A sentence-ending ``.``, or one
+    that starts a token as in ".net", is still a boundary.
+    """
+    ch = text[i]
+    if ch.isalnum() or ch in '#+':
+        return True
+    if ch != '.':
+        return False
+    far = i + step
+    return 0 <= far < len(text) and text[far].isalnum()
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton over a skill dictionary.
+
+    All patterns are matched in a single left-to-right pass over the text.
+    A hit only counts when it sits on word boundaries, so ``go`` does not
+    match inside ``google`` while ``ci/cd`` and ``c++`` still match.
+
+    Each pattern may carry a value (e.g. a canonical skill id) that is
+    reported instead of the surface form; by default the value is the
+    normalized pattern itself.
+    """
+
+    def __init__(self, patterns: Iterable[str], values: Optional[Iterable[Any]] = None):
+        self.patterns: List[str] = []
+        self.values: List[Any] = []
+        self._goto: List[dict] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+
+        patterns = list(patterns)
+        values = list(values) if values is not None else [None] * len(patterns)
+        seen = set()
+        for raw, value in zip(patterns, values):
+            pattern = normalize_text(raw).strip()
+            if not pattern or pattern in seen:
+                continue
+            seen.add(pattern)
+            self._add(pattern, len(self.patterns))
+            self.patterns.append(pattern)
+            self.values.append(pattern if value is None else value)
+        self._build_failure_links()
+
+    def _add(self, pattern: str, index: int):
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = nxt
+        self._out[node] = self._out[node] + (index,)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def finditer(self, text: Optional[str]) -> Iterator[Tuple[int, int, Any]]:
+        """Yield ``(start, end, value)`` for every boundary-aligned match in the normalized text"""
+        haystack = normalize_text(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        patterns, values = self.patterns, self.values
+        size = len(haystack)
+        node = 0
+        for i, ch in enumerate(haystack):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node]:
+                continue
+            end = i + 1
+            if end < size and _joins(haystack, end, 1):
+                continue
+            for index in out[node]:
+                start = end - len(patterns[index])
+                if start > 0 and _joins(haystack, start - 1, -1):
+                    continue
+                yield start, end, values[index]
+
+    def find(self, text: Optional[str]) -> Set[Any]:
+        """Distinct values of the patterns present in ``text``"""
+        return {value for _, _, value in self.finditer(text)}
+
+    def __len__(self):
+        return len(self.patterns)
+
@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import GapAnalysisView
+from .views import GapAnalysisView, SkillDemandView
 
 urlpatterns = [
     path('gap/', GapAnalysisView.as_view(), name='gap-analysis'),
+    path('skill-demand/', SkillDemandView.as_view(), name='skill-demand'),
 ]
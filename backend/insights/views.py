@@ -1,14 +1,12 @@
-import re
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from jobs.models import Job
+from jobs.archive import get_job
+from jobs.descriptions import clean_description
+from jobs.models import SkillDemand
 from resumes.models import Resume
-
-TOKEN_RE = re.compile(r"[A-Za-z]{2,}")
-
-def tokenize(text):
-    return set(t.lower() for t in TOKEN_RE.findall(text or ""))
+from core.taxonomy import get_taxonomy
+from core.text import SkillMatcher, tokenize
 
 class GapAnalysisView(APIView):
     permission_classes=[IsAuthenticated]
@@ -18,15 +16,58 @@ class GapAnalysisView(APIView):
         if not job_id:
             return Response({"detail": "job_id is required"}, status=400)
 
-        try:
-            job = Job.objects.get(id=job_id)
-        except Job.DoesNotExist:
+        job = get_job(job_id)
+        if not job:
             return Response({"detail": "Job not found"}, status=404)
 
-        resume = Resume.objects.filter(user=request.user).order_by('-parsed_at').first()
-        user_tokens = tokenize(resume.text if resume else "")
-        job_tokens = tokenize(job.description_text)
+        resume = None
+        user_id = request.user.get('user_id') if hasattr(request.user, 'get') else None
+        if user_id:
+            resume = Resume.objects(user_id=user_id).order_by('-parsed_at').first()
+        resume_text = resume.get_text() if resume else ""
+        # Cleaned at ingest (markup and boilerplate removed); older jobs are cleaned here
+        job_text = job.description_text or clean_description(job.description)
+
+        user_tokens = tokenize(resume_text)
+        job_tokens = tokenize(job_text)
 
         missing = sorted(list(job_tokens - user_tokens))[:50]
         coverage = round(len(job_tokens & user_tokens) / (len(job_tokens) or 1), 3)
-        return Response({"job_id": job.id, "missing_keywords": missing, "coverage": coverage})
+
+        # Skills the job asks for: explicit requirements plus taxonomy hits in the description,
+        # compared as canonical ids; requirements outside the taxonomy fall back to name matching
+        taxonomy = get_taxonomy()
+        required = job.requirements.required_skills if job.requirements else []
+        job_ids, job_unknown = taxonomy.split(required)
+        job_ids |= taxonomy.extract(job_text)
+        precomputed = resume.precomputed_skills() if resume else None
+        user_ids, user_names = precomputed if precomputed is not None else (taxonomy.extract(resume_text), set())
+        # Skills outside the taxonomy are always looked for in the text as well: the stored names
+        # only hold what the LLM happened to list
+        user_unknown = job_unknown & user_names
+        if job_unknown:
+            user_unknown |= SkillMatcher(job_unknown).find(resume_text)
+
+        missing_skills = taxonomy.names(job_ids - user_ids) + sorted(job_unknown - user_unknown)
+        matched = len(job_ids & user_ids) + len(job_unknown & user_unknown)
+        skill_coverage = round(matched / ((len(job_ids) + len(job_unknown)) or 1), 3)
+
+        return Response({
+            "job_id": job.job_id,
+            "missing_keywords": missing,
+            "coverage": coverage,
+            "missing_skills": missing_skills,
+            "skill_coverage": skill_coverage,
+        })
+
+class SkillDemandView(APIView):
+    permission_classes=[IsAuthenticated]
+
+    def get(self, request):
+        # Maintained incrementally from the job change feed (manage.py run_job_consumers)
+        try:
+            limit = min(100, max(1, int(request.query_params.get("limit", 20))))
+        except ValueError:
+            return Response({"detail": "limit must be an integer"}, status=400)
+        top = SkillDemand.objects(count__gt=0).order_by("-count").limit(limit)
+        return Response({"results": [row.to_dict() for row in top]})
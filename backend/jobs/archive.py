@@ -0,0 +1,164 @@
+"""
+Job lifecycle: expiry and hot/cold archival.
+
+Postings whose ``application_deadline`` has passed are deactivated, and jobs
+that have been inactive for a grace period are moved in batches from
+``jobs`` to ``jobs_archive``. The hot collection, its indexes and the
+recommender corpus then only grow with the live job board.
+
+A batch is copied (idempotent upserts) before it is deleted, and the delete
+re-checks ``is_active``, so an interrupted run or a job reactivated
+mid-batch never loses data; at worst an archived copy is shadowed by the
+hot one. Archived jobs keep their ``job_id`` and stay resolvable through
+``get_job`` for applications that point at them. When
+``JOB_ARCHIVE_TTL_DAYS`` is set, archived jobs no application refers to
+expire through a partial TTL index.
+
+Feed ingestion leaves inactive and archived postings alone
+(``retired_keys``), so a re-ingested feed neither revives them nor
+re-inserts them under a new ``job_id``. Archiving records each feed key in
+``jobs_retired``, a tombstone collection with no TTL, so this still holds
+once the archived copy has expired.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from collections import defaultdict
+from typing import Iterable, Iterator, Optional, Set, Tuple
+
+from django.conf import settings
+from pymongo import ReplaceOne, UpdateOne
+
+from applications.models import Application
+from .models import Job
+
+ARCHIVE_COLLECTION = 'jobs_archive'
+RETIRED_COLLECTION = 'jobs_retired'
+TTL_INDEX = 'archived_at_ttl'
+
+# Bookkeeping fields on archived documents (not part of the Job schema)
+ARCHIVE_FIELDS = ('archived_at', 'referenced')
+
+
+@dataclass
+class ArchiveBatch:
+    archived: int
+    referenced: int
+    skipped: int
+
+
+def archive_collection():
+    return Job._get_db()[ARCHIVE_COLLECTION]
+
+
+def retired_collection():
+    """Tombstones: ``(source, external_id)`` of every archived feed posting, kept past the archive TTL"""
+    return Job._get_db()[RETIRED_COLLECTION]
+
+
+def ensure_archive_indexes(ttl_days: Optional[int] = None):
+    """Create the feed key indexes, and create (or retune, or drop) the TTL index on unreferenced archived jobs"""
+    if ttl_days is None:
+        ttl_days = getattr(settings, 'JOB_ARCHIVE_TTL_DAYS', 0)
+    retired_collection().create_index([('source', 1), ('external_id', 1)], name='source_external_id', unique=True)
+    collection = archive_collection()
+    collection.create_index([('source', 1), ('external_id', 1)], name='source_external_id')
+    existing = collection.index_information()
+    if not ttl_days:
+        if TTL_INDEX in existing:
+            collection.drop_index(TTL_INDEX)
+        return
+    seconds = int(ttl_days) * 86400
+    if TTL_INDEX in existing:
+        if existing[TTL_INDEX].get('expireAfterSeconds') != seconds:
+            Job._get_db().command('collMod', ARCHIVE_COLLECTION,
+                                  index={'name': TTL_INDEX, 'expireAfterSeconds': seconds})
+        return
+    collection.create_index(
+        'archived_at', name=TTL_INDEX, expireAfterSeconds=seconds,
+        partialFilterExpression={'referenced': False},
+    )
+
+
+def expire_jobs(now: Optional[datetime] = None) -> int:
+    """Deactivate active jobs whose application deadline has passed"""
+    now = now or datetime.utcnow()
+    result = Job._get_collection().update_many(
+        {'is_active': True, 'application_deadline': {'$lt': now}},
+        {'$set': {'is_active': False}, '$currentDate': {'updated_at': True}},
+    )
+    return result.modified_count
+
+
+def archive_stale(inactive_for: timedelta, batch_size: int = 500,
+                  dry_run: bool = False) -> Iterator[ArchiveBatch]:
+    """Move jobs inactive for longer than ``inactive_for`` to the archive, one batch at a time"""
+    hot, cold = Job._get_collection(), archive_collection()
+    stale = {'is_active': False, 'updated_at': {'$lt': datetime.utcnow() - inactive_for}}
+    last_id = None
+    while True:
+        query = dict(stale, _id={'$gt': last_id}) if last_id is not None else stale
+        docs = list(hot.find(query).sort('_id', 1).limit(batch_size))
+        if not docs:
+            return
+        ids = [doc['_id'] for doc in docs]
+        last_id = ids[-1]
+        referenced = set(Application.objects(job_id__in=ids).distinct('job_id'))
+        if dry_run:
+            yield ArchiveBatch(archived=len(ids), referenced=len(referenced), skipped=0)
+            continue
+
+        archived_at = datetime.utcnow()
+        # Tombstones first: once a key is retired, ingestion leaves it alone whatever happens next
+        tombstones = [
+            UpdateOne({'source': doc.get('source'), 'external_id': doc['external_id']},
+                      {'$setOnInsert': {'retired_at': archived_at}}, upsert=True)
+            for doc in docs if isinstance(doc.get('external_id'), str)
+        ]
+        if tombstones:
+            retired_collection().bulk_write(tombstones, ordered=False)
+        ops = []
+        for doc in docs:
+            doc['archived_at'] = archived_at
+            doc['referenced'] = doc['_id'] in referenced
+            ops.append(ReplaceOne({'_id': doc['_id']}, doc, upsert=True))
+        cold.bulk_write(ops, ordered=False)
+        deleted = hot.delete_many({'_id': {'$in': ids}, 'is_active': False}).deleted_count
+        yield ArchiveBatch(archived=deleted, referenced=len(referenced), skipped=len(ids) - deleted)
+
+
+def retired_keys(keys: Iterable[Tuple[str, str]]) -> Set[Tuple[str, str]]:
+    """The ``(source, external_id)`` keys among ``keys`` that are inactive, archived or were once archived"""
+    by_source = defaultdict(set)
+    for source, external_id in keys:
+        by_source[source].add(external_id)
+    retired = set()
+    for source, external_ids in by_source.items():
+        # $type matches the partial filter of the hot collection's feed key index
+        query = {'source': source, 'external_id': {'$in': sorted(external_ids), '$type': 'string'}}
+        # The archive covers copies archived before tombstones were recorded
+        lookups = (
+            (Job._get_collection(), {'is_active': False}),
+            (retired_collection(), {}),
+            (archive_collection(), {}),
+        )
+        for collection, extra in lookups:
+            for doc in collection.find(dict(query, **extra), {'_id': 0, 'external_id': 1}):
+                retired.add((source, doc['external_id']))
+    return retired
+
+
+def get_archived_job(job_id: str) -> Optional[Job]:
+    raw = archive_collection().find_one({'_id': job_id})
+    if raw is None:
+        return None
+    for name in ARCHIVE_FIELDS:
+        raw.pop(name, None)
+    return Job._from_son(raw)
+
+
+def get_job(job_id: str, include_archived: bool = True) -> Optional[Job]:
+    """A job by id from the hot collection, falling back to the archive"""
+    job = Job.objects(job_id=job_id).first()
+    if job is None and include_archived:
+        job = get_archived_job(job_id)
+    return job
@@ -0,0 +1,297 @@
+"""
+In-process autocomplete for job titles, company names and skills.
+
+Each vocabulary is a ``PrefixIndex``: a sorted array of normalized keys with
+a parallel array of term ids. A key is made for every word start of a term,
+so "eng" completes "Senior Software Engineer". A query is two ``bisect``
+calls to find the key range, then a top-k by frequency over the range.
+When the range is wide (short prefixes), the terms are walked in
+frequency order instead, and the walk stops at the first ``limit``
+matches. If the matches are too rare for that to pay off, it falls back
+to the range. Results for very short prefixes are memoized until
+the counts change. New terms go to a small unsorted pending list that is
+merged into the sorted array once it grows, so updates never re-sort the
+whole index.
+
+Titles and companies whose count drops to zero (every job carrying them was
+deleted or deactivated) are never suggested, and their keys are dropped at
+the next merge; they are indexed again if a job brings them back.
+
+Frequencies are the number of active jobs carrying a title, a company or a
+required skill. The whole skill taxonomy is seeded with a count of zero, so
+a known skill completes before any job asks for it. ``JobAutocomplete`` is
+built from Mongo once and then kept current by a background thread that
+follows the job change feed (jobs.changefeed). Each job's previous
+contribution is subtracted, so updates and deactivations never
+double-count. Requests are served from memory only.
+"""
+import heapq
+import logging
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+from core.taxonomy import get_taxonomy
+
+from .changefeed import POLL_LAG, JobChangeFeed
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('title', 'company', 'skill')
+
+_NON_KEY_RE = re.compile(r"[^a-z0-9+#.\s]+")
+
+# Prefixes up to this length have wide ranges; their top results are memoized
+MEMO_PREFIX_LEN = 2
+
+# Key ranges wider than this are answered by walking terms in frequency order
+WALK_MIN_RANGE = 2000
+
+
+def normalize_term(text: Optional[str]) -> str:
+    """Lower-case ASCII words; ``+ # .`` are kept for skills like c++, c# and node.js"""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii').lower()
+    return ' '.join(_NON_KEY_RE.sub(' ', text).split())
+
+
+class PrefixIndex:
+    """Frequency-ranked completions over a growing vocabulary.
+
+    ``keep_unused`` keeps completing terms whose count is zero (the seeded
+    skill vocabulary); otherwise only terms some active job carries complete.
+    """
+
+    def __init__(self, compact_at: int = 2000, keep_unused: bool = False):
+        self.compact_at = compact_at
+        self.keep_unused = keep_unused
+        self._terms: List[str] = []        # display form, by term id
+        self._counts: List[int] = []       # frequency, by term id
+        self._ids: Dict[str, int] = {}     # normalized term -> term id
+        self._keys: List[str] = []         # sorted word-start keys
+        self._key_ids: List[int] = []      # term id per key
+        self._pending: List[Tuple[str, int]] = []
+        self._suffixes: List[Tuple[str, ...]] = []  # word-start keys, by term id
+        self._indexed: List[bool] = []     # whether the term's keys are in _keys or _pending, by term id
+        self._by_count: List[int] = []     # term ids, most frequent first as of the last rank()
+        self._memo: Dict[Tuple[str, int], List[Tuple[str, int]]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._terms)
+
+    def add(self, term: Optional[str], delta: int = 1):
+        norm = normalize_term(term)
+        if not norm:
+            return
+        with self._lock:
+            term_id = self._ids.get(norm)
+            if term_id is None:
+                term_id = len(self._terms)
+                self._ids[norm] = term_id
+                self._terms.append(term.strip())
+                self._counts.append(0)
+                words = norm.split(' ')
+                suffixes = tuple(' '.join(words[i:]) for i in range(len(words)))
+                self._suffixes.append(suffixes)
+                self._indexed.append(True)
+                self._by_count.append(term_id)
+                self._pending.extend((suffix, term_id) for suffix in suffixes)
+            self._counts[term_id] = max(0, self._counts[term_id] + delta)
+            if self._counts[term_id] and not self._indexed[term_id]:
+                # Back after its keys were dropped as unused
+                self._indexed[term_id] = True
+                self._pending.extend((suffix, term_id) for suffix in self._suffixes[term_id])
+            if len(self._pending) >= self.compact_at:
+                self._compact()
+            if self._memo:
+                self._memo.clear()
+
+    def rank(self):
+        """Re-sort the frequency order used for wide ranges (after a batch of updates)"""
+        counts = self._counts
+        by_count = sorted(range(len(counts)), key=lambda term_id: (-counts[term_id], term_id))
+        with self._lock:
+            self._by_count = by_count
+            self._memo.clear()
+
+    def _compact(self):
+        merged = list(heapq.merge(zip(self._keys, self._key_ids), sorted(self._pending)))
+        if not self.keep_unused:
+            counts, kept = self._counts, []
+            for key, term_id in merged:
+                if counts[term_id]:
+                    kept.append((key, term_id))
+                else:
+                    self._indexed[term_id] = False
+            merged = kept
+        self._keys = [key for key, _ in merged]
+        self._key_ids = [term_id for _, term_id in merged]
+        self._pending = []
+
+    def complete(self, prefix: Optional[str], limit: int = 8) -> List[Tuple[str, int]]:
+        """``(term, count)`` for terms with a word starting with ``prefix``, most frequent first"""
+        prefix = normalize_term(prefix)
+        if not prefix:
+            return []
+        with self._lock:
+            memo_key = (prefix, limit)
+            if memo_key in self._memo:
+                return self._memo[memo_key]
+            lo = bisect_left(self._keys, prefix)
+            hi = bisect_left(self._keys, prefix + '\uffff', lo)
+            counts = self._counts
+            best = self._walk(prefix, limit, budget=hi - lo) if hi - lo > WALK_MIN_RANGE else None
+            if best is None:
+                candidates = set(self._key_ids[lo:hi])
+                candidates.update(term_id for key, term_id in self._pending if key.startswith(prefix))
+                if not self.keep_unused:
+                    candidates = {term_id for term_id in candidates if counts[term_id]}
+                best = heapq.nlargest(limit, candidates, key=lambda term_id: (counts[term_id], -term_id))
+            result = [(self._terms[term_id], counts[term_id]) for term_id in best]
+            if len(prefix) <= MEMO_PREFIX_LEN:
+                self._memo[memo_key] = result
+            return result
+
+
+    def _walk(self, prefix: str, limit: int, budget: int) -> Optional[List[int]]:
+        """Top matches by walking terms in frequency order; None if ``budget`` terms did not settle it"""
+        found = []
+        counts = self._counts
+        for checked, term_id in enumerate(self._by_count):
+            if checked >= budget:
+                return None
+            if not counts[term_id] and not self.keep_unused:
+                continue
+            if any(suffix.startswith(prefix) for suffix in self._suffixes[term_id]):
+                found.append(term_id)
+                if len(found) == limit:
+                    break
+        return found
+
+
+def contribution(raw: dict) -> Dict[str, Tuple[str, ...]]:
+    """What one raw job document adds to each vocabulary (nothing when inactive)"""
+    if not raw.get('is_active', True):
+        return {}
+    requirements = raw.get('requirements') or {}
+    taxonomy = get_taxonomy()
+    skills = tuple(taxonomy.name(skill_id) for skill_id in requirements.get('required_skill_ids') or [])
+    return {
+        'title': (raw['title'],) if raw.get('title') else (),
+        'company': ((raw.get('company') or {}).get('name'),) if (raw.get('company') or {}).get('name') else (),
+        'skill': tuple(name for name in skills if name),
+    }
+
+
+class JobAutocomplete:
+    FIELDS = ('job_id', 'title', 'company.name', 'requirements.required_skill_ids', 'is_active', 'updated_at')
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self.indexes = self._new_indexes()
+        self._seen: Dict[str, Dict[str, Tuple[str, ...]]] = {}
+        self._feed = None
+        self.ready = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    @staticmethod
+    def _new_indexes() -> Dict[str, PrefixIndex]:
+        # Skills are seeded from the taxonomy at zero on purpose; titles and companies need a live job
+        return {kind: PrefixIndex(keep_unused=kind == 'skill') for kind in KINDS}
+
+    def apply(self, raw: dict):
+        """Fold one (raw) job insert, update or deactivation into the vocabularies"""
+        job_id = raw['_id']
+        new = contribution(raw)
+        old = self._seen.pop(job_id, {})
+        for kind in KINDS:
+            before, after = old.get(kind, ()), new.get(kind, ())
+            if before == after:
+                continue
+            for term in before:
+                self.indexes[kind].add(term, -1)
+            for term in after:
+                self.indexes[kind].add(term, 1)
+        if new:
+            self._seen[job_id] = new
+
+    def build(self):
+        # Changes made while the scan runs are read again from the feed; applying is idempotent
+        self._feed = JobChangeFeed(fields=self.FIELDS, since=datetime.utcnow() - POLL_LAG)
+        for entry in get_taxonomy().entries():
+            self.indexes['skill'].add(entry.name, 0)
+        for raw in Job.objects(is_active=True).only(*self.FIELDS).as_pymongo().no_cache():
+            self.apply(raw)
+        for index in self.indexes.values():
+            index.rank()
+
+    def refresh(self):
+        """Apply the job changes the feed has seen since the last pass"""
+        applied = 0
+        while True:
+            changes = self._feed.next_batch(wait=0)
+            if not changes:
+                break
+            for change in changes:
+                self.apply(change.doc or {'_id': change.job_id, 'is_active': False})
+            applied += len(changes)
+        if applied:
+            for index in self.indexes.values():
+                index.rank()
+
+    def complete(self, prefix: str, kinds: Iterable[str] = KINDS, limit: int = 8) -> Dict[str, List[dict]]:
+        return {
+            kind: [{'value': term, 'count': count} for term, count in self.indexes[kind].complete(prefix, limit)]
+            for kind in kinds
+        }
+
+    def start(self):
+        """Build and keep refreshing in a daemon thread (idempotent)"""
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='job-autocomplete', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self.ready.is_set():
+            try:
+                started = time.monotonic()
+                self.build()
+                self.ready.set()
+                logger.info("Job autocomplete built in %.0f ms (%s)", (time.monotonic() - started) * 1000,
+                            ', '.join(f"{kind}: {len(index)}" for kind, index in self.indexes.items()))
+            except Exception:
+                logger.exception("Job autocomplete build failed; retrying")
+                self.indexes = self._new_indexes()
+                self._seen = {}
+                if self._feed is not None:
+                    self._feed.close()
+                time.sleep(self.refresh_interval)
+        while True:
+            time.sleep(self.refresh_interval)
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Job autocomplete refresh failed")
+
+
+_autocomplete = None
+_autocomplete_lock = threading.Lock()
+
+
+def job_autocomplete() -> JobAutocomplete:
+    """Process-wide autocomplete, started on first use"""
+    global _autocomplete
+    with _autocomplete_lock:
+        if _autocomplete is None:
+            _autocomplete = JobAutocomplete(getattr(settings, 'JOB_AUTOCOMPLETE_REFRESH_INTERVAL', 30))
+    _autocomplete.start()
+    return _autocomplete
@@ -0,0 +1,196 @@
+"""
+Materialized JSON for jobs.
+
+Jobs change rarely but are rendered on every view, so the encoded bytes of
+each job representation (the ``to_dict`` detail payload and the list row)
+are cached per job and version. The version is the job's ``updated_at``,
+which ``Job.save()`` bumps: a saved job gets new keys and its old entries
+simply age out, so there is no explicit invalidation to get wrong. Writes
+that bypass ``save()`` must bump ``updated_at`` themselves. The exceptions
+are the ``LIVE_FIELDS`` counters, which are incremented without a version
+bump (core.counters). They are kept out of the cached bytes and spliced in
+from the version lookup on every response.
+
+Two tiers: a bounded in-process LRU in front of a Django cache alias (Redis
+when ``REDIS_URL`` is set, local memory otherwise). List responses are
+assembled by concatenating cached row fragments; only rows that miss both
+tiers are fetched and encoded.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from core.renderers import dumps
+
+logger = logging.getLogger(__name__)
+
+# Counters updated by buffered $inc without bumping updated_at; never cached, read with the version
+LIVE_FIELDS = ('view_count', 'application_count')
+
+
+class LRUCache:
+    """Thread-safe mapping holding at most ``max_entries`` recently used items"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                value = self._data.get(key)
+                if value is not None:
+                    self._data.move_to_end(key)
+                    found[key] = value
+        return found
+
+    def set_many(self, mapping: Dict[str, bytes]):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            for key, value in mapping.items():
+                self._data[key] = value
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class CacheMetrics:
+    COUNTERS = ('lru_hits', 'shared_hits', 'misses', 'shared_errors')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counters = {name: 0 for name in self.COUNTERS}
+
+    def incr(self, name: str, amount: int = 1):
+        if amount:
+            with self._lock:
+                self._counters[name] += amount
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            data = dict(self._counters)
+        lookups = data['lru_hits'] + data['shared_hits'] + data['misses']
+        data['lookups'] = lookups
+        data['hit_rate'] = round((data['lru_hits'] + data['shared_hits']) / lookups, 4) if lookups else 0.0
+        return data
+
+
+def version_of(updated_at) -> str:
+    return updated_at.strftime('%Y%m%d%H%M%S%f') if updated_at else '0'
+
+
+class JobJSONCache:
+    def __init__(self, lru_size: int, alias: Optional[str], timeout: int):
+        self.lru = LRUCache(lru_size)
+        self.alias = alias
+        self.timeout = timeout
+        self.metrics = CacheMetrics()
+
+    @staticmethod
+    def key(shape: str, job_id: str, updated_at) -> str:
+        return f"jobjson:{shape}:{job_id}:{version_of(updated_at)}"
+
+    def _shared(self):
+        return caches[self.alias] if self.alias else None
+
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        found = self.lru.get_many(keys)
+        self.metrics.incr('lru_hits', len(found))
+        missing = [k for k in keys if k not in found]
+        shared = self._shared()
+        if missing and shared is not None:
+            try:
+                from_shared = shared.get_many(missing)
+            except Exception:
+                logger.warning("Job JSON cache backend unavailable", exc_info=True)
+                self.metrics.incr('shared_errors')
+                from_shared = {}
+            if from_shared:
+                self.lru.set_many(from_shared)
+                found.update(from_shared)
+            self.metrics.incr('shared_hits', len(from_shared))
+        self.metrics.incr('misses', len(keys) - len(found))
+        return found
+
+    def set_many(self, mapping: Dict[str, bytes]):
+        if not mapping:
+            return
+        self.lru.set_many(mapping)
+        shared = self._shared()
+        if shared is not None:
+            try:
+                shared.set_many(mapping, self.timeout)
+            except Exception:
+                logger.warning("Job JSON cache backend unavailable", exc_info=True)
+                self.metrics.incr('shared_errors')
+
+    def fragments(self, shape: str, refs: List[dict], load: Callable[[List[str]], Dict[str, dict]]) -> List[bytes]:
+        """Encoded fragments for ``refs`` (raw ``{_id, updated_at, *LIVE_FIELDS}`` dicts), in order.
+
+        ``load`` receives the job ids that missed both tiers and returns their
+        representation dicts keyed by job id; those are encoded and cached
+        without the ``LIVE_FIELDS``, which are taken from each ref instead.
+        """
+        keys = [self.key(shape, ref['_id'], ref.get('updated_at')) for ref in refs]
+        found = self.get_many(keys)
+        missing = [ref['_id'] for ref, key in zip(refs, keys) if key not in found]
+        if missing:
+            loaded = load(missing)
+            fresh = {}
+            for ref, key in zip(refs, keys):
+                if key not in found and ref['_id'] in loaded:
+                    data = loaded[ref['_id']]
+                    fresh[key] = dumps({name: value for name, value in data.items() if name not in LIVE_FIELDS})
+            self.set_many(fresh)
+            found.update(fresh)
+        return [with_live_fields(found[key], ref) for ref, key in zip(refs, keys) if key in found]
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def job_json_cache() -> JobJSONCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = JobJSONCache(
+                lru_size=getattr(settings, 'JOB_JSON_CACHE_LRU_SIZE', 2000),
+                alias=getattr(settings, 'JOB_JSON_CACHE_ALIAS', 'default'),
+                timeout=getattr(settings, 'JOB_JSON_CACHE_TIMEOUT', 3600),
+            )
+        return _cache
+
+
+def with_live_fields(fragment: bytes, ref: dict) -> bytes:
+    """A cached object fragment with the current ``LIVE_FIELDS`` of ``ref`` appended"""
+    live = dumps({name: ref.get(name) or 0 for name in LIVE_FIELDS})
+    return fragment[:-1] + (b',' if len(fragment) > 2 else b'') + live[1:]
+
+
+def json_array(fragments: List[bytes]) -> bytes:
+    return b'[' + b','.join(fragments) + b']'
+
+
+def json_page(meta: dict, fragments: List[bytes]) -> bytes:
+    """``meta`` plus a ``results`` array spliced from already-encoded fragments"""
+    head = dumps(meta)
+    return head[:-1] + (b',' if meta else b'') + b'"results":' + json_array(fragments) + b'}'
@@ -0,0 +1,196 @@
+"""
+Change feed over the ``jobs`` collection.
+
+Derived structures such as skill demand counts and the autocomplete
+vocabularies follow job inserts, updates and deactivations through
+``JobChangeFeed`` instead of rescanning the collection. Two sources are
+supported:
+
+* ``stream``: a MongoDB change stream. This needs a replica set; a
+  single-node one works locally. Deletes are visible, and the position is
+  the stream's resume token.
+* ``poll``: keyset reads in ``(updated_at, _id)`` order past the last
+  position, lagging ``POLL_LAG`` (``JOB_FEED_POLL_LAG``) behind the clock so
+  in-flight writes are not skipped. Every write path bumps ``updated_at``
+  when it writes (bulk writes with ``$currentDate``), so the lag only has to
+  cover write latency and clock skew with the server. Hard deletes are
+  not visible, but jobs are deactivated before they are archived, and
+  consumers treat inactive jobs as gone.
+
+``auto`` picks the stream when the server supports it. A stream with no
+token, or one whose history has rolled off the oplog, is opened first and
+then caught up by polling from the last mark, so nothing is missed in
+between. Named consumers persist their position in ``JobFeedPosition``
+after each batch they apply.
+
+Delivery is at least once, so consumers must be idempotent: each change
+carries the job's current state, not a diff.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, List, Optional
+
+from django.conf import settings
+from pymongo.errors import OperationFailure, PyMongoError
+
+from core.projections import _resolve
+from .models import Job, JobFeedPosition
+
+logger = logging.getLogger(__name__)
+
+POLL_LAG = timedelta(seconds=getattr(settings, 'JOB_FEED_POLL_LAG', 2))
+
+# Change stream errors after which the resume token is useless
+HISTORY_LOST_CODES = (136, 280, 286)
+
+
+@dataclass
+class JobChange:
+    op: str                 # 'insert' | 'update' | 'replace' | 'delete'
+    job_id: str
+    doc: Optional[dict]     # current state (projected); None for deletes
+
+
+def supports_change_streams() -> bool:
+    hello = Job._get_db().command('hello')
+    return bool(hello.get('setName')) or hello.get('msg') == 'isdbgrid'
+
+
+class JobChangeFeed:
+    def __init__(self, consumer: Optional[str] = None, fields: Optional[Iterable[str]] = None,
+                 mode: str = 'auto', batch_size: int = 500, since: Optional[datetime] = None):
+        """``consumer`` names a persisted position; without one, reading starts at ``since``"""
+        self.consumer = consumer
+        self.batch_size = batch_size
+        self.collection = Job._get_collection()
+        self.projection = None
+        if fields:
+            self.projection = {'.'.join(_resolve(Job, name)): 1 for name in fields}
+            self.projection['updated_at'] = 1
+
+        self.position = JobFeedPosition.objects(consumer=consumer).first() if consumer else None
+        if self.position is None:
+            self.position = JobFeedPosition(consumer=consumer, updated_at_mark=since)
+        if mode == 'auto':
+            mode = 'stream' if supports_change_streams() else 'poll'
+        self.mode = mode
+        self._stream = None
+        self._catching_up = False
+
+    # Polling
+
+    def _poll(self) -> List[JobChange]:
+        mark, last_id = self.position.updated_at_mark, self.position.last_job_id or ''
+        clauses = [{'updated_at': {'$lte': datetime.utcnow() - POLL_LAG}}]
+        if mark is not None:
+            clauses.append({'$or': [{'updated_at': {'$gt': mark}}, {'updated_at': mark, '_id': {'$gt': last_id}}]})
+        docs = list(
+            self.collection.find({'$and': clauses}, self.projection)
+            .sort([('updated_at', 1), ('_id', 1)])
+            .limit(self.batch_size)
+        )
+        if docs:
+            self.position.updated_at_mark = docs[-1]['updated_at']
+            self.position.last_job_id = docs[-1]['_id']
+        return [JobChange('update', doc['_id'], doc) for doc in docs]
+
+    # Change stream
+
+    def _open_stream(self):
+        pipeline = [{'$match': {'operationType': {'$in': ['insert', 'update', 'replace', 'delete']}}}]
+        if self.projection:
+            keep = {'operationType': 1, 'documentKey': 1}
+            keep.update({f'fullDocument.{path}': 1 for path in self.projection})
+            pipeline.append({'$project': keep})
+        token = self.position.resume_token or None
+        self._stream = self.collection.watch(
+            pipeline, full_document='updateLookup', resume_after=token, max_await_time_ms=1000,
+        )
+        # Without a usable token, poll from the last mark until caught up; the stream is
+        # already open, so changes made meanwhile are read from it afterwards
+        self._catching_up = token is None
+
+    def _read_stream(self, wait: float) -> List[JobChange]:
+        changes = []
+        deadline = time.monotonic() + wait
+        while len(changes) < self.batch_size:
+            event = self._stream.try_next()
+            if event is None:
+                if changes or time.monotonic() >= deadline:
+                    break
+                continue
+            doc = event.get('fullDocument')
+            op = event['operationType']
+            if doc is None and op != 'delete':
+                op = 'delete'  # deleted before the lookup ran
+            changes.append(JobChange(op, event['documentKey']['_id'], doc))
+            if doc and doc.get('updated_at'):
+                self.position.updated_at_mark = doc['updated_at']
+                self.position.last_job_id = doc['_id']
+        if self._stream.resume_token is not None:
+            self.position.resume_token = dict(self._stream.resume_token)
+        return changes
+
+    def next_batch(self, wait: float = 1.0) -> List[JobChange]:
+        """Up to ``batch_size`` changes; waits up to ``wait`` seconds when there are none"""
+        if self.mode == 'poll':
+            changes = self._poll()
+            if not changes and wait:
+                time.sleep(wait)
+            return changes
+        try:
+            if self._stream is None:
+                self._open_stream()
+            if self._catching_up:
+                changes = self._poll()
+                if changes:
+                    return changes
+                self._catching_up = False
+            return self._read_stream(wait)
+        except OperationFailure as e:
+            if e.code not in HISTORY_LOST_CODES:
+                raise
+            logger.warning("Job change stream for %s cannot resume (%s); catching up by polling",
+                           self.consumer or 'anonymous consumer', e)
+            self.close()
+            self.position.resume_token = None
+            return []
+
+    def commit(self, applied: int = 0):
+        """Persist the position (named consumers only); call after a batch is applied"""
+        if not self.consumer:
+            return
+        self.position.mode = self.mode
+        self.position.applied = (self.position.applied or 0) + applied
+        self.position.updated_at = datetime.utcnow()
+        self.position.save()
+
+    def close(self):
+        if self._stream is not None:
+            try:
+                self._stream.close()
+            except PyMongoError:
+                pass
+            self._stream = None
+
+
+def run(consumer, mode: str = 'auto', wait: float = 1.0, once: bool = False,
+        should_stop: Callable[[], bool] = lambda: False) -> int:
+    """Feed ``consumer`` batches until stopped (or, with ``once``, until caught up)"""
+    feed = JobChangeFeed(consumer.name, consumer.fields, mode)
+    applied = 0
+    try:
+        while not should_stop():
+            changes = feed.next_batch(0 if once else wait)
+            if changes:
+                consumer.apply(changes)
+                applied += len(changes)
+                feed.commit(len(changes))
+            elif once and not feed._catching_up:
+                feed.commit()
+                break
+    finally:
+        feed.close()
+    return applied
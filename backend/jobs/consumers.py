@@ -0,0 +1,150 @@
+"""
+Change-feed consumers that keep derived job data current (see jobs.changefeed).
+
+A consumer has a ``name`` (its persisted feed position), the job ``fields``
+it needs, and an idempotent ``apply(changes)``. Run them with
+``manage.py run_job_consumers``.
+
+Not everything derived from jobs needs a consumer. The recommender scores
+jobs from fields written with each job (cleaned description term counts,
+skill ids), the job JSON cache is keyed on ``updated_at``, and the
+autocomplete follows the feed in each web process itself. There is no
+dedupe signature store to maintain.
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List
+
+from pymongo import DeleteOne, ReplaceOne, UpdateOne
+
+from core.taxonomy import get_taxonomy
+from .changefeed import JobChange
+from .models import Job, SkillDemand
+from .search import bump_facets_generation
+
+
+class SkillDemandConsumer:
+    """Counts of active jobs per required skill (``SkillDemand``).
+
+    The skills each job last contributed are remembered in
+    ``skill_demand_jobs``, and a batch applies ``$inc`` deltas from the
+    difference between that memory and the new skills. The memory is written
+    first with a ``pending`` marker (the skills it replaced), then the counts
+    are incremented, then the marker is cleared. A replayed batch finds the
+    memory already current and adds nothing; markers left by a crash are
+    resolved by recounting just their skills before the next batch.
+    """
+    name = 'skill_demand'
+    fields = ('job_id', 'is_active', 'requirements.required_skill_ids')
+    MEMORY_COLLECTION = 'skill_demand_jobs'
+
+    def __init__(self):
+        self.memory = Job._get_db()[self.MEMORY_COLLECTION]
+        self.memory.create_index('skills')
+        self.memory.create_index('pending', sparse=True)
+        self.demand = SkillDemand._get_collection()
+
+    def apply(self, changes: List[JobChange]):
+        self._recover()
+
+        latest: Dict[str, List[int]] = {}
+        for change in changes:
+            doc = change.doc
+            active = bool(doc) and doc.get('is_active', True)
+            skills = ((doc.get('requirements') or {}).get('required_skill_ids') or []) if active else []
+            latest[change.job_id] = sorted(set(skills))
+
+        previous = {
+            row['_id']: row.get('skills', [])
+            for row in self.memory.find({'_id': {'$in': list(latest)}})
+        }
+        deltas: Counter = Counter()
+        changed: Dict[str, List[int]] = {}
+        for job_id, skills in latest.items():
+            before = previous.get(job_id, [])
+            if set(before) == set(skills):
+                continue
+            changed[job_id] = skills
+            deltas.update(set(skills) - set(before))
+            deltas.subtract(set(before) - set(skills))
+        if not changed:
+            return
+
+        # Memory first: once it is current a replay of this batch finds nothing to add
+        self.memory.bulk_write([
+            ReplaceOne({'_id': job_id}, {'_id': job_id, 'skills': skills, 'pending': {'before': previous.get(job_id, [])}},
+                       upsert=True)
+            for job_id, skills in changed.items()
+        ], ordered=False)
+
+        self._increment({skill_id: n for skill_id, n in deltas.items() if n})
+        self._settle(changed)
+
+    def _increment(self, deltas: Dict[int, int]):
+        if not deltas:
+            return
+        now = datetime.utcnow()
+        taxonomy = get_taxonomy()
+        self.demand.bulk_write([
+            UpdateOne(
+                {'_id': skill_id},
+                {'$inc': {'count': n}, '$set': {'name': taxonomy.name(skill_id), 'updated_at': now}},
+                upsert=True,
+            )
+            for skill_id, n in sorted(deltas.items())
+        ], ordered=False)
+
+    def _settle(self, changed: Dict[str, List[int]]):
+        """Clear the pending markers of ``changed`` jobs; jobs left without skills are forgotten"""
+        self.memory.bulk_write([
+            UpdateOne({'_id': job_id}, {'$unset': {'pending': ''}}) if skills else DeleteOne({'_id': job_id})
+            for job_id, skills in changed.items()
+        ], ordered=False)
+
+    def _recover(self):
+        """Recount the skills of jobs whose last batch stopped before clearing its markers.
+
+        Whether those increments landed is unknown, but the memory is already
+        current, so the counts of their old and new skills are taken from it.
+        """
+        stuck = list(self.memory.find({'pending': {'$exists': True}}))
+        if not stuck:
+            return
+        touched = set()
+        for row in stuck:
+            touched |= set(row.get('skills', [])) | set(row['pending'].get('before', []))
+        now = datetime.utcnow()
+        taxonomy = get_taxonomy()
+        if touched:
+            self.demand.bulk_write([
+                UpdateOne(
+                    {'_id': skill_id},
+                    {'$set': {
+                        'count': self.memory.count_documents({'skills': skill_id}),
+                        'name': taxonomy.name(skill_id),
+                        'updated_at': now,
+                    }},
+                    upsert=True,
+                )
+                for skill_id in sorted(touched)
+            ], ordered=False)
+        self._settle({row['_id']: row.get('skills', []) for row in stuck})
+
+
+class SearchFacetCacheConsumer:
+    """Drops cached search facets (jobs.search) whenever jobs change.
+
+    Facets are cached per query, so each batch bumps one generation number
+    that invalidates them all; a replay only bumps it again. The cache has to
+    be shared with the web processes (Redis); with the local-memory default
+    cache only the facet TTL applies.
+    """
+    name = 'search_facets'
+    fields = ('job_id',)
+
+    def apply(self, changes: List[JobChange]):
+        if changes:
+            bump_facets_generation()
+
+
+CONSUMERS = {consumer.name: consumer for consumer in (SkillDemandConsumer, SearchFacetCacheConsumer)}
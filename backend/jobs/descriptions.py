@@ -0,0 +1,171 @@
+"""
+Job description normalization at ingest.
+
+Scraped descriptions arrive as HTML or plain text, and the same EEO,
+benefits and "about us" paragraphs are repeated across postings.
+``clean_description`` turns the markup into one paragraph per line of plain
+text. It then drops every paragraph whose hash is in the learned
+boilerplate set.
+
+The set holds paragraphs that are long enough to be prose and recur in at
+least ``min_postings`` distinct postings. A posting is a (company, title)
+pair, so one job syndicated to many cities counts once. The set is learned
+with ``manage.py learn_boilerplate`` and shared through the
+``description_boilerplate`` collection. Each process reloads it every
+``DESCRIPTION_BOILERPLATE_RELOAD`` seconds.
+
+Jobs store the result as ``description_text`` along with its term counts.
+The text index and the TF-IDF and gap consumers then never see markup or
+boilerplate, and never tokenize a description per request.
+"""
+import hashlib
+import html
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from html.parser import HTMLParser
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from mongoengine.connection import get_db
+from pymongo import ReplaceOne
+
+BOILERPLATE_COLLECTION = 'description_boilerplate'
+
+# Shorter paragraphs (headings, single-skill bullets) are never treated as boilerplate
+MIN_BOILERPLATE_WORDS = 8
+
+BLOCK_TAGS = frozenset((
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'footer', 'h1', 'h2',
+    'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'ol', 'p', 'pre', 'section', 'table', 'td', 'th',
+    'tr', 'ul',
+))
+SKIP_TAGS = frozenset(('head', 'noscript', 'script', 'style', 'template'))
+
+_TAG_RE = re.compile(r"<(?:/?[A-Za-z][A-Za-z0-9]*[\s/>]|!--)")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+class _TextExtractor(HTMLParser):
+    """Text content of an HTML fragment, with a line break at every block boundary"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skipping += 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skipping = max(0, self._skipping - 1)
+        elif tag in BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+
+def html_to_text(text: Optional[str]) -> str:
+    """Plain text of ``text``; markup is stripped and entities are decoded (plain text passes through)"""
+    text = text or ''
+    if not _TAG_RE.search(text):
+        return html.unescape(text)
+    parser = _TextExtractor()
+    parser.feed(text)
+    parser.close()
+    return ''.join(parser.parts)
+
+
+def paragraphs(text: str) -> List[str]:
+    """Non-empty lines of ``text`` with whitespace runs collapsed"""
+    return [line for line in (' '.join(raw.split()) for raw in text.splitlines()) if line]
+
+
+def paragraph_key(paragraph: str) -> Optional[str]:
+    """Hash of a paragraph's lower-cased words; None when it is too short to be boilerplate"""
+    words = _WORD_RE.findall(paragraph.lower())
+    if len(words) < MIN_BOILERPLATE_WORDS:
+        return None
+    return hashlib.blake2b(' '.join(words).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def clean_description(description: Optional[str], boilerplate: Optional[FrozenSet[str]] = None) -> str:
+    """Plain-text ``description`` without known boilerplate paragraphs.
+
+    ``boilerplate`` defaults to the shared learned set. A description made only of
+    boilerplate keeps its paragraphs, so a job never ends up without text.
+    """
+    known = boilerplate_keys() if boilerplate is None else boilerplate
+    lines = paragraphs(html_to_text(description))
+    kept = [line for line in lines if paragraph_key(line) not in known]
+    return '\n'.join(kept or lines)
+
+
+# Learning
+
+def learn(postings: Iterable[Tuple[Hashable, Optional[str]]], min_postings: int) -> Dict[str, Tuple[int, str]]:
+    """``{key: (postings, sample paragraph)}`` for paragraphs shared by ``min_postings`` or more.
+
+    ``postings`` yields ``(posting key, description)``; repeated descriptions under one posting
+    key (the same job listed in several places) count once.
+    """
+    seen: Dict[Hashable, set] = {}
+    counts: Counter = Counter()
+    samples: Dict[str, str] = {}
+    for posting, description in postings:
+        keys = seen.setdefault(posting, set())
+        for line in paragraphs(html_to_text(description)):
+            key = paragraph_key(line)
+            if key is None or key in keys:
+                continue
+            keys.add(key)
+            counts[key] += 1
+            if counts[key] == min_postings:
+                samples[key] = line
+    return {key: (n, samples[key]) for key, n in counts.items() if n >= min_postings}
+
+
+def save_boilerplate(learned: Dict[str, Tuple[int, str]]) -> int:
+    """Replace the shared boilerplate set; returns the number of paragraphs dropped from it"""
+    collection = get_db()[BOILERPLATE_COLLECTION]
+    now = datetime.utcnow()
+    if learned:
+        collection.bulk_write([
+            ReplaceOne({'_id': key}, {'_id': key, 'postings': n, 'sample': sample[:500], 'learned_at': now}, upsert=True)
+            for key, (n, sample) in learned.items()
+        ], ordered=False)
+    dropped = collection.delete_many({'_id': {'$nin': list(learned)}}).deleted_count
+    _reset()
+    return dropped
+
+
+# Shared set
+
+_keys: FrozenSet[str] = frozenset()
+_loaded_at: Optional[float] = None
+_keys_lock = threading.Lock()
+
+
+def boilerplate_keys() -> FrozenSet[str]:
+    """The learned boilerplate paragraph keys, reloaded every ``DESCRIPTION_BOILERPLATE_RELOAD`` seconds"""
+    global _keys, _loaded_at
+    with _keys_lock:
+        now = time.monotonic()
+        if _loaded_at is None or now - _loaded_at >= getattr(settings, 'DESCRIPTION_BOILERPLATE_RELOAD', 300):
+            _keys = frozenset(row['_id'] for row in get_db()[BOILERPLATE_COLLECTION].find({}, {'_id': 1}))
+            _loaded_at = now
+        return _keys
+
+
+def _reset():
+    global _loaded_at
+    with _keys_lock:
+        _loaded_at = None
@@ -0,0 +1,363 @@
+"""
+Streaming job feed ingestion.
+
+Rows are read lazily from CSV or JSONL (optionally gzipped, or stdin),
+mapped onto the ``Job`` schema and validated in chunks on a process pool,
+then written with unordered ``bulk_write`` upserts keyed on
+(``source``, ``external_id``). Only a bounded number of chunks is in flight
+and at most one write batch is buffered, so memory stays flat however long
+the feed is. Re-ingesting a feed updates the fields it supplies in place;
+``created_at``, the analytics counters, ``is_active`` and every other field
+the feed leaves out are only set when a job is first inserted. Rows without
+an external id or url are keyed on a hash of their source, title, company
+and location. Postings that expired or were archived (jobs.archive) are
+skipped, and rows whose application deadline has passed are stored
+inactive.
+"""
+import csv
+import gzip
+import hashlib
+import io
+import itertools
+import json
+import multiprocessing
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from mongoengine.errors import FieldDoesNotExist, ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from .archive import retired_keys
+from .models import CompanyInfo, Job, JobRequirements, SalaryInfo
+
+# Fields recomputed from the row on every upsert. Everything else the row does not supply
+# (lifecycle, counters, model defaults such as is_active or country) is written on insert only.
+# updated_at is stamped by the server when the write is applied ($currentDate), so the polling
+# change feed (jobs.changefeed) never sees a row committed long after its timestamp
+DERIVED_FIELDS = ('description_text', 'description_terms', 'description_tokens', 'search_terms', 'geo')
+
+csv.field_size_limit(16 * 1024 * 1024)
+
+_LIST_SPLIT_RE = re.compile(r"[;,|]")
+
+
+class RowError(ValueError):
+    """A feed row that cannot be mapped onto a Job"""
+
+
+@dataclass
+class IngestStats:
+    rows: int = 0
+    accepted: int = 0
+    rejected: int = 0
+    skipped: int = 0      # inactive or archived postings left untouched
+    inserted: int = 0
+    updated: int = 0
+    write_errors: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+# Reading
+
+def open_feed(path: str):
+    if path == '-':
+        return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline='')
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def detect_format(path: str) -> str:
+    name = path[:-3] if path.endswith('.gz') else path
+    return 'jsonl' if name.endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+def iter_rows(stream, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """``(line number, row)`` pairs; unparsable lines yield a RowError as the row"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for lineno, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield lineno, RowError(f"invalid JSON: {e}")
+            continue
+        yield lineno, row if isinstance(row, dict) else RowError("row is not a JSON object")
+
+
+# Mapping
+
+def _text(row: dict, *names: str) -> Optional[str]:
+    for name in names:
+        value = row.get(name)
+        if value not in (None, ''):
+            return str(value).strip()
+    return None
+
+
+def _list(value) -> List[str]:
+    if value in (None, ''):
+        return []
+    items = value if isinstance(value, list) else _LIST_SPLIT_RE.split(str(value))
+    return [str(item).strip()[:100] for item in items if str(item).strip()]
+
+
+def _int(value, name: str) -> Optional[int]:
+    if value in (None, ''):
+        return None
+    try:
+        return int(float(str(value).replace(',', '').replace('$', '').strip()))
+    except ValueError:
+        raise RowError(f"{name}: not a number: {value!r}")
+
+
+def _date(value, name: str) -> Optional[datetime]:
+    if value in (None, ''):
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).strip().replace('Z', '+00:00'))
+    except ValueError:
+        raise RowError(f"{name}: not an ISO date: {value!r}")
+    # Stored as naive UTC like every other timestamp
+    if parsed.tzinfo is not None:
+        parsed = (parsed - parsed.utcoffset()).replace(tzinfo=None)
+    return parsed
+
+
+def _choice(value, field_name: str) -> Optional[str]:
+    if value in (None, ''):
+        return None
+    normalized = re.sub(r"[\s\-]+", '_', str(value).strip().lower())
+    if field_name == 'remote_type' and normalized == 'on_site':
+        normalized = 'onsite'
+    valid = {choice for choice, _ in Job._fields[field_name].choices}
+    if normalized not in valid:
+        raise RowError(f"{field_name}: unknown value {value!r}")
+    return normalized
+
+
+def _posting_key(source: str, title: Optional[str], company: Optional[str], location: Optional[str]) -> str:
+    """Stable id for rows without an external id or url: hash of the normalized posting identity"""
+    parts = [' '.join((value or '').lower().split()) for value in (source, title, company, location)]
+    return 'key:' + hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def map_row(row: dict, default_source: Optional[str] = None) -> Job:
+    """Build an unsaved Job from a flat CSV row or a (possibly nested) JSONL object"""
+    return Job(**row_fields(row, default_source))
+
+
+def row_fields(row: dict, default_source: Optional[str] = None) -> dict:
+    """The Job fields a flat CSV row or a (possibly nested) JSONL object supplies"""
+    company = row.get('company')
+    if isinstance(company, dict):
+        company_info = CompanyInfo(**company)
+    else:
+        company_info = CompanyInfo(
+            name=_text(row, 'company_name', 'company'),
+            industry=_text(row, 'company_industry'),
+            website=_text(row, 'company_website'),
+            logo_url=_text(row, 'company_logo_url'),
+        )
+
+    requirements = row.get('requirements')
+    if isinstance(requirements, dict):
+        requirements_info = JobRequirements(**requirements)
+    else:
+        requirements_info = JobRequirements(
+            required_skills=_list(row.get('required_skills') or row.get('skills')),
+            preferred_skills=_list(row.get('preferred_skills')),
+            experience_years_min=_int(row.get('experience_years_min'), 'experience_years_min'),
+            experience_years_max=_int(row.get('experience_years_max'), 'experience_years_max'),
+        )
+
+    salary = row.get('salary')
+    if isinstance(salary, dict):
+        salary_info = SalaryInfo(**salary)
+    else:
+        salary_info = SalaryInfo(
+            min_salary=_int(row.get('salary_min') or row.get('min_salary'), 'salary_min'),
+            max_salary=_int(row.get('salary_max') or row.get('max_salary'), 'salary_max'),
+            currency=(_text(row, 'salary_currency', 'currency') or 'USD')[:3].upper(),
+        )
+
+    source = _text(row, 'source') or default_source
+    source_url = _text(row, 'source_url', 'url')
+    external_id = _text(row, 'external_id', 'id')
+    if not source:
+        raise RowError("source is required (or pass --source)")
+    title = _text(row, 'title')
+    location = _text(row, 'location')
+    if not external_id:
+        if source_url:
+            external_id = 'url:' + hashlib.sha1(source_url.encode('utf-8')).hexdigest()
+        elif title and company_info.name:
+            external_id = _posting_key(source, title, company_info.name, location)
+        else:
+            raise RowError("external_id, source_url or title and company are required")
+
+    kwargs = dict(
+        title=title,
+        description=_text(row, 'description', 'description_text'),
+        location=location,
+        city=_text(row, 'city'),
+        state=_text(row, 'state'),
+        country=_text(row, 'country'),
+        source=source,
+        source_url=source_url,
+        external_id=external_id,
+        company=company_info,
+        requirements=requirements_info,
+        salary=salary_info,
+        posted_date=_date(row.get('posted_date') or row.get('posted_at'), 'posted_date'),
+        application_deadline=_date(row.get('application_deadline'), 'application_deadline'),
+        job_type=_choice(row.get('job_type'), 'job_type'),
+        remote_type=_choice(row.get('remote_type'), 'remote_type'),
+    )
+    return {k: v for k, v in kwargs.items() if v is not None}
+
+
+def to_upsert(job: Job, now: datetime, supplied: Iterable[str] = ()) -> Tuple[dict, dict]:
+    """``(filter, update)`` for an upsert keyed on (source, external_id).
+
+    Existing jobs only get the ``supplied`` fields (the ones the feed row
+    carries) and the derived ones; everything else is written on insert.
+    """
+    job.resolve_skill_ids()
+    job.normalize_description()
+    job.refresh_search_terms()
+    job.geocode()
+    job.validate()
+    doc = job.to_mongo().to_dict()
+    doc.pop('updated_at', None)
+    updated = {job._fields[name].db_field for name in supplied} | set(DERIVED_FIELDS)
+    insert_only = {key: doc.pop(key) for key in list(doc) if key not in updated}
+    if job.application_deadline and job.application_deadline < now:
+        # Expired in the feed itself; an active job with this key is expired now too
+        insert_only.pop('is_active', None)
+        doc['is_active'] = False
+    update = {'$set': doc, '$setOnInsert': insert_only, '$currentDate': {'updated_at': True}}
+    if 'geo' not in doc:
+        # A location that no longer geocodes must not keep the previous point
+        update['$unset'] = {'geo': ''}
+    return {'source': doc['source'], 'external_id': doc['external_id']}, update
+
+
+def validate_chunk(chunk: List[Tuple[int, Any]], default_source: Optional[str] = None):
+    """Worker: map and validate rows; returns (upserts, [(line, error)])"""
+    now = datetime.utcnow()
+    ops, rejects = [], []
+    for lineno, row in chunk:
+        try:
+            if isinstance(row, Exception):
+                raise row
+            fields = row_fields(row, default_source)
+            ops.append(to_upsert(Job(**fields), now, fields))
+        except (RowError, ValidationError, FieldDoesNotExist, TypeError, ValueError) as e:
+            rejects.append((lineno, str(e)[:500]))
+    return ops, rejects
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+# Writing
+
+def _chunks(rows: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(rows)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def ingest(rows: Iterable[Tuple[int, Any]], *, batch_size: int = 2000, chunk_size: int = 500,
+           workers: int = 0, default_source: Optional[str] = None, dry_run: bool = False,
+           on_reject: Optional[Callable[[int, str], None]] = None,
+           on_progress: Optional[Callable[[IngestStats], None]] = None,
+           progress_every: int = 100000) -> IngestStats:
+    """Validate ``rows`` (``(line, row)`` pairs) and upsert them in unordered batches"""
+    stats = IngestStats()
+    collection = Job._get_collection()
+    if not dry_run:
+        Job.ensure_indexes()
+    buffer: List[Tuple[dict, dict]] = []
+    next_progress = progress_every
+
+    def flush():
+        if not buffer:
+            return
+        if not dry_run:
+            retired = retired_keys((query['source'], query['external_id']) for query, _ in buffer)
+            ops = [
+                UpdateOne(query, update, upsert=True)
+                for query, update in buffer if (query['source'], query['external_id']) not in retired
+            ]
+            stats.skipped += len(buffer) - len(ops)
+            try:
+                result = collection.bulk_write(ops, ordered=False).bulk_api_result if ops else {}
+            except BulkWriteError as e:
+                result = e.details
+                stats.write_errors += len(result.get('writeErrors', []))
+            stats.inserted += result.get('nUpserted', 0)
+            stats.updated += result.get('nMatched', 0)
+        buffer.clear()
+
+    def handle(result, chunk_rows: int):
+        nonlocal next_progress
+        ops, rejects = result
+        stats.rows += chunk_rows
+        stats.accepted += len(ops)
+        stats.rejected += len(rejects)
+        if on_reject:
+            for lineno, error in rejects:
+                on_reject(lineno, error)
+        for query, update in ops:
+            buffer.append((query, update))
+            if len(buffer) >= batch_size:
+                flush()
+        if on_progress and stats.rows >= next_progress:
+            next_progress += progress_every
+            on_progress(stats)
+
+    if workers <= 0:
+        for chunk in _chunks(rows, chunk_size):
+            handle(validate_chunk(chunk, default_source), len(chunk))
+    else:
+        ctx = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker) as pool:
+            # A bounded window of chunks in flight keeps memory flat and results in feed order
+            pending = deque()
+            for chunk in _chunks(rows, chunk_size):
+                pending.append((pool.submit(validate_chunk, chunk, default_source), len(chunk)))
+                if len(pending) >= workers * 2:
+                    future, size = pending.popleft()
+                    handle(future.result(), size)
+            while pending:
+                future, size = pending.popleft()
+                handle(future.result(), size)
+    flush()
+    return stats
@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobs.archive import archive_stale, ensure_archive_indexes, expire_jobs
+
+
+class Command(BaseCommand):
+    help = "Deactivate expired jobs and move long-inactive jobs to the jobs_archive collection"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--inactive-days', type=int,
+                            default=getattr(settings, 'JOB_ARCHIVE_AFTER_DAYS', 30),
+                            help='Archive jobs inactive (not updated) for at least this many days')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--no-expire', action='store_true',
+                            help='Skip deactivating jobs whose application deadline has passed')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be archived')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        if not dry_run:
+            ensure_archive_indexes()
+        if not options['no_expire'] and not dry_run:
+            expired = expire_jobs()
+            self.stdout.write(f"Deactivated {expired} job(s) past their application deadline")
+
+        archived = referenced = skipped = 0
+        for batch in archive_stale(timedelta(days=options['inactive_days']), options['batch_size'], dry_run):
+            archived += batch.archived
+            referenced += batch.referenced
+            skipped += batch.skipped
+            if options['verbosity'] > 1:
+                self.stdout.write(f"  batch: {batch.archived} archived, {batch.skipped} reactivated mid-batch")
+
+        verb = 'Would archive' if dry_run else 'Archived'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {archived} job(s) ({referenced} referenced by applications); {skipped} skipped"
+        ))
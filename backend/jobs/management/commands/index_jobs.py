@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand
+from pymongo import UpdateOne
+
+from jobs.archive import ensure_archive_indexes
+from jobs.models import Job
+
+# Full indexes replaced by the partial (is_active) / compound ones declared on Job
+SUPERSEDED_INDEXES = ('is_active_1', 'requirements.required_skills_1_location_1')
+
+# Derived from the description by Job.normalize_description / refresh_search_terms
+DESCRIPTION_FIELDS = ('description_text', 'description_terms', 'description_tokens', 'search_terms')
+
+
+def _clean_description(job):
+    job.normalize_description()
+    job.refresh_search_terms()
+
+
+class Command(BaseCommand):
+    help = ("Create the job indexes (text and 2dsphere included) and backfill cleaned descriptions, "
+            "search terms and location points")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Recompute cleaned descriptions, search terms and location points for every job')
+        parser.add_argument('--descriptions', action='store_true',
+                            help='Re-clean every description (e.g. after learn_boilerplate); locations only where missing')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        collection = Job._get_collection()
+        existing = collection.index_information()
+        for name in SUPERSEDED_INDEXES:
+            if name in existing:
+                collection.drop_index(name)
+                self.stdout.write(f"Dropped superseded index {name}")
+        Job.ensure_indexes()
+        ensure_archive_indexes()
+        everything = options['all']
+        descriptions = self._backfill(
+            Job.objects if everything or options['descriptions'] else Job.objects(description_text__exists=False),
+            ('job_id', 'description'), _clean_description, DESCRIPTION_FIELDS, options['batch_size'],
+        )
+        points = self._backfill(
+            Job.objects if everything else Job.objects(geo__exists=False),
+            ('job_id', 'location', 'city', 'state', 'country'), Job.geocode, ('geo',), options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexes ensured; descriptions cleaned for {descriptions} job(s), locations geocoded for {points} job(s)"
+        ))
+
+    def _backfill(self, qs, only, compute, fields, batch_size):
+        """Recompute ``fields`` with ``compute`` for every job in ``qs``; returns the number changed"""
+        collection = Job._get_collection()
+        ops, updated = [], 0
+        for job in qs.only(*only).no_cache():
+            compute(job)
+            values = {
+                field: job._fields[field].to_mongo(job[field]) for field in fields if job[field] is not None
+            }
+            if not values:
+                continue
+            ops.append(UpdateOne({'_id': job.job_id}, {'$set': values}))
+            if len(ops) >= batch_size:
+                updated += collection.bulk_write(ops, ordered=False).modified_count
+                ops = []
+        if ops:
+            updated += collection.bulk_write(ops, ordered=False).modified_count
+        return updated
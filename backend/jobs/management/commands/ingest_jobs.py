@@ -0,0 +1,60 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.ingest import detect_format, ingest, iter_rows, open_feed
+
+
+class Command(BaseCommand):
+    help = "Stream jobs from CSV/JSONL files (or - for stdin) and upsert them on (source, external_id)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='CSV/JSONL files, optionally .gz; - reads stdin')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], default=None,
+                            help='Input format (default: from the file extension; stdin defaults to csv)')
+        parser.add_argument('--source', default=None, help='Source for rows that do not name one')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Upserts per bulk_write (1-5000)')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Rows per validation task')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Validation processes (0 validates in this process)')
+        parser.add_argument('--rejects', default=None, metavar='PATH', help='Write rejected rows as JSONL')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only; write nothing')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if not 1 <= batch_size <= 5000:
+            raise CommandError("--batch-size must be between 1 and 5000")
+
+        rejects_file = open(options['rejects'], 'w', encoding='utf-8') if options['rejects'] else None
+        try:
+            for path in options['paths']:
+                fmt = options['format'] or ('csv' if path == '-' else detect_format(path))
+
+                def on_reject(lineno, error):
+                    if rejects_file:
+                        rejects_file.write(json.dumps({'file': path, 'line': lineno, 'error': error}) + '\n')
+
+                def on_progress(stats):
+                    self.stderr.write(f"  {path}: {stats.rows} rows, {stats.rows_per_sec:,.0f} rows/s")
+
+                with open_feed(path) as stream:
+                    stats = ingest(
+                        iter_rows(stream, fmt),
+                        batch_size=batch_size,
+                        chunk_size=options['chunk_size'],
+                        workers=options['workers'],
+                        default_source=options['source'],
+                        dry_run=options['dry_run'],
+                        on_reject=on_reject,
+                        on_progress=on_progress,
+                    )
+                self.stdout.write(self.style.SUCCESS(
+                    f"{path}: {stats.rows} rows in {stats.elapsed:.1f}s ({stats.rows_per_sec:,.0f} rows/s); "
+                    f"{stats.inserted} inserted, {stats.updated} updated, {stats.rejected} rejected, "
+                    f"{stats.skipped} skipped (expired or archived), "
+                    f"{stats.write_errors} write errors"
+                ))
+        finally:
+            if rejects_file:
+                rejects_file.close()
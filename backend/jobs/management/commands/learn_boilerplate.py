@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from jobs.descriptions import learn, save_boilerplate
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = "Learn the boilerplate paragraphs (EEO, benefits, company blurbs) shared across job descriptions"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-postings', type=int,
+                            default=getattr(settings, 'DESCRIPTION_BOILERPLATE_MIN_POSTINGS', 20),
+                            help='Paragraphs in at least this many distinct (company, title) postings are boilerplate')
+        parser.add_argument('--limit', type=int, default=50000, help='Learn from this many of the newest jobs')
+        parser.add_argument('--dry-run', action='store_true', help='Print the most common paragraphs only')
+        parser.add_argument('--apply', action='store_true',
+                            help='Re-clean every stored description with the new set (index_jobs --descriptions)')
+
+    def handle(self, *args, **options):
+        jobs = (Job.objects.only('title', 'company.name', 'description')
+                .order_by('-created_at').limit(options['limit']).no_cache())
+        postings = (
+            ((job.company.name if job.company else None, (job.title or '').lower()), job.description)
+            for job in jobs
+        )
+        learned = learn(postings, options['min_postings'])
+
+        if options['dry_run']:
+            for key, (n, sample) in sorted(learned.items(), key=lambda item: -item[1][0])[:20]:
+                self.stdout.write(f"{n:>7}  {key}  {sample[:100]}")
+            self.stdout.write(self.style.SUCCESS(f"{len(learned)} boilerplate paragraph(s) found (not saved)"))
+            return
+
+        dropped = save_boilerplate(learned)
+        self.stdout.write(self.style.SUCCESS(
+            f"Learned {len(learned)} boilerplate paragraph(s); {dropped} no longer shared were dropped"
+        ))
+        if options['apply']:
+            call_command('index_jobs', descriptions=True)
@@ -0,0 +1,50 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs import changefeed
+from jobs.consumers import CONSUMERS
+
+
+class Command(BaseCommand):
+    help = "Keep derived job data current by following the jobs change feed (change stream or polling)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--consumer', action='append', choices=sorted(CONSUMERS),
+                            help='Consumer(s) to run (default: all)')
+        parser.add_argument('--mode', choices=('auto', 'stream', 'poll'), default='auto')
+        parser.add_argument('--once', action='store_true', help='Catch up, then exit (e.g. from cron)')
+        parser.add_argument('--wait', type=float, default=1.0, help='Seconds to wait for changes per batch')
+
+    def handle(self, *args, **options):
+        names = options['consumer'] or sorted(CONSUMERS)
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        applied, errors = {}, {}
+
+        def follow(name):
+            try:
+                applied[name] = changefeed.run(
+                    CONSUMERS[name](), options['mode'], options['wait'], options['once'], stop.is_set,
+                )
+            except Exception as e:
+                errors[name] = e
+                stop.set()
+
+        threads = [threading.Thread(target=follow, args=(name,), name=f'consumer-{name}') for name in names]
+        for thread in threads:
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(0.5)
+        except KeyboardInterrupt:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        if errors:
+            raise CommandError('; '.join(f"{name}: {error}" for name, error in errors.items()))
+        for name in names:
+            self.stdout.write(self.style.SUCCESS(f"{name}: applied {applied.get(name, 0)} change(s)"))
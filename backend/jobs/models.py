@@ -1,12 +1,26 @@
 from mongoengine import Document, EmbeddedDocument, fields
 from datetime import datetime
+from core.counters import counters
+from core.fields import CompressedTextField
+from core.geo import get_gazetteer
+from core.serialization import CompiledSerializer
+from core.taxonomy import get_taxonomy
+from core.text import term_counts
+from .descriptions import clean_description
+import heapq
 import uuid
 
 
+MAX_SEARCH_TERMS = 2000
+
+
 class JobRequirements(EmbeddedDocument):
     """Embedded document for job requirements"""
     required_skills = fields.ListField(fields.StringField(max_length=100))
     preferred_skills = fields.ListField(fields.StringField(max_length=100))
+    # Canonical taxonomy ids for the skill lists above (maintained on save)
+    required_skill_ids = fields.ListField(fields.IntField())
+    preferred_skill_ids = fields.ListField(fields.IntField())
     education_level = fields.StringField(
         max_length=50,
         choices=[
@@ -86,7 +100,7 @@ class Job(Document):
     
     # Basic job information
     title = fields.StringField(max_length=200, required=True)
-    description = fields.StringField(required=True)
+    description = CompressedTextField(required=True)
     job_type = fields.StringField(
         max_length=20,
         choices=[
@@ -115,6 +129,8 @@ class Job(Document):
     city = fields.StringField(max_length=100)
     state = fields.StringField(max_length=50)
     country = fields.StringField(max_length=50, default='USA')
+    # GeoJSON point for the location, resolved offline against the gazetteer (core.geo)
+    geo = fields.PointField(auto_index=False)
     
     # Source information
     source = fields.StringField(max_length=100)  # LinkedIn, Indeed, etc.
@@ -137,6 +153,15 @@ class Job(Document):
     ai_match_score = fields.FloatField(min_value=0, max_value=100)  # AI-calculated match score
     ai_tags = fields.ListField(fields.StringField(max_length=50))
     
+    # Description without markup or learned boilerplate (jobs.descriptions) and its term counts,
+    # maintained on save and ingest
+    description_text = CompressedTextField()
+    description_terms = fields.DictField()
+    description_tokens = fields.IntField(default=0)
+    
+    # Distinct cleaned-description terms for the text index (the description itself is stored compressed)
+    search_terms = fields.ListField(fields.StringField())
+    
     # Timestamps
     created_at = fields.DateTimeField(default=datetime.utcnow)
     updated_at = fields.DateTimeField(default=datetime.utcnow)
@@ -156,82 +181,130 @@ class Job(Document):
             'remote_type',
             'posted_date',
             'created_at',
-            'is_active',
-            ('requirements.required_skills', 'location'),
+            # Keyset pagination order of the job list (core.pagination)
+            ('-created_at', '-job_id'),
+            # Expiry/archival scans (jobs.archive) select on is_active and age
+            ('is_active', 'updated_at'),
+            # Candidate lookups only ever want live jobs; partial indexes keep
+            # expired postings out of them
+            {
+                'fields': ['requirements.required_skills', 'location'],
+                'name': 'active_skills_location',
+                'partialFilterExpression': {'is_active': True},
+            },
+            {
+                'fields': ['application_deadline'],
+                'name': 'active_deadline',
+                'partialFilterExpression': {'is_active': True},
+            },
             ('ai_match_score', '-posted_date'),
+            {
+                'fields': ['$title', '$requirements.required_skills', '$company.name', '$search_terms'],
+                'default_language': 'english',
+                'weights': {'title': 10, 'requirements.required_skills': 5, 'company.name': 3, 'search_terms': 1},
+            },
+            # Polling change feed (jobs.changefeed) reads in (updated_at, _id) order
+            ('updated_at', 'job_id'),
+            # Radius queries (search near=, recommender radius_km=); jobs without a point are skipped
+            '(geo',
+            # Upsert key for feed ingestion (manage.py ingest_jobs); jobs without an external id are exempt
+            {
+                'fields': ['source', 'external_id'],
+                'unique': True,
+                'partialFilterExpression': {'external_id': {'$type': 'string'}},
+            },
         ]
     }
     
     def save(self, *args, **kwargs):
-        """Override save to update timestamp"""
+        """Override save to update timestamp, canonical skill ids, cleaned description, search terms and location point"""
+        self.resolve_skill_ids()
+        self.normalize_description()
+        self.refresh_search_terms()
+        self.geocode()
+        # Stamped last, as close to the write as possible (the polling change feed reads by it)
         self.updated_at = datetime.utcnow()
         return super().save(*args, **kwargs)
     
+    def resolve_skill_ids(self):
+        """Map the requirement skill names to canonical taxonomy ids"""
+        if self.requirements:
+            taxonomy = get_taxonomy()
+            self.requirements.required_skill_ids = taxonomy.resolve_many(self.requirements.required_skills)
+            self.requirements.preferred_skill_ids = taxonomy.resolve_many(self.requirements.preferred_skills)
+    
+    def normalize_description(self):
+        """Strip markup and learned boilerplate from the description and count its terms"""
+        self.description_text = clean_description(self.description)
+        self.description_terms = term_counts(self.description_text)
+        self.description_tokens = sum(self.description_terms.values())
+    
+    def refresh_search_terms(self):
+        """Index the cleaned description's distinct terms (stemming is left to the text index).
+
+        Long descriptions keep their ``MAX_SEARCH_TERMS`` most frequent terms (ties by term).
+        """
+        terms = self.description_terms or {}
+        if len(terms) > MAX_SEARCH_TERMS:
+            terms = heapq.nsmallest(MAX_SEARCH_TERMS, terms, key=lambda term: (-terms[term], term))
+        self.search_terms = sorted(terms)
+    
+    def geocode(self):
+        """Resolve the location fields to a point; unknown places (and remote-only jobs) get none"""
+        # The model's default country says nothing about the posting, so it does not qualify the city
+        country = self.country if self.country != self._fields['country'].default else None
+        place = get_gazetteer().geocode(self.location, self.city, self.state, country)
+        self.geo = [place.lng, place.lat] if place else None
+    
     def increment_view_count(self):
-        """Increment view count"""
-        self.view_count += 1
-        self.save()
-    
-    def to_dict(self):
-        """Convert to dictionary for API responses"""
-        return {
-            'job_id': self.job_id,
-            'title': self.title,
-            'description': self.description,
-            'job_type': self.job_type,
-            'location': self.location,
-            'remote_type': self.remote_type,
-            'city': self.city,
-            'state': self.state,
-            'country': self.country,
-            'source': self.source,
-            'source_url': self.source_url,
-            'company': {
-                'name': self.company.name,
-                'industry': self.company.industry,
-                'size': self.company.size,
-                'website': self.company.website,
-                'logo_url': self.company.logo_url,
-                'description': self.company.description,
-                'rating': self.company.rating,
-            },
-            'requirements': {
-                'required_skills': self.requirements.required_skills,
-                'preferred_skills': self.requirements.preferred_skills,
-                'education_level': self.requirements.education_level,
-                'experience_years_min': self.requirements.experience_years_min,
-                'experience_years_max': self.requirements.experience_years_max,
-                'certifications': self.requirements.certifications,
-            },
-            'salary': {
-                'min_salary': self.salary.min_salary,
-                'max_salary': self.salary.max_salary,
-                'currency': self.salary.currency,
-                'salary_type': self.salary.salary_type,
-                'equity': self.salary.equity,
-                'bonus_eligible': self.salary.bonus_eligible,
-            },
-            'benefits': {
-                'health_insurance': self.benefits.health_insurance,
-                'dental_insurance': self.benefits.dental_insurance,
-                'vision_insurance': self.benefits.vision_insurance,
-                'retirement_plan': self.benefits.retirement_plan,
-                'paid_time_off': self.benefits.paid_time_off,
-                'flexible_schedule': self.benefits.flexible_schedule,
-                'remote_work': self.benefits.remote_work,
-                'professional_development': self.benefits.professional_development,
-                'other_benefits': self.benefits.other_benefits,
-            },
-            'is_active': self.is_active,
-            'posted_date': self.posted_date.isoformat() if self.posted_date else None,
-            'application_deadline': self.application_deadline.isoformat() if self.application_deadline else None,
-            'ai_summary': self.ai_summary,
-            'ai_match_score': self.ai_match_score,
-            'ai_tags': self.ai_tags,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'view_count': self.view_count,
-            'application_count': self.application_count,
-        }
+        """Count a view (buffered ``$inc``; leaves ``updated_at`` and this instance untouched)"""
+        counters().incr(Job, self.job_id, 'view_count')
+    
+    # API representation (compiled from this schema on first use)
+    to_dict = CompiledSerializer([
+        'job_id', 'title', 'description', 'job_type', 'location', 'remote_type',
+        'city', 'state', 'country', 'source', 'source_url',
+        ('company', ['name', 'industry', 'size', 'website', 'logo_url', 'description', 'rating']),
+        ('requirements', [
+            'required_skills', 'preferred_skills', 'required_skill_ids', 'preferred_skill_ids',
+            'education_level', 'experience_years_min', 'experience_years_max', 'certifications',
+        ]),
+        ('salary', ['min_salary', 'max_salary', 'currency', 'salary_type', 'equity', 'bonus_eligible']),
+        ('benefits', [
+            'health_insurance', 'dental_insurance', 'vision_insurance', 'retirement_plan', 'paid_time_off',
+            'flexible_schedule', 'remote_work', 'professional_development', 'other_benefits',
+        ]),
+        'is_active', 'posted_date', 'application_deadline', 'ai_summary', 'ai_match_score', 'ai_tags',
+        'created_at', 'view_count', 'application_count',
+    ])
     
     def __str__(self):
-        return f"{self.title} @ {self.company.name}"
\ No newline at end of file
+        return f"{self.title} @ {self.company.name}"
+
+
+class JobFeedPosition(Document):
+    """How far a named change-feed consumer has read (jobs.changefeed)"""
+    consumer = fields.StringField(primary_key=True, max_length=100)
+    resume_token = fields.DictField()  # change stream resume token
+    updated_at_mark = fields.DateTimeField()  # polling position: last (updated_at, job_id) applied
+    last_job_id = fields.StringField()
+    mode = fields.StringField(choices=[('stream', 'Change stream'), ('poll', 'Polling')])
+    applied = fields.IntField(default=0)
+    updated_at = fields.DateTimeField(default=datetime.utcnow)
+    
+    meta = {'collection': 'job_feed_positions'}
+
+
+class SkillDemand(Document):
+    """Active jobs requiring a skill, kept current by the skill_demand feed consumer (jobs.consumers)"""
+    skill_id = fields.IntField(primary_key=True)
+    name = fields.StringField(max_length=100)
+    count = fields.IntField(default=0)
+    updated_at = fields.DateTimeField(default=datetime.utcnow)
+    
+    meta = {
+        'collection': 'skill_demand',
+        'indexes': ['-count'],
+    }
+    
+    to_dict = CompiledSerializer(['skill_id', 'name', 'count', 'updated_at'])
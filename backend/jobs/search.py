@@ -0,0 +1,175 @@
+"""
+Job search: text query, indexed filters and facet counts in one aggregation.
+
+``$match`` combines the text index (title, required skills, company name,
+description terms) with equality/prefix filters on the indexed ``job_type``,
+``remote_type``, ``location`` and ``is_active`` fields, plus an optional radius
+around a point on the ``2dsphere`` index. A single ``$facet``
+stage then returns the page of results, the total and the facet counts.
+Facets only depend on the match, so for unfiltered queries (text only) they
+are cached per normalized query and later pages or repeats run a plain
+sorted, limited aggregation instead. Cached facets are dropped as soon as
+jobs change: the ``search_facets`` feed consumer (jobs.consumers) bumps a
+generation number and entries from an older generation are ignored, so the
+TTL is only a backstop.
+"""
+import hashlib
+import re
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.geo import get_gazetteer, radius_to_radians
+
+from .models import Job
+from .serializers import JOB_LIST_PROJECTION
+
+FILTERS = ('job_type', 'remote_type', 'location')
+
+# facet name -> stored field path
+FACETS = {
+    'job_type': 'job_type',
+    'remote_type': 'remote_type',
+    'location': 'location',
+    'company': 'company.name',
+}
+FACET_LIMIT = 20
+FACETS_GENERATION_KEY = 'jobsearch:facets:generation'
+
+DEFAULT_RADIUS_KM = 50.0
+MAX_RADIUS_KM = 1000.0
+
+
+def within(lng: float, lat: float, radius_km: float) -> Dict[str, Any]:
+    """``geo`` predicate for jobs within ``radius_km`` of a point (served by the 2dsphere index)"""
+    return {'$geoWithin': {'$centerSphere': [[lng, lat], radius_to_radians(radius_km)]}}
+
+
+def parse_near(params) -> Optional[Tuple[float, float, float]]:
+    """``(lng, lat, radius_km)`` from ``near`` (a place name) or ``lat``/``lng``, plus ``radius_km``"""
+    if params.get('near'):
+        place = get_gazetteer().geocode(params['near'])
+        if place is None:
+            raise ValueError(f"Unknown place: {params['near']}")
+        lng, lat = place.lng, place.lat
+    elif params.get('lat') or params.get('lng'):
+        try:
+            lat, lng = float(params['lat']), float(params['lng'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("lat and lng must both be numbers")
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            raise ValueError("lat/lng out of range")
+    else:
+        return None
+    try:
+        radius_km = float(params.get('radius_km') or DEFAULT_RADIUS_KM)
+    except ValueError:
+        raise ValueError("radius_km must be a number")
+    return lng, lat, min(max(radius_km, 1.0), MAX_RADIUS_KM)
+
+
+def build_match(q: str, filters: Dict[str, str], active_only: bool = True,
+                near: Optional[Tuple[float, float, float]] = None) -> Dict[str, Any]:
+    match: Dict[str, Any] = {}
+    if q:
+        match['$text'] = {'$search': q}
+    if active_only:
+        match['is_active'] = True
+    for name in ('job_type', 'remote_type'):
+        if filters.get(name):
+            match[name] = filters[name]
+    if filters.get('location'):
+        # Anchored, case-sensitive prefix so the location index can serve it
+        match['location'] = {'$regex': '^' + re.escape(filters['location'])}
+    if near:
+        match['geo'] = within(*near)
+    return match
+
+
+def _facet_stages() -> Dict[str, list]:
+    return {
+        name: [
+            {'$group': {'_id': f'${path}', 'count': {'$sum': 1}}},
+            {'$match': {'_id': {'$nin': [None, '']}}},
+            {'$sort': {'count': -1, '_id': 1}},
+            {'$limit': FACET_LIMIT},
+        ]
+        for name, path in FACETS.items()
+    }
+
+
+def _result_stages(q: str, offset: int, limit: int) -> list:
+    projection = JOB_LIST_PROJECTION.mongo_projection()
+    if q:
+        projection['score'] = {'$meta': 'textScore'}
+        sort = {'score': {'$meta': 'textScore'}, 'posted_date': -1, '_id': 1}
+    else:
+        sort = {'posted_date': -1, '_id': 1}
+    return [{'$sort': sort}, {'$skip': offset}, {'$limit': limit}, {'$project': projection}]
+
+
+def _facet_cache_key(q: str, active_only: bool) -> str:
+    normalized = ' '.join(q.lower().split())
+    digest = hashlib.sha1(f"{int(active_only)}:{normalized}".encode('utf-8')).hexdigest()
+    return f"jobsearch:facets:{digest}"
+
+
+def bump_facets_generation():
+    """Invalidate every cached facet result"""
+    cache.add(FACETS_GENERATION_KEY, 0, None)
+    try:
+        cache.incr(FACETS_GENERATION_KEY)
+    except ValueError:
+        # Evicted between add and incr; any value the cached entries do not carry will do
+        cache.set(FACETS_GENERATION_KEY, 1, None)
+
+
+def _render_facets(raw: Dict[str, list]) -> Dict[str, list]:
+    return {name: [{'value': b['_id'], 'count': b['count']} for b in raw.get(name, [])] for name in FACETS}
+
+
+def search_jobs(q: str = '', filters: Optional[Dict[str, str]] = None, active_only: bool = True,
+                offset: int = 0, limit: int = 20,
+                near: Optional[Tuple[float, float, float]] = None) -> Dict[str, Any]:
+    """``near`` is ``(lng, lat, radius_km)``"""
+    filters = {k: v for k, v in (filters or {}).items() if k in FILTERS and v}
+    q = (q or '').strip()
+    match = build_match(q, filters, active_only, near)
+    collection = Job._get_collection()
+
+    cache_key = None if filters or near else _facet_cache_key(q, active_only)
+    cached, generation = None, 0
+    if cache_key:
+        found = cache.get_many([cache_key, FACETS_GENERATION_KEY])
+        generation = found.get(FACETS_GENERATION_KEY, 0)
+        cached = found.get(cache_key)
+        if cached is not None and cached.get('generation') != generation:
+            cached = None
+    if cached is not None:
+        results = list(collection.aggregate([{'$match': match}] + _result_stages(q, offset, limit)))
+        total, facets = cached['total'], cached['facets']
+    else:
+        pipeline = [
+            {'$match': match},
+            {'$facet': {
+                'results': _result_stages(q, offset, limit),
+                'total': [{'$count': 'count'}],
+                **_facet_stages(),
+            }},
+        ]
+        out = next(collection.aggregate(pipeline), {})
+        results = out.get('results', [])
+        total = out['total'][0]['count'] if out.get('total') else 0
+        facets = _render_facets(out)
+        if cache_key:
+            cache.set(cache_key, {'generation': generation, 'total': total, 'facets': facets},
+                      getattr(settings, 'JOB_SEARCH_FACET_CACHE_TIMEOUT', 300))
+
+    rows = []
+    for raw in results:
+        row = JOB_LIST_PROJECTION.row(raw)
+        if q:
+            row['score'] = round(raw.get('score', 0.0), 4)
+        rows.append(row)
+    return {'count': total, 'results': rows, 'facets': facets}
@@ -1,7 +1,32 @@
 from rest_framework import serializers
+from core.projections import Projection
 from .models import Job
 
 class JobSerializer(serializers.ModelSerializer):
     class Meta:
         model = Job
         fields = "__all__"
+
+
+# Shape of each row in the job list (detail views use Job.to_dict)
+JOB_LIST_PROJECTION = Projection(Job, [
+    'job_id',
+    'title',
+    'company.name',
+    'company.logo_url',
+    'location',
+    'job_type',
+    'remote_type',
+    'source',
+    'salary.min_salary',
+    'salary.max_salary',
+    'salary.currency',
+    'salary.salary_type',
+    'requirements.required_skills',
+    'is_active',
+    'posted_date',
+    'ai_match_score',
+    'created_at',
+    'view_count',
+    'application_count',
+])
@@ -1,6 +1,10 @@
 from django.urls import path
-from .views import JobListCreateView
+from .views import JobListCreateView, JobDetailView, JobCacheStatsView, JobSearchView, JobAutocompleteView
 
 urlpatterns = [
     path('', JobListCreateView.as_view(), name='job-list-create'),
+    path('search/', JobSearchView.as_view(), name='job-search'),
+    path('autocomplete/', JobAutocompleteView.as_view(), name='job-autocomplete'),
+    path('cache-stats/', JobCacheStatsView.as_view(), name='job-cache-stats'),
+    path('<str:job_id>/', JobDetailView.as_view(), name='job-detail'),
 ]
@@ -1,8 +1,125 @@
+from django.http import HttpResponse
 from rest_framework import generics, permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .archive import get_archived_job
+from .autocomplete import KINDS, job_autocomplete
+from .cache import LIVE_FIELDS, job_json_cache, json_array, json_page
 from .models import Job
-from .serializers import JobSerializer
+from .search import parse_near, search_jobs
+from .serializers import JobSerializer, JOB_LIST_PROJECTION
+from core.counters import counters
+from core.pagination import KeysetPagination
+
+
+def _json_response(body, cache_status=None):
+    response = HttpResponse(body, content_type='application/json')
+    if cache_status:
+        response['X-Cache'] = cache_status
+    return response
+
+
+class JobCursorPagination(KeysetPagination):
+    ordering = (('created_at', -1), ('job_id', -1))
+
 
 class JobListCreateView(generics.ListCreateAPIView):
-    queryset = Job.objects.all().order_by("-created_at")
+    queryset = Job.objects.all().order_by("-created_at", "-job_id")
     serializer_class = JobSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = JobCursorPagination
+
+    def list(self, request, *args, **kwargs):
+        # Only ids, versions and live counters are queried up front; rows come from the fragment
+        # cache and misses are built from projected raw dicts (no Job documents are constructed)
+        refs = self.get_queryset().only('job_id', 'updated_at', 'created_at', *LIVE_FIELDS).as_pymongo()
+        page = self.paginate_queryset(refs)
+        fragments = job_json_cache().fragments('row', list(page if page is not None else refs), self._load_rows)
+        if page is None:
+            return _json_response(json_array(fragments))
+        return _json_response(json_page(self.paginator.get_meta(), fragments))
+
+    def _load_rows(self, job_ids):
+        raws = JOB_LIST_PROJECTION.fetch(Job.objects(job_id__in=job_ids))
+        return {raw['_id']: JOB_LIST_PROJECTION.row(raw) for raw in raws}
+
+
+class JobSearchView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            page = max(1, int(params.get('page', 1)))
+            page_size = min(50, max(1, int(params.get('page_size', 20))))
+        except ValueError:
+            return Response({'detail': 'page and page_size must be integers'}, status=400)
+        try:
+            near = parse_near(params)
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=400)
+
+        data = search_jobs(
+            q=params.get('q', ''),
+            filters={name: params.get(name) for name in ('job_type', 'remote_type', 'location')},
+            active_only=params.get('include_inactive') not in ('1', 'true'),
+            offset=(page - 1) * page_size,
+            limit=page_size,
+            near=near,
+        )
+        return Response({'page': page, 'page_size': page_size, **data})
+
+
+class JobAutocompleteView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        params = request.query_params
+        kinds = [kind for kind in params.get('kind', ','.join(KINDS)).split(',') if kind]
+        if any(kind not in KINDS for kind in kinds):
+            return Response({'detail': f"kind must be one of {', '.join(KINDS)}"}, status=400)
+        try:
+            limit = min(20, max(1, int(params.get('limit', 8))))
+        except ValueError:
+            return Response({'detail': 'limit must be an integer'}, status=400)
+
+        autocomplete = job_autocomplete()
+        return Response({
+            'ready': autocomplete.ready.is_set(),
+            **autocomplete.complete(params.get('q', ''), kinds, limit),
+        })
+
+
+class JobDetailView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, job_id):
+        ref = Job.objects(job_id=job_id).only('job_id', 'updated_at', *LIVE_FIELDS).as_pymongo().first()
+        if not ref:
+            # Archived jobs stay resolvable for the applications that refer to them
+            job = get_archived_job(job_id)
+            if not job:
+                return Response({'detail': 'Job not found'}, status=404)
+            return Response(job.to_dict())
+
+        loaded = []
+
+        def load(job_ids):
+            loaded.extend(job_ids)
+            return {job.job_id: job.to_dict() for job in Job.objects(job_id__in=job_ids)}
+
+        fragments = job_json_cache().fragments('detail', [ref], load)
+        if not fragments:
+            return Response({'detail': 'Job not found'}, status=404)
+        # Buffered $inc without a version bump: the cached bytes omit the counters, which are
+        # merged in from ref (current as of the last counter flush)
+        counters().incr(Job, ref['_id'], 'view_count')
+        return _json_response(fragments[0], 'miss' if loaded else 'hit')
+
+
+class JobCacheStatsView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        cache = job_json_cache()
+        return Response({**cache.metrics.snapshot(), 'lru_entries': len(cache.lru)})
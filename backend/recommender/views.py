@@ -1,16 +1,28 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction import DictVectorizer
+from sklearn.feature_extraction.text import TfidfTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 from jobs.models import Job
+from jobs.search import MAX_RADIUS_KM, within
 from resumes.models import Resume
-import re
+from users.models import User
+from core.geo import get_gazetteer
+from core.taxonomy import get_taxonomy
+from core.text import SkillMatcher, term_counts
 
-TOKEN_RE = re.compile(r"[A-Za-z]{2,}")
-
-def tokenize(text: str):
-    return set(t.lower() for t in TOKEN_RE.findall(text or ""))
+def _near_preferred(user_id, radius_km):
+    """Candidates within ``radius_km`` of any preferred location (remote jobs always qualify)"""
+    if not user_id or radius_km <= 0:
+        return {}
+    user = User.objects(user_id=user_id).only('profile.preferred_locations').first()
+    locations = (user.profile.preferred_locations or []) if user and user.profile else []
+    places = [get_gazetteer().geocode(location) for location in locations]
+    clauses = [{'geo': within(p.lng, p.lat, min(radius_km, MAX_RADIUS_KM))} for p in places if p]
+    if not clauses:
+        return {}
+    return {'$or': clauses + [{'remote_type': 'remote'}]}
 
 class RefreshRecommendationsView(APIView):
     permission_classes=[IsAuthenticated]
@@ -18,33 +30,58 @@ class RefreshRecommendationsView(APIView):
     def post(self, request):
         # Use latest resume text for the user; fallback to empty
         resume = None
+        user_id = None
         try:
             user_id = request.user.get('user_id') if hasattr(request.user, 'get') else None
             if user_id:
                 resume = Resume.objects(user_id=user_id).order_by('-parsed_at').first()
         except Exception:
             resume = None
-        user_text = (getattr(resume, 'raw_text', None) or getattr(resume, 'text', None) or "")
-        jobs = list(Job.objects.all())
+        user_text = resume.get_text() if resume else ""
+        try:
+            radius_km = float(request.data.get('radius_km') or 0)
+        except (TypeError, ValueError):
+            return Response({"detail": "radius_km must be a number"}, status=400)
+        jobs = list(Job.objects(is_active=True, __raw__=_near_preferred(user_id, radius_km)).only(
+            'job_id', 'title', 'description_terms', 'company.name', 'location', 'remote_type', 'salary',
+            'requirements.required_skills',
+        ))
         if not jobs:
             return Response({"results": []})
 
-        # Use description_text if available; fallback to description
-        corpus = [user_text] + [getattr(j, 'description_text', getattr(j, 'description', '')) for j in jobs]
-        vectorizer = TfidfVectorizer(stop_words="english", max_features=5000)
-        X = vectorizer.fit_transform(corpus)
+        # Jobs carry the term counts of their cleaned description, so nothing is decompressed or
+        # tokenized here; jobs saved before those existed (see index_jobs) are cleaned on the fly
+        uncounted = {j.job_id: j for j in jobs if not j.description_terms}
+        if uncounted:
+            for job in Job.objects(job_id__in=list(uncounted)).only('job_id', 'description'):
+                job.normalize_description()
+                uncounted[job.job_id].description_terms = job.description_terms
+        counts = [term_counts(user_text)] + [j.description_terms for j in jobs]
+        X = TfidfTransformer().fit_transform(DictVectorizer().fit_transform(counts))
         user_vec = X[0]
         job_vecs = X[1:]
         sims = cosine_similarity(user_vec, job_vecs).flatten()
         ranked = sorted(zip(jobs, sims), key=lambda x: x[1], reverse=True)[:20]
 
-        user_tokens = tokenize(user_text)
+        # Compare canonical skill ids; required skills outside the taxonomy are matched by name
+        taxonomy = get_taxonomy()
+        ranked_skills = []
+        for j, _ in ranked:
+            required_skills = list((j.requirements.required_skills or [])) if getattr(j, 'requirements', None) else []
+            ranked_skills.append((required_skills, taxonomy.split(required_skills)))
+        all_unknown = set().union(*(unknown for _, (_, unknown) in ranked_skills))
+
+        # Processed resumes carry precomputed taxonomy ids; older ones fall back to one pass over the
+        # text. Names outside the taxonomy are always matched against the text too
+        precomputed = resume.precomputed_skills() if resume else None
+        user_ids, user_names = precomputed if precomputed is not None else (taxonomy.extract(user_text), set())
+        user_unknown = all_unknown & user_names
+        if all_unknown:
+            user_unknown |= SkillMatcher(all_unknown).find(user_text)
 
         results=[]
-        for j, s in ranked:
-            required_skills = list((j.requirements.required_skills or [])) if getattr(j, 'requirements', None) else []
-            job_tokens = set(k.lower() for k in required_skills)
-            missing = sorted(list(job_tokens - user_tokens))[:50]
+        for (j, s), (required_skills, (job_ids, job_unknown)) in zip(ranked, ranked_skills):
+            missing = (taxonomy.names(job_ids - user_ids) + sorted(job_unknown - user_unknown))[:50]
             salary = getattr(j, 'salary', None)
             results.append({
                 "job_id": getattr(j, 'id', None) or getattr(j, 'job_id', None),
@@ -0,0 +1,57 @@
+"""
+Line-based text deltas for resume versions.
+
+A delta is a list of operations against the base text's lines: ``[i, j]``
+copies base lines ``i:j`` and a string inserts new text. The list is
+JSON-encoded and zlib-compressed, prefixed with a format byte. Tailored
+versions usually change a handful of bullets, so a delta is a few hundred
+bytes where a full copy of ``raw_text`` is several kilobytes.
+"""
+import difflib
+import json
+import zlib
+from typing import List, Union
+
+FORMAT_V1 = b'\x01'
+
+Op = Union[List[int], str]
+
+
+def _lines(text: str) -> List[str]:
+    return (text or '').splitlines(keepends=True)
+
+
+def make_delta(base: str, target: str) -> bytes:
+    """Encode ``target`` as edits against ``base``"""
+    base_lines, target_lines = _lines(base), _lines(target)
+    ops: List[Op] = []
+    matcher = difflib.SequenceMatcher(None, base_lines, target_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append([i1, i2])
+        elif tag in ('replace', 'insert'):
+            ops.append(''.join(target_lines[j1:j2]))
+        # 'delete' needs no op: the base lines are simply not copied
+    payload = json.dumps(ops, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return FORMAT_V1 + zlib.compress(payload, 6)
+
+
+def apply_delta(base: str, delta: bytes) -> str:
+    """Rebuild the target text from ``base`` and a delta produced by ``make_delta``"""
+    delta = bytes(delta)
+    if delta[:1] != FORMAT_V1:
+        raise ValueError("Unknown resume delta format")
+    ops = json.loads(zlib.decompress(delta[1:]).decode('utf-8'))
+    base_lines = _lines(base)
+    parts = []
+    for op in ops:
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(base_lines[op[0]:op[1]])
+    return ''.join(parts)
+
+
+def compressed_size(text: str) -> int:
+    """Size the text would take stored as a compressed full copy (the break-even point for a delta)"""
+    return len(zlib.compress((text or '').encode('utf-8'), 6))
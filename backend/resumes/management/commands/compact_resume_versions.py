@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from resumes.versions import compact, storage_report
+
+
+class Command(BaseCommand):
+    help = "Rebase resume versions whose delta chains grew too deep (run periodically, e.g. from cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-depth', type=int, default=None,
+            help='Rebase versions deeper than this (default: settings.RESUME_VERSION_MAX_DEPTH)',
+        )
+        parser.add_argument('--report', action='store_true', help='Print stored vs. full-text sizes afterwards')
+
+    def handle(self, *args, **options):
+        stats = compact(max_depth=options['max_depth'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebased {stats['rebased']} version(s), materialized {stats['materialized']}, failed {stats['failed']}"
+        ))
+        if options['report']:
+            report = storage_report()
+            ratio = report['delta_bytes'] / (report['full_text_bytes'] or 1)
+            self.stdout.write(
+                f"{report['versions']} delta version(s): {report['delta_bytes']} bytes stored for "
+                f"{report['full_text_bytes']} bytes of text ({ratio:.1%}), max depth {report['max_depth']}"
+            )
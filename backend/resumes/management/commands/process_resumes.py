@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from resumes.pipeline import process_pending, requeue_stale
+
+
+class Command(BaseCommand):
+    help = "Process pending resume uploads (use after a restart or as a standalone worker)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help='Maximum number of resumes to process')
+        parser.add_argument(
+            '--requeue-stale', type=int, default=None, metavar='MINUTES',
+            help='First return resumes stuck in "processing" for longer than MINUTES to "pending"',
+        )
+
+    def handle(self, *args, **options):
+        if options['requeue_stale'] is not None:
+            requeued = requeue_stale(timedelta(minutes=options['requeue_stale']))
+            self.stdout.write(f"Requeued {requeued} stale resume(s)")
+        processed = process_pending(limit=options['limit'])
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} resume(s)"))
@@ -1,5 +1,10 @@
 from mongoengine import Document, EmbeddedDocument, fields
 from datetime import datetime
+from core.counters import counters
+from core.fields import CompressedTextField
+from core.serialization import CompiledSerializer
+from core.taxonomy import SKILL_CATEGORIES, get_taxonomy
+from core.text import normalize_text
 import uuid
 
 
@@ -64,18 +69,10 @@ class Certification(EmbeddedDocument):
 class Skill(EmbeddedDocument):
     """Embedded document for skills with proficiency"""
     name = fields.StringField(max_length=100, required=True)
+    skill_id = fields.IntField()  # Canonical taxonomy id, None if not in the taxonomy
     category = fields.StringField(
         max_length=50,
-        choices=[
-            ('programming', 'Programming Languages'),
-            ('framework', 'Frameworks & Libraries'),
-            ('database', 'Databases'),
-            ('tool', 'Tools & Software'),
-            ('cloud', 'Cloud Platforms'),
-            ('soft_skill', 'Soft Skills'),
-            ('language', 'Languages'),
-            ('other', 'Other')
-        ],
+        choices=SKILL_CATEGORIES,
         default='other'
     )
     proficiency = fields.StringField(
@@ -97,6 +94,8 @@ class ParsedContent(EmbeddedDocument):
     contact_info = fields.DictField()
     summary = fields.StringField()
     skills_extracted = fields.ListField(fields.StringField(max_length=100))
+    skill_ids = fields.ListField(fields.IntField())  # Canonical taxonomy ids for skills_extracted
+    parsed_version = fields.IntField()  # Resume.version these fields were derived from
     experience_summary = fields.StringField()
     education_summary = fields.StringField()
     total_experience_years = fields.IntField()
@@ -110,6 +109,52 @@ class ParsedContent(EmbeddedDocument):
     missing_keywords = fields.ListField(fields.StringField(max_length=50))
 
 
+class PageExtraction(EmbeddedDocument):
+    """Embedded document for per-page extraction timing"""
+    page = fields.IntField(min_value=1)
+    duration_ms = fields.IntField()
+    chars = fields.IntField()
+    error = fields.StringField(max_length=500)
+
+
+class ExtractionMetadata(EmbeddedDocument):
+    """Embedded document describing how raw_text was extracted"""
+    page_count = fields.IntField()
+    pages_extracted = fields.IntField()
+    failed_pages = fields.ListField(fields.IntField())
+    truncated = fields.BooleanField(default=False)  # page cap hit
+    timed_out = fields.BooleanField(default=False)  # document deadline hit
+    duration_ms = fields.IntField()
+    pages = fields.ListField(fields.EmbeddedDocumentField(PageExtraction))
+
+
+class ResumeBlob(Document):
+    """Content-addressed resume file, shared by every Resume with identical bytes"""
+    sha256 = fields.StringField(primary_key=True, max_length=64)
+    size = fields.IntField()
+    file_type = fields.StringField(max_length=10)
+    path = fields.StringField(max_length=500)
+    ref_count = fields.IntField(default=0)
+    # Set while release_blob removes the file of an unreferenced blob; uploads wait for it (resumes.storage)
+    removing_at = fields.DateTimeField()
+
+    # Memoized extraction results (None until the first extraction completes)
+    raw_text = CompressedTextField()
+    extraction = fields.EmbeddedDocumentField(ExtractionMetadata)
+    structured = fields.DictField()  # LLM parse of raw_text (resumes.parsing.RESUME_SCHEMA)
+
+    created_at = fields.DateTimeField(default=datetime.utcnow)
+    extracted_at = fields.DateTimeField()
+
+    meta = {
+        'collection': 'resume_blobs',
+    }
+
+    @property
+    def is_extracted(self):
+        return self.extracted_at is not None
+
+
 class Resume(Document):
     """Main Resume document for MongoDB"""
     resume_id = fields.StringField(primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -125,9 +170,14 @@ class Resume(Document):
     file_path = fields.StringField(max_length=500)
     file_size = fields.IntField()  # in bytes
     file_type = fields.StringField(max_length=10)  # pdf, docx, txt
+    content_hash = fields.StringField(max_length=64)  # ResumeBlob.sha256 of the uploaded file
     
     # Raw content
-    raw_text = fields.StringField()  # Extracted text from file
+    raw_text = CompressedTextField()  # Extracted text from file; None for versions stored as deltas
+    text_delta = fields.BinaryField()  # resumes.deltas delta against delta_base_id's text
+    delta_base_id = fields.StringField()
+    delta_depth = fields.IntField(default=0)  # deltas to replay before reaching a full-text resume
+    extraction = fields.EmbeddedDocumentField(ExtractionMetadata)
     
     # Structured data
     work_experience = fields.ListField(fields.EmbeddedDocumentField(WorkExperience))
@@ -181,16 +231,41 @@ class Resume(Document):
             'is_active',
             'created_at',
             'processing_status',
+            'content_hash',
+            'delta_base_id',
+            'delta_depth',
             ('user_id', 'is_primary'),
             ('user_id', 'created_at'),
         ]
     }
     
     def save(self, *args, **kwargs):
-        """Override save to update timestamp"""
+        """Override save to update timestamp and canonical skill ids"""
         self.updated_at = datetime.utcnow()
+        taxonomy = get_taxonomy()
+        for skill in self.skills:
+            skill.skill_id = taxonomy.resolve(skill.name)
+        if self.parsed_content:
+            self.parsed_content.skill_ids = taxonomy.resolve_many(self.parsed_content.skills_extracted)
         return super().save(*args, **kwargs)
     
+    def delete(self, *args, **kwargs):
+        """Delete the resume, rebasing versions stored against it and dropping its file blob reference"""
+        from .versions import detach_dependents
+        detach_dependents(self)
+        result = super().delete(*args, **kwargs)
+        if self.content_hash:
+            from .storage import release_blob
+            release_blob(self.content_hash)
+        return result
+    
+    def get_text(self):
+        """Full resume text; versions stored as deltas are reconstructed (and cached)"""
+        if self.text_delta is None:
+            return self.raw_text or ''
+        from .versions import resume_text
+        return resume_text(self)
+    
     def set_as_primary(self):
         """Set this resume as primary and unset others"""
         # First, unset all other primary resumes for this user
@@ -199,11 +274,32 @@ class Resume(Document):
         self.is_primary = True
         self.save()
     
+    def increment_view_count(self):
+        """Count a view (buffered ``$inc``; leaves ``updated_at`` and this instance untouched)"""
+        counters().incr(Resume, self.resume_id, 'view_count')
+    
+    def increment_download_count(self):
+        """Count a download (buffered ``$inc``, like views)"""
+        counters().incr(Resume, self.resume_id, 'download_count')
+    
     def calculate_total_experience(self):
         """Calculate total work experience in years"""
         total_months = sum(exp.duration_months() for exp in self.work_experience)
         return round(total_months / 12, 1)
     
+    def precomputed_skills(self):
+        """Canonical skill ids and normalized non-taxonomy skill names stored by the processing
+        pipeline, or None if this version has not been processed yet"""
+        content = self.parsed_content
+        if content is None or content.parsed_version != self.version:
+            return None
+        taxonomy = get_taxonomy()
+        unknown = {
+            normalize_text(name).strip() for name in content.skills_extracted
+            if taxonomy.resolve(name) is None
+        }
+        return set(content.skill_ids), unknown
+    
     def get_skills_by_category(self):
         """Group skills by category"""
         skills_by_category = {}
@@ -224,94 +320,31 @@ class Resume(Document):
         return [exp for exp in self.work_experience 
                 if exp.start_date and exp.start_date >= cutoff_date]
     
-    def to_dict(self):
-        """Convert to dictionary for API responses"""
-        return {
-            'resume_id': self.resume_id,
-            'user_id': self.user_id,
-            'title': self.title,
-            'is_primary': self.is_primary,
-            'is_active': self.is_active,
-            'original_filename': self.original_filename,
-            'file_path': self.file_path,
-            'file_size': self.file_size,
-            'file_type': self.file_type,
-            'work_experience': [
-                {
-                    'company': exp.company,
-                    'position': exp.position,
-                    'location': exp.location,
-                    'start_date': exp.start_date.isoformat() if exp.start_date else None,
-                    'end_date': exp.end_date.isoformat() if exp.end_date else None,
-                    'is_current': exp.is_current,
-                    'description': exp.description,
-                    'achievements': exp.achievements,
-                    'technologies': exp.technologies,
-                } for exp in self.work_experience
-            ],
-            'education': [
-                {
-                    'institution': edu.institution,
-                    'degree': edu.degree,
-                    'field_of_study': edu.field_of_study,
-                    'location': edu.location,
-                    'start_date': edu.start_date.isoformat() if edu.start_date else None,
-                    'end_date': edu.end_date.isoformat() if edu.end_date else None,
-                    'gpa': edu.gpa,
-                    'honors': edu.honors,
-                } for edu in self.education
-            ],
-            'projects': [
-                {
-                    'name': proj.name,
-                    'description': proj.description,
-                    'technologies': proj.technologies,
-                    'url': proj.url,
-                    'github_url': proj.github_url,
-                    'role': proj.role,
-                } for proj in self.projects
-            ],
-            'certifications': [
-                {
-                    'name': cert.name,
-                    'issuing_organization': cert.issuing_organization,
-                    'issue_date': cert.issue_date.isoformat() if cert.issue_date else None,
-                    'expiration_date': cert.expiration_date.isoformat() if cert.expiration_date else None,
-                    'credential_id': cert.credential_id,
-                    'credential_url': cert.credential_url,
-                } for cert in self.certifications
-            ],
-            'skills': [
-                {
-                    'name': skill.name,
-                    'category': skill.category,
-                    'proficiency': skill.proficiency,
-                    'years_experience': skill.years_experience,
-                } for skill in self.skills
-            ],
-            'languages': self.languages,
-            'volunteer_experience': self.volunteer_experience,
-            'publications': self.publications,
-            'awards': self.awards,
-            'parsed_content': {
-                'contact_info': self.parsed_content.contact_info,
-                'summary': self.parsed_content.summary,
-                'skills_extracted': self.parsed_content.skills_extracted,
-                'total_experience_years': self.parsed_content.total_experience_years,
-                'ai_score': self.parsed_content.ai_score,
-                'ai_feedback': self.parsed_content.ai_feedback,
-                'improvement_suggestions': self.parsed_content.improvement_suggestions,
-            } if self.parsed_content else None,
-            'processing_status': self.processing_status,
-            'version': self.version,
-            'view_count': self.view_count,
-            'download_count': self.download_count,
-            'application_count': self.application_count,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'parsed_at': self.parsed_at.isoformat() if self.parsed_at else None,
-            'last_used_at': self.last_used_at.isoformat() if self.last_used_at else None,
-        }
+    # API representation (compiled from this schema on first use)
+    to_dict = CompiledSerializer([
+        'resume_id', 'user_id', 'title', 'is_primary', 'is_active',
+        'original_filename', 'file_path', 'file_size', 'file_type',
+        ('work_experience', [
+            'company', 'position', 'location', 'start_date', 'end_date', 'is_current',
+            'description', 'achievements', 'technologies',
+        ]),
+        ('education', [
+            'institution', 'degree', 'field_of_study', 'location', 'start_date', 'end_date', 'gpa', 'honors',
+        ]),
+        ('projects', ['name', 'description', 'technologies', 'url', 'github_url', 'role']),
+        ('certifications', [
+            'name', 'issuing_organization', 'issue_date', 'expiration_date', 'credential_id', 'credential_url',
+        ]),
+        ('skills', ['name', 'skill_id', 'category', 'proficiency', 'years_experience']),
+        'languages', 'volunteer_experience', 'publications', 'awards',
+        ('parsed_content', [
+            'contact_info', 'summary', 'skills_extracted', 'skill_ids', 'total_experience_years',
+            'ai_score', 'ai_feedback', 'improvement_suggestions',
+        ]),
+        ('extraction', ['page_count', 'pages_extracted', 'failed_pages', 'truncated', 'timed_out', 'duration_ms']),
+        'processing_status', 'version', 'parent_resume_id', 'view_count', 'download_count', 'application_count',
+        'created_at', 'updated_at', 'parsed_at', 'last_used_at',
+    ])
     
     def __str__(self):
         return f"{self.title} - {self.user_id}"
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+LLM resume parsing, chunked by section.
+
+Long resumes are split on their section headings (experience, education,
+projects, ...) and each chunk is parsed concurrently against the same JSON
+schema; the partial results are merged back into one document. Because
+every chunk is an independent ``complete_json`` call, an edited version of a
+resume only sends the sections that changed upstream: unchanged chunks hash
+to the same cache key and come straight from the LLM response cache.
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from django.conf import settings
+
+from core.llm import complete_json
+
+RESUME_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "skills": {
+            "type": "array",
+            "items": {"type": "string"}
+        },
+        "experience": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "company": {"type": "string"},
+                    "title": {"type": "string"},
+                    "location": {"type": "string"},
+                    "start_date": {"type": "string"},
+                    "end_date": {"type": "string"},
+                    "bullets": {"type": "array", "items": {"type": "string"}}
+                },
+                "required": ["company", "title"]
+            }
+        },
+        "education": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "institution": {"type": "string"},
+                    "degree": {"type": "string"},
+                    "field": {"type": "string"},
+                    "start_date": {"type": "string"},
+                    "end_date": {"type": "string"}
+                },
+                "required": ["institution"]
+            }
+        }
+    },
+    "required": ["skills", "experience"]
+}
+
+RESUME_PROMPT = (
+    "You are a resume parser. Extract structured JSON from the provided resume text. "
+    "Return ONLY JSON matching the provided JSON schema. "
+    "Include a concise professional summary if apparent, an array of normalized skills, "
+    "experience items (company, title, dates, bullets), and education entries."
+)
+
+SECTION_PROMPT = (
+    RESUME_PROMPT + " The text is only the '{section}' section of a longer resume; "
+    "leave fields that do not appear in it empty."
+)
+
+# Heading keywords -> canonical section name
+SECTION_HEADINGS = {
+    'experience': 'experience',
+    'work experience': 'experience',
+    'professional experience': 'experience',
+    'employment': 'experience',
+    'employment history': 'experience',
+    'work history': 'experience',
+    'education': 'education',
+    'academic background': 'education',
+    'projects': 'projects',
+    'personal projects': 'projects',
+    'skills': 'skills',
+    'technical skills': 'skills',
+    'summary': 'summary',
+    'professional summary': 'summary',
+    'profile': 'summary',
+    'objective': 'summary',
+    'certifications': 'certifications',
+    'certificates': 'certifications',
+}
+
+_HEADING_RE = re.compile(
+    r"^\s*(?P<name>" + "|".join(sorted((re.escape(k) for k in SECTION_HEADINGS), key=len, reverse=True)) + r")\s*:?\s*$",
+    re.IGNORECASE,
+)
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """Split resume text into ``(section, text)`` pairs; text before the first heading is ``header``"""
+    sections: List[Tuple[str, List[str]]] = [('header', [])]
+    for line in (text or '').splitlines():
+        match = _HEADING_RE.match(line)
+        if match:
+            sections.append((SECTION_HEADINGS[match.group('name').lower()], [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(name, "\n".join(lines).strip()) for name, lines in sections if "\n".join(lines).strip()]
+
+
+def _split_long(section: str, text: str, max_chars: int) -> List[Tuple[str, str]]:
+    """Break an oversized section on blank lines so each chunk fits the budget"""
+    if len(text) <= max_chars:
+        return [(section, text)]
+    chunks, current = [], ''
+    for block in re.split(r"\n\s*\n", text):
+        if current and len(current) + len(block) + 2 > max_chars:
+            chunks.append((section, current))
+            current = ''
+        current = f"{current}\n\n{block}" if current else block
+    if current:
+        chunks.append((section, current))
+    return chunks
+
+
+def chunk_resume(text: str, max_chars: int) -> List[Tuple[str, str]]:
+    chunks = []
+    for section, body in split_sections(text):
+        chunks.extend(_split_long(section, body, max_chars))
+    return chunks
+
+
+def _parse_chunk(section: str, text: str) -> Dict[str, Any]:
+    return complete_json(
+        [
+            {"role": "system", "content": SECTION_PROMPT.format(section=section)},
+            {"role": "user", "content": text},
+        ],
+        RESUME_SCHEMA,
+        schema_name="resume_schema",
+        temperature=0.2,
+    ) or {}
+
+
+def merge_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine per-chunk parses: first summary wins, skills are de-duplicated, lists are concatenated"""
+    merged: Dict[str, Any] = {"summary": "", "skills": [], "experience": [], "education": []}
+    seen_skills = set()
+    for result in results:
+        if not isinstance(result, dict):
+            continue
+        if not merged["summary"] and result.get("summary"):
+            merged["summary"] = result["summary"]
+        for skill in result.get("skills") or []:
+            key = str(skill).strip().lower()
+            if key and key not in seen_skills:
+                seen_skills.add(key)
+                merged["skills"].append(str(skill).strip())
+        merged["experience"].extend(result.get("experience") or [])
+        merged["education"].extend(result.get("education") or [])
+    return merged
+
+
+def parse_resume_text(text: str) -> Dict[str, Any]:
+    """Parse resume text into ``RESUME_SCHEMA``; long resumes are parsed section by section in parallel"""
+    max_chars = getattr(settings, 'RESUME_PARSE_CHUNK_CHARS', 6000)
+    if len(text) <= max_chars:
+        return complete_json(
+            [
+                {"role": "system", "content": RESUME_PROMPT},
+                {"role": "user", "content": text},
+            ],
+            RESUME_SCHEMA,
+            schema_name="resume_schema",
+            temperature=0.2,
+        )
+
+    chunks = chunk_resume(text, max_chars)
+    workers = max(1, min(len(chunks), getattr(settings, 'LLM_MAX_CONCURRENCY', 4)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='resume-parse') as pool:
+        results = list(pool.map(lambda chunk: _parse_chunk(*chunk), chunks))
+    return merge_results(results)
@@ -0,0 +1,254 @@
+"""
+Background resume processing.
+
+Uploads only persist the file and a ``pending`` Resume; the heavy work
+(text extraction, LLM structuring and skill extraction, downstream index
+updates) runs on a local worker pool. Derived fields are stored once per
+resume version so consumers never re-derive them from ``raw_text``. The ``resumes`` collection itself is the queue: a worker
+claims a resume by atomically flipping ``processing_status`` from
+``pending`` to ``processing``, so a resume is processed at most once even
+when several workers or ``manage.py process_resumes`` run side by side.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.dispatch import Signal
+
+from core.llm import LLMNotConfigured
+from core.taxonomy import get_taxonomy
+from .models import (
+    Education, ExtractionMetadata, PageExtraction, ParsedContent, Resume, ResumeBlob, Skill, WorkExperience,
+)
+from .parsing import parse_resume_text
+from .storage import memoize_extraction
+from .utils import extract_document
+
+logger = logging.getLogger(__name__)
+
+# Sent after a resume reaches ``completed``; receivers update derived indexes.
+resume_processed = Signal()
+
+_DATE_FORMATS = ('%Y-%m-%d', '%Y-%m', '%m/%Y', '%b %Y', '%B %Y', '%b. %Y', '%Y')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'RESUME_PROCESSING_WORKERS', 2),
+                thread_name_prefix='resume-worker',
+            )
+        return _executor
+
+
+def enqueue(resume_id: str):
+    """Schedule a pending resume on the local worker pool"""
+    return get_executor().submit(process_resume, resume_id)
+
+
+def _claim(**filters) -> Optional[Resume]:
+    return Resume.objects(processing_status='pending', **filters).order_by('created_at').modify(
+        new=True,
+        set__processing_status='processing',
+        set__processing_error=None,
+        set__updated_at=datetime.utcnow(),
+    )
+
+
+def extract_resume_text(resume: Resume):
+    """Extract ``raw_text`` from the stored file within the configured page/time/memory budgets"""
+    result = extract_document(
+        resume.file_path,
+        resume.file_type,
+        max_pages=getattr(settings, 'PDF_EXTRACTION_MAX_PAGES', 50),
+        timeout=getattr(settings, 'PDF_EXTRACTION_TIMEOUT', 20),
+        max_memory_mb=getattr(settings, 'PDF_EXTRACTION_MAX_MEMORY_MB', 512),
+        workers=getattr(settings, 'PDF_EXTRACTION_WORKERS', 2),
+    )
+    resume.raw_text = result.text
+    resume.extraction = ExtractionMetadata(
+        page_count=result.page_count,
+        pages_extracted=len(result.pages) - len(result.failed_pages),
+        failed_pages=result.failed_pages,
+        truncated=result.truncated,
+        timed_out=result.timed_out,
+        duration_ms=result.duration_ms,
+        pages=[
+            PageExtraction(page=p.page, duration_ms=p.duration_ms, chars=p.chars, error=p.error[:500] if p.error else None)
+            for p in result.pages
+        ],
+    )
+
+
+def _parse_date(value) -> Optional[datetime]:
+    value = (value or '').strip()
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _is_present(value) -> bool:
+    return (value or '').strip().lower() in ('present', 'current', 'now', 'ongoing')
+
+
+def apply_structured(resume: Resume, parsed: dict):
+    """Map an LLM parse (``RESUME_SCHEMA``) onto the embedded resume documents"""
+    resume.parsed_content.summary = parsed.get('summary') or resume.parsed_content.summary
+    resume.work_experience = [
+        WorkExperience(
+            company=(item.get('company') or '')[:200],
+            position=(item.get('title') or '')[:200],
+            location=(item.get('location') or '')[:100] or None,
+            start_date=_parse_date(item.get('start_date')),
+            end_date=None if _is_present(item.get('end_date')) else _parse_date(item.get('end_date')),
+            is_current=_is_present(item.get('end_date')),
+            achievements=[str(b)[:500] for b in item.get('bullets') or []],
+        )
+        for item in parsed.get('experience') or []
+        if item.get('company') and item.get('title')
+    ]
+    resume.education = [
+        Education(
+            institution=item['institution'][:200],
+            degree=(item.get('degree') or '')[:100] or None,
+            field_of_study=(item.get('field') or '')[:100] or None,
+            start_date=_parse_date(item.get('start_date')),
+            end_date=_parse_date(item.get('end_date')),
+        )
+        for item in parsed.get('education') or []
+        if item.get('institution')
+    ]
+
+
+def analyze_resume(resume: Resume, parsed: Optional[dict] = None, use_llm: bool = True) -> Optional[dict]:
+    """Derive structured fields from the resume's text once per resume version.
+
+    Uses ``parsed`` (a memoized LLM parse) when given, otherwise asks the LLM
+    if ``use_llm`` and a backend is configured. Skills always include the
+    taxonomy matches in the text, so resumes still get skills without an LLM.
+    Returns the LLM parse so callers can memoize it.
+    """
+    taxonomy = get_taxonomy()
+    text = resume.get_text()
+    if resume.parsed_content is None:
+        resume.parsed_content = ParsedContent()
+
+    if parsed is None and use_llm and text:
+        try:
+            parsed = parse_resume_text(text)
+        except LLMNotConfigured:
+            parsed = None
+        except Exception:
+            logger.warning("LLM parsing failed for resume %s; using taxonomy skills only",
+                           resume.resume_id, exc_info=True)
+            parsed = None
+
+    skill_ids = set(taxonomy.extract(text))
+    extra = []
+    if isinstance(parsed, dict):
+        apply_structured(resume, parsed)
+        for name in parsed.get('skills') or []:
+            name = str(name).strip()[:100]
+            skill_id = taxonomy.resolve(name)
+            if skill_id is not None:
+                skill_ids.add(skill_id)
+            elif name and name.lower() not in {e.lower() for e in extra}:
+                extra.append(name)
+
+    resume.skills = [
+        Skill(name=taxonomy.name(i), category=taxonomy.get(i).category) for i in sorted(skill_ids)
+    ] + [Skill(name=name) for name in extra]
+    resume.parsed_content.skills_extracted = taxonomy.names(skill_ids) + extra
+    resume.parsed_content.total_experience_years = (
+        int(round(resume.calculate_total_experience())) if resume.work_experience else None
+    )
+    resume.parsed_content.parsed_version = resume.version
+    return parsed if isinstance(parsed, dict) else None
+
+
+def apply_memoized(resume: Resume, blob: Optional[ResumeBlob] = None) -> bool:
+    """Reuse text and structure already extracted from identical bytes; False if there is nothing to reuse"""
+    if not resume.content_hash:
+        return False
+    if blob is None:
+        blob = ResumeBlob.objects(sha256=resume.content_hash).first()
+    if blob is None or not blob.is_extracted:
+        return False
+    resume.raw_text = blob.raw_text
+    resume.extraction = blob.extraction
+    # Re-deriving from the memoized parse is a single taxonomy pass; no LLM call
+    analyze_resume(resume, parsed=blob.structured or None, use_llm=False)
+    return True
+
+
+def complete(resume: Resume) -> Resume:
+    """Mark a resume as processed, persist it and notify index consumers"""
+    resume.processing_status = 'completed'
+    resume.processing_error = None
+    resume.parsed_at = datetime.utcnow()
+    resume.save()
+    try:
+        resume_processed.send(sender=Resume, resume=resume)
+    except Exception:
+        logger.exception("resume_processed receiver failed for %s", resume.resume_id)
+    return resume
+
+
+def process_resume(resume_id: str) -> Optional[Resume]:
+    """Claim and process one resume; returns None if another worker already claimed it"""
+    resume = _claim(resume_id=resume_id)
+    if resume is None:
+        return None
+    return _run(resume)
+
+
+def _run(resume: Resume) -> Resume:
+    try:
+        if not apply_memoized(resume):
+            if resume.file_path and not resume.raw_text:
+                extract_resume_text(resume)
+            parsed = analyze_resume(resume)
+            memoize_extraction(resume, parsed)
+    except Exception as e:
+        logger.exception("Processing failed for resume %s", resume.resume_id)
+        Resume.objects(resume_id=resume.resume_id).update_one(
+            set__processing_status='failed',
+            set__processing_error=str(e)[:1000],
+            set__updated_at=datetime.utcnow(),
+        )
+        resume.processing_status = 'failed'
+        resume.processing_error = str(e)[:1000]
+        return resume
+    return complete(resume)
+
+
+def process_pending(limit: Optional[int] = None) -> int:
+    """Drain pending resumes in upload order; returns the number processed"""
+    count = 0
+    while limit is None or count < limit:
+        resume = _claim()
+        if resume is None:
+            break
+        _run(resume)
+        count += 1
+    return count
+
+
+def requeue_stale(older_than: timedelta) -> int:
+    """Return resumes stuck in ``processing`` (e.g. worker died) to ``pending``"""
+    cutoff = datetime.utcnow() - older_than
+    return Resume.objects(processing_status='processing', updated_at__lt=cutoff).update(
+        set__processing_status='pending',
+        set__updated_at=datetime.utcnow(),
+    )
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from core.projections import Projection
 from .models import Resume
 
 class ResumeSerializer(serializers.ModelSerializer):
@@ -6,3 +7,17 @@ class ResumeSerializer(serializers.ModelSerializer):
         model = Resume
         fields = ["id","user","text","parsed_at"]
         read_only_fields = ["id","parsed_at","user"]
+
+
+# Shape of each row in the resume list (no raw_text or embedded sections)
+RESUME_LIST_PROJECTION = Projection(Resume, [
+    'resume_id',
+    'title',
+    'is_primary',
+    'created_at',
+    'parsed_at',
+    'file_type',
+    'file_size',
+    'version',
+    'parent_resume_id',
+])
@@ -0,0 +1,116 @@
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from django.conf import settings
+from mongoengine import Q
+
+from .models import ResumeBlob
+
+logger = logging.getLogger(__name__)
+
+# A removal claim older than this is left over from a crashed process and is ignored
+REMOVAL_CLAIM_TIMEOUT = timedelta(seconds=30)
+
+
+def blob_root() -> str:
+    return os.path.join(settings.MEDIA_ROOT, 'resumes', 'blobs')
+
+
+def blob_path(sha256: str) -> str:
+    """``<MEDIA_ROOT>/resumes/blobs/ab/abcdef...`` (two-level fan-out keeps directories small)"""
+    return os.path.join(blob_root(), sha256[:2], sha256)
+
+
+def save_upload(file, ext: str) -> ResumeBlob:
+    """Stream an uploaded file to the content-addressed store and take a reference on its blob.
+
+    The SHA-256 is computed while the chunks are written, so the upload is
+    read exactly once. Identical bytes map to a single file on disk no matter
+    who uploads them or under which name. The reference is taken before the
+    file is moved into place, so a concurrent ``release_blob`` of the last
+    reference either sees it and keeps the file, or finishes removing the
+    file before it is written again.
+    """
+    tmp_dir = os.path.join(blob_root(), 'tmp')
+    os.makedirs(tmp_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, suffix='.part')
+    blob = None
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in file.chunks():
+                digest.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+        sha256 = digest.hexdigest()
+        blob = ResumeBlob.objects(sha256=sha256).modify(
+            upsert=True,
+            new=True,
+            inc__ref_count=1,
+            set_on_insert__size=size,
+            set_on_insert__file_type=ext,
+            set_on_insert__path=blob_path(sha256),
+            set_on_insert__created_at=datetime.utcnow(),
+        )
+        _wait_for_removal(blob)
+        os.makedirs(os.path.dirname(blob.path), exist_ok=True)
+        # Same hash means same bytes, so replacing an existing blob is harmless
+        os.replace(tmp_path, blob.path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        if blob is not None:
+            release_blob(blob.sha256)
+        raise
+    return blob
+
+
+def _wait_for_removal(blob: ResumeBlob):
+    """Block while ``release_blob`` is still removing this blob's previous file"""
+    while blob.removing_at and datetime.utcnow() - blob.removing_at < REMOVAL_CLAIM_TIMEOUT:
+        time.sleep(0.05)
+        blob.reload('removing_at')
+
+
+def release_blob(sha256: str):
+    """Drop one reference; the file and its memoized extraction go away with the last one"""
+    blob = ResumeBlob.objects(sha256=sha256).modify(new=True, dec__ref_count=1)
+    if blob is None or blob.ref_count > 0:
+        return
+    # Claim the removal while the blob is still unreferenced; an upload that takes a new
+    # reference meanwhile waits for the claim to clear before writing the file again
+    now = datetime.utcnow()
+    claimed = ResumeBlob.objects(
+        Q(removing_at=None) | Q(removing_at__lt=now - REMOVAL_CLAIM_TIMEOUT),
+        sha256=sha256, ref_count__lte=0,
+    ).modify(new=True, set__removing_at=now)
+    if claimed is None:
+        return
+    try:
+        os.remove(claimed.path)
+    except FileNotFoundError:
+        pass
+    except OSError:
+        logger.warning("Could not remove resume blob %s", claimed.path)
+    finally:
+        if not ResumeBlob.objects(sha256=sha256, ref_count__lte=0).delete():
+            # Referenced again during the removal: release the waiting upload
+            ResumeBlob.objects(sha256=sha256).update_one(unset__removing_at=True)
+
+
+def memoize_extraction(resume, structured: Optional[dict]):
+    """Record a resume's extracted text and LLM parse on its blob for later identical uploads"""
+    if not resume.content_hash:
+        return
+    ResumeBlob.objects(sha256=resume.content_hash).update_one(
+        set__raw_text=resume.raw_text or "",
+        set__extraction=resume.extraction,
+        set__structured=structured,
+        set__extracted_at=datetime.utcnow(),
+    )
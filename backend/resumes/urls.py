@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import ResumeCreateView, ExtractSkillsView, ParseResumeView, ResumeUploadView, ResumeListView, ResumeTextCreateView
+from .views import ResumeCreateView, ExtractSkillsView, ParseResumeView, ResumeUploadView, ResumeListView, ResumeTextCreateView, ResumeStatusView, ResumeVersionsView
 
 urlpatterns = [
     path('', ResumeCreateView.as_view(), name='resume-create'),
@@ -8,4 +8,6 @@ urlpatterns = [
     path('text/', ResumeTextCreateView.as_view(), name='resume-text-create'),
     path('extract-skills/', ExtractSkillsView.as_view(), name='resume-extract-skills'),
     path('parse/', ParseResumeView.as_view(), name='resume-parse'),
+    path('<str:resume_id>/status/', ResumeStatusView.as_view(), name='resume-status'),
+    path('<str:resume_id>/versions/', ResumeVersionsView.as_view(), name='resume-versions'),
 ]
@@ -1,53 +1,363 @@
+import itertools
+import math
+import multiprocessing
 import os
-from typing import Optional
+import signal
+import threading
+import time
+import zipfile
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from xml.etree import ElementTree
 
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
-def extract_text_from_pdf(file_path: str) -> str:
+
+@dataclass
+class PageResult:
+    page: int
+    duration_ms: int = 0
+    chars: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class ExtractionResult:
+    text: str = ""
+    page_count: int = 0
+    pages: List[PageResult] = field(default_factory=list)
+    truncated: bool = False  # page cap hit
+    timed_out: bool = False  # document deadline hit
+    duration_ms: int = 0
+
+    @property
+    def failed_pages(self) -> List[int]:
+        return [p.page for p in self.pages if p.error]
+
+
+# Workers are recycled after this many tasks, so memory a parse leaves behind is returned to the OS
+MAX_TASKS_PER_WORKER = 20
+# How often the parent checks deadlines and worker RSS while waiting
+_POLL_INTERVAL = 0.05
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+_HAS_PROC = os.path.exists('/proc/self/statm')
+
+
+def _open_pdf(file_path: str):
     try:
         from pypdf import PdfReader
-    except Exception:
+    except ImportError:
         # Fallback import for older package name
-        try:
-            from PyPDF2 import PdfReader  # type: ignore
-        except Exception:
-            return ""
+        from PyPDF2 import PdfReader  # type: ignore
+    return PdfReader(file_path)
+
+
+def _rss(pid: Optional[int]) -> Optional[int]:
+    """Resident set size of ``pid`` in bytes (None where ``/proc`` is unavailable)"""
+    if pid is None:
+        return None
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# Worker side
+
+_started = None
+
+
+def _init_worker(started, max_memory_bytes: Optional[int]):
+    """Pool initializer: keep the start-notice queue; cap the address space where RSS cannot be watched"""
+    global _started
+    _started = started
+    if _HAS_PROC or resource is None or not max_memory_bytes:
+        return
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (max_memory_bytes, max_memory_bytes))
+    except (ValueError, OSError):
+        pass
+
+
+def _announce(token: int):
+    _started.put((token, os.getpid()))
+
+
+def _count_pages(token: int, deadline: float, file_path: str) -> int:
+    """Worker: open the PDF and count its pages"""
+    _announce(token)
+    return len(_open_pdf(file_path).pages)
+
+
+def _extract_page_range(token: int, deadline: float, file_path: str, start: int, end: int):
+    """Worker: extract pages [start, end) returning (page, text, duration_ms, error) tuples.
+
+    ``deadline`` is wall-clock time; pages not started by then are skipped, so a
+    task queued behind another document does no work once its own is over.
+    """
+    _announce(token)
+    out = []
     try:
-        reader = PdfReader(file_path)
-        texts = []
-        for page in getattr(reader, 'pages', []):
+        reader = _open_pdf(file_path)
+    except Exception as e:
+        return [(page, "", 0, f"open failed: {e}") for page in range(start, end)]
+    for page in range(start, end):
+        if time.time() >= deadline:
+            out.append((page, "", 0, "timed out"))
+            continue
+        started = time.perf_counter()
+        try:
+            txt = reader.pages[page].extract_text() or ""
+            error = None
+        except MemoryError:
+            txt, error = "", "memory limit exceeded"
+        except Exception as e:
+            txt, error = "", f"{type(e).__name__}: {e}"
+        out.append((page, txt, int((time.perf_counter() - started) * 1000), error))
+    return out
+
+
+# Parent side
+
+class ExtractionPool:
+    """Long-lived spawn pool that runs PDF work under a deadline and an RSS cap.
+
+    Workers announce ``(token, pid)`` on a queue when they start a task, so the
+    parent can watch the RSS of the worker running it (``/proc/<pid>/statm``)
+    and kill that worker when it goes over budget or past the deadline; the
+    pool starts a replacement. Without ``/proc`` the cap falls back to an
+    address-space limit (``RLIMIT_AS``) set in each worker.
+    """
+
+    def __init__(self, workers: int, max_memory_bytes: Optional[int]):
+        ctx = multiprocessing.get_context('spawn')
+        self.config = (workers, max_memory_bytes)
+        self._started = ctx.SimpleQueue()
+        self._pool = ctx.Pool(
+            processes=workers, initializer=_init_worker, initargs=(self._started, max_memory_bytes),
+            maxtasksperchild=MAX_TASKS_PER_WORKER,
+        )
+        self._tokens = itertools.count()
+        self._pids: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def _pid(self, token: int) -> Optional[int]:
+        with self._lock:
+            while not self._started.empty():
+                started, pid = self._started.get()
+                self._pids[started] = pid
+            return self._pids.get(token)
+
+    def _finish(self, token: int, kill: bool = False):
+        pid = self._pid(token)
+        with self._lock:
+            self._pids.pop(token, None)
+        if kill and pid is not None:
             try:
-                txt = page.extract_text() or ""
-            except Exception:
-                txt = ""
-            if txt:
-                texts.append(txt)
-        return "\n".join(texts)
-    except Exception:
-        return ""
+                os.kill(pid, getattr(signal, 'SIGKILL', signal.SIGTERM))
+            except OSError:
+                pass
 
+    def run(self, calls: List[Tuple[Callable, tuple]], deadline: float,
+            max_rss: Optional[int]) -> List[Tuple[str, Any]]:
+        """Run ``(func, args)`` calls; ``deadline`` is a ``time.perf_counter()`` value.
 
-def extract_text_from_docx(file_path: str) -> str:
+        Returns ``(status, value)`` per call, in order: ``ok`` with the result,
+        ``error`` with the exception, or ``timeout`` / ``memory`` when the call
+        was cut off (its worker is killed if it had started).
+        """
+        wall_deadline = time.time() + (deadline - time.perf_counter())
+        pending = {}
+        for i, (func, args) in enumerate(calls):
+            token = next(self._tokens)
+            pending[i] = (token, self._pool.apply_async(func, (token, wall_deadline) + tuple(args)))
+
+        outcomes: Dict[int, Tuple[str, Any]] = {}
+        while pending:
+            for i, (token, async_result) in list(pending.items()):
+                if async_result.ready():
+                    try:
+                        outcomes[i] = ('ok', async_result.get())
+                    except Exception as e:
+                        outcomes[i] = ('error', e)
+                    self._finish(token)
+                elif time.perf_counter() >= deadline:
+                    outcomes[i] = ('timeout', None)
+                    self._finish(token, kill=True)
+                elif max_rss and (_rss(self._pid(token)) or 0) > max_rss:
+                    outcomes[i] = ('memory', None)
+                    self._finish(token, kill=True)
+                else:
+                    continue
+                del pending[i]
+            if pending:
+                next(iter(pending.values()))[1].wait(_POLL_INTERVAL)
+        return [outcomes[i] for i in range(len(calls))]
+
+    def close(self):
+        self._pool.terminate()
+        self._pool.join()
+
+
+_pool: Optional[ExtractionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_extraction_pool(workers: int, max_memory_bytes: Optional[int]) -> ExtractionPool:
+    """The process-wide extraction pool, recreated only when its size or memory cap changes"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.config != (workers, max_memory_bytes):
+            if _pool is not None:
+                _pool.close()
+            _pool = ExtractionPool(workers, max_memory_bytes)
+        return _pool
+
+
+def extract_pdf(file_path: str, max_pages: int = 50, timeout: float = 20.0,
+                max_memory_mb: Optional[int] = 512, workers: int = 2) -> ExtractionResult:
+    """Extract PDF text page-by-page on the shared extraction pool.
+
+    The page count is read in a worker too, so the parent never parses the
+    document. Pages are then split into contiguous ranges, one per worker.
+    Only the first ``max_pages`` pages are read, the whole document must
+    finish within ``timeout`` seconds and each worker is killed once its RSS
+    goes over ``max_memory_mb`` (see ``ExtractionPool``). Whatever finished
+    is returned as partial text with per-page timing and errors.
+    """
+    started = time.perf_counter()
+    deadline = started + timeout
+    max_memory = max_memory_mb * 1024 * 1024 if max_memory_mb else None
+    pool = get_extraction_pool(max(1, workers), max_memory)
+
+    [(status, value)] = pool.run([(_count_pages, (file_path,))], deadline, max_memory)
+    if status == 'error':
+        raise value
+    if status == 'memory':
+        raise MemoryError(f"PDF exceeded {max_memory_mb} MB while opening")
+    if status == 'timeout':
+        return ExtractionResult(timed_out=True, duration_ms=int((time.perf_counter() - started) * 1000))
+
+    page_count = value
+    limit = min(page_count, max_pages) if max_pages else page_count
+    result = ExtractionResult(page_count=page_count, truncated=limit < page_count)
+    if limit == 0:
+        return result
+
+    size = math.ceil(limit / max(1, min(workers, limit)))
+    ranges = [(s, min(s + size, limit)) for s in range(0, limit, size)]
+    outcomes = pool.run([(_extract_page_range, (file_path, s, e)) for s, e in ranges], deadline, max_memory)
+
+    texts = {}
+    for (start, end), (status, value) in zip(ranges, outcomes):
+        if status == 'ok':
+            rows = value
+        else:
+            # Cut off by the pool, or the worker died (e.g. killed by the OS)
+            error = {'timeout': "timed out", 'memory': "memory limit exceeded"}.get(status, f"worker failed: {value}")
+            rows = [(page, "", 0, error) for page in range(start, end)]
+        for page, txt, duration_ms, error in rows:
+            texts[page] = txt
+            result.timed_out = result.timed_out or error == "timed out"
+            result.pages.append(PageResult(page=page + 1, duration_ms=duration_ms, chars=len(txt), error=error))
+
+    result.text = "\n".join(texts[p] for p in sorted(texts) if texts[p])
+    result.duration_ms = int((time.perf_counter() - started) * 1000)
+    return result
+
+
+def extract_text_from_pdf(file_path: str) -> str:
     try:
-        from docx import Document  # python-docx
+        return extract_pdf(file_path).text
     except Exception:
         return ""
+
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_DOCX_TEXT, _DOCX_TAB, _DOCX_BREAKS = _W + 't', _W + 'tab', (_W + 'br', _W + 'cr')
+_DOCX_P, _DOCX_TC, _DOCX_TR, _DOCX_TBL, _DOCX_BODY = _W + 'p', _W + 'tc', _W + 'tr', _W + 'tbl', _W + 'body'
+
+
+def iter_docx_text(file_path: str) -> Iterator[str]:
+    """Stream paragraph and table-row text from ``word/document.xml`` in document order.
+
+    Parses incrementally and clears each body-level element once emitted, so
+    memory stays bounded by the largest single paragraph or table rather than
+    the whole document. Table rows are emitted as tab-separated cell text.
+    """
+    with zipfile.ZipFile(file_path) as archive, archive.open('word/document.xml') as xml:
+        paragraphs: List[list] = []  # stack of run texts for open (possibly nested) paragraphs
+        tables: List[list] = []     # stack of [row cells, current cell paragraphs] for nested tables
+        body = None
+        for event, elem in ElementTree.iterparse(xml, events=('start', 'end')):
+            tag = elem.tag
+            if event == 'start':
+                if tag == _DOCX_BODY:
+                    body = elem
+                elif tag == _DOCX_TBL:
+                    tables.append([[], []])
+                elif tag == _DOCX_P:
+                    paragraphs.append([])
+                continue
+
+            if tag == _DOCX_TEXT:
+                if elem.text and paragraphs:
+                    paragraphs[-1].append(elem.text)
+            elif tag == _DOCX_TAB and paragraphs:
+                paragraphs[-1].append('\t')
+            elif tag in _DOCX_BREAKS and paragraphs:
+                paragraphs[-1].append('\n')
+            elif tag == _DOCX_P:
+                text = ''.join(paragraphs.pop())
+                if tables:
+                    tables[-1][1].append(text)
+                elif text:
+                    yield text
+            elif tag == _DOCX_TC and tables:
+                cells, cell_paragraphs = tables[-1]
+                cells.append('\n'.join(cell_paragraphs).strip())
+                tables[-1][1] = []
+            elif tag == _DOCX_TR and tables:
+                row_text = '\t'.join(tables[-1][0])
+                tables[-1][0] = []
+                if row_text.strip():
+                    if len(tables) > 1:
+                        # Nested table rows become part of the enclosing cell
+                        tables[-2][1].append(row_text)
+                    else:
+                        yield row_text
+                elem.clear()
+            elif tag == _DOCX_TBL and tables:
+                tables.pop()
+
+            if body is not None and not tables and tag in (_DOCX_P, _DOCX_TBL):
+                body.clear()
+
+
+def extract_text_from_docx(file_path: str) -> str:
     try:
-        doc = Document(file_path)
-        parts = []
-        for p in getattr(doc, 'paragraphs', []):
-            if p.text:
-                parts.append(p.text)
-        # Optionally extract tables
-        for table in getattr(doc, 'tables', []):
-            for row in table.rows:
-                row_text = "\t".join(cell.text.strip() for cell in row.cells)
-                if row_text:
-                    parts.append(row_text)
-        return "\n".join(parts).strip()
+        return "\n".join(iter_docx_text(file_path)).strip()
     except Exception:
         return ""
 
 
+def extract_document(file_path: str, ext: Optional[str], **pdf_options) -> ExtractionResult:
+    """Extract text plus extraction metadata; errors that prevent opening the file propagate"""
+    ext = (ext or "").lower().lstrip('.')
+    if ext == 'pdf':
+        return extract_pdf(file_path, **pdf_options)
+    if ext in ('docx',):
+        started = time.perf_counter()
+        text = "\n".join(iter_docx_text(file_path)).strip()
+        return ExtractionResult(text=text, duration_ms=int((time.perf_counter() - started) * 1000))
+    return ExtractionResult()
+
+
 def extract_text_from_file(file_path: str, ext: Optional[str]) -> str:
     ext = (ext or "").lower().lstrip('.')
     if ext == 'pdf':
@@ -0,0 +1,170 @@
+"""
+Resume versions stored as text deltas.
+
+A version created from an existing resume keeps ``raw_text`` empty and
+stores ``text_delta`` against ``delta_base_id`` instead; ``delta_depth``
+counts the deltas between it and a resume holding full text. Reading a
+version replays the chain once and caches the result in the default cache,
+keyed by the delta's digest so a rebased version never serves stale text.
+A base's text is treated as immutable while versions depend on it.
+
+``compact`` rebases versions whose chains grew deeper than
+``RESUME_VERSION_MAX_DEPTH`` directly onto their chain's root (or stores
+full text when that delta would not be smaller), keeping reconstruction
+bounded to a couple of hops.
+"""
+import hashlib
+import logging
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .deltas import apply_delta, compressed_size, make_delta
+from .models import Resume
+
+logger = logging.getLogger(__name__)
+
+_CHAIN_FIELDS = ('resume_id', 'raw_text', 'text_delta', 'delta_base_id', 'delta_depth', 'file_path')
+
+
+class ResumeVersionError(Exception):
+    """A version cannot be created or reconstructed (e.g. missing base)"""
+
+
+def _max_depth() -> int:
+    return getattr(settings, 'RESUME_VERSION_MAX_DEPTH', 10)
+
+
+def _cache_key(resume: Resume) -> str:
+    digest = hashlib.sha1(bytes(resume.text_delta)).hexdigest()[:16]
+    return f"resume_text:{resume.resume_id}:{digest}"
+
+
+def resume_text(resume: Resume) -> str:
+    """Full text of a resume, replaying its delta chain if it is a stored version"""
+    if resume.text_delta is None:
+        return resume.raw_text or ''
+    key = _cache_key(resume)
+    text = cache.get(key)
+    if text is not None:
+        return text
+    base = Resume.objects(resume_id=resume.delta_base_id).only(*_CHAIN_FIELDS).first()
+    if base is None:
+        raise ResumeVersionError(f"Delta base {resume.delta_base_id} of resume {resume.resume_id} is missing")
+    text = apply_delta(resume_text(base), resume.text_delta)
+    cache.set(key, text, getattr(settings, 'RESUME_TEXT_CACHE_TIMEOUT', 3600))
+    return text
+
+
+def _store(resume: Resume, text: str, base: Optional[Resume]):
+    """Set ``resume``'s text as a delta against ``base`` or, if that is not smaller, as full text"""
+    if base is not None:
+        delta = make_delta(resume_text(base), text)
+        if len(delta) < compressed_size(text):
+            resume.raw_text = None
+            resume.text_delta = delta
+            resume.delta_base_id = base.resume_id
+            resume.delta_depth = base.delta_depth + 1
+            return
+    resume.raw_text = text
+    resume.text_delta = None
+    resume.delta_base_id = None
+    resume.delta_depth = 0
+
+
+def create_version(parent: Resume, text: str, title: Optional[str] = None) -> Resume:
+    """Create a pending text version of ``parent`` whose text is stored as a delta against it"""
+    if parent.file_path and not parent.raw_text and parent.text_delta is None:
+        raise ResumeVersionError("Parent resume has not been processed yet")
+    version = Resume(
+        user_id=parent.user_id,
+        title=title or parent.title,
+        file_type='txt',
+        version=(parent.version or 1) + 1,
+        parent_resume_id=parent.resume_id,
+        processing_status='pending',
+    )
+    # Past the depth limit the new version starts a fresh chain instead of growing this one
+    _store(version, text, parent if parent.delta_depth < _max_depth() else None)
+    version.save()
+    return version
+
+
+def _root(resume: Resume) -> Resume:
+    while resume.text_delta is not None:
+        base = Resume.objects(resume_id=resume.delta_base_id).only(*_CHAIN_FIELDS).first()
+        if base is None:
+            raise ResumeVersionError(f"Delta base {resume.delta_base_id} of resume {resume.resume_id} is missing")
+        resume = base
+    return resume
+
+
+def _shift_depth(resume_id: str, amount: int):
+    """Apply a depth change to every version stored (transitively) against ``resume_id``"""
+    pending = [resume_id]
+    while pending:
+        dependents = [r.resume_id for r in Resume.objects(delta_base_id__in=pending).only('resume_id')]
+        if dependents:
+            Resume.objects(resume_id__in=dependents).update(inc__delta_depth=amount)
+        pending = dependents
+
+
+def rebase(resume: Resume, onto: Optional[Resume]) -> Resume:
+    """Re-store ``resume``'s text against ``onto`` (full text if None) without changing the text itself"""
+    text = resume_text(resume)
+    old_depth = resume.delta_depth
+    _store(resume, text, onto)
+    Resume.objects(resume_id=resume.resume_id).update_one(
+        set__raw_text=resume.raw_text,
+        set__text_delta=resume.text_delta,
+        set__delta_base_id=resume.delta_base_id,
+        set__delta_depth=resume.delta_depth,
+    )
+    if resume.delta_depth != old_depth:
+        _shift_depth(resume.resume_id, resume.delta_depth - old_depth)
+    return resume
+
+
+def detach_dependents(resume: Resume):
+    """Before ``resume`` is deleted, move versions stored against it onto its own base"""
+    onto = None
+    if resume.text_delta is not None:
+        onto = Resume.objects(resume_id=resume.delta_base_id).only(*_CHAIN_FIELDS).first()
+    for dependent in Resume.objects(delta_base_id=resume.resume_id).only(*_CHAIN_FIELDS):
+        rebase(dependent, onto)
+
+
+def compact(max_depth: Optional[int] = None) -> Dict[str, int]:
+    """Rebase versions deeper than ``max_depth`` onto their chain root; returns counts"""
+    max_depth = _max_depth() if max_depth is None else max_depth
+    stats = {'rebased': 0, 'materialized': 0, 'failed': 0}
+    failed = []
+    while True:
+        # Shallowest first: rebasing a version also lifts everything stored against it
+        resume = Resume.objects(delta_depth__gt=max_depth, resume_id__nin=failed).only(
+            *_CHAIN_FIELDS).order_by('delta_depth').first()
+        if resume is None:
+            return stats
+        try:
+            rebase(resume, _root(resume))
+        except Exception:
+            logger.exception("Could not compact resume version %s", resume.resume_id)
+            stats['failed'] += 1
+            failed.append(resume.resume_id)
+            continue
+        stats['materialized' if resume.text_delta is None else 'rebased'] += 1
+
+
+def storage_report(user_id: Optional[str] = None) -> Dict[str, int]:
+    """Stored text bytes for versions vs. what full copies would take"""
+    qs = Resume.objects(text_delta__ne=None)
+    if user_id:
+        qs = qs.filter(user_id=user_id)
+    report = {'versions': 0, 'delta_bytes': 0, 'full_text_bytes': 0, 'max_depth': 0}
+    for resume in qs.only(*_CHAIN_FIELDS):
+        report['versions'] += 1
+        report['delta_bytes'] += len(resume.text_delta)
+        report['full_text_bytes'] += len(resume_text(resume).encode('utf-8'))
+        report['max_depth'] = max(report['max_depth'], resume.delta_depth)
+    return report
@@ -1,20 +1,15 @@
 from rest_framework import generics, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.conf import settings
-from datetime import datetime
 from .models import Resume
-from .serializers import ResumeSerializer
-from .utils import extract_text_from_file
+from .serializers import ResumeSerializer, RESUME_LIST_PROJECTION
+from .pipeline import apply_memoized, complete, enqueue
+from .parsing import parse_resume_text
+from .storage import release_blob, save_upload
+from .versions import ResumeVersionError, create_version
+from core.llm import LLMNotConfigured, complete_json
+from core.taxonomy import get_taxonomy
 import os
-import json
-from typing import Any, Dict
-
-try:
-    from openai import OpenAI
-    _openai_available = True
-except Exception:
-    _openai_available = False
 
 class ResumeCreateView(generics.ListCreateAPIView):
     serializer_class = ResumeSerializer
@@ -30,20 +25,6 @@ class ResumeCreateView(generics.ListCreateAPIView):
 class ExtractSkillsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
-    # Simple keyword-based extraction for demo; replace with LLM if needed
-    SKILL_KEYWORDS = {
-        'javascript','typescript','react','vue','angular','node','express','nextjs','nestjs',
-        'python','django','flask','fastapi','pandas','numpy','scikit-learn','sklearn','tensorflow','pytorch',
-        'java','spring','spring boot','kotlin','scala',
-        'go','golang','rust',
-        'sql','postgres','mysql','mongodb','redis','elasticsearch',
-        'graphql','rest','docker','kubernetes','aws','gcp','azure','terraform','ansible',
-        'html','css','sass','tailwind','bootstrap',
-        'ci/cd','github actions','gitlab ci','jenkins',
-        'react native','flutter','swift','objective-c','android','ios',
-        'ml','machine learning','nlp','computer vision','llm','transformers'
-    }
-
     def post(self, request):
         text = request.data.get('text')
         if not text:
@@ -56,48 +37,45 @@ class ExtractSkillsView(APIView):
                     resume = Resume.objects(user_id=user_id, resume_id=resume_id).first()
                 if not resume and user_id:
                     resume = Resume.objects(user_id=user_id).order_by('-parsed_at').first()
-                text = getattr(resume, 'raw_text', None) or getattr(resume, 'text', None)
+                # Processed resumes already carry their skills; no need to re-extract
+                precomputed = resume.precomputed_skills() if resume else None
+                if precomputed is not None:
+                    return Response({
+                        "skills": resume.parsed_content.skills_extracted,
+                        "skill_ids": sorted(precomputed[0]),
+                    })
+                text = resume.get_text() if resume else None
             except Exception:
                 text = None
         if not text:
             return Response({"skills": [], "detail": "No resume text provided"}, status=400)
 
-        # Try OpenAI extraction first if configured
-        api_key = os.getenv('OPENAI_API_KEY') or os.getenv('OPENAI_APIKEY')
-        if _openai_available and api_key:
-            try:
-                client = OpenAI(api_key=api_key)
-                completion = client.chat.completions.create(
-                    model=os.getenv('OPENAI_MODEL', 'gpt-4o-mini'),
-                    messages=[
-                        {"role": "system", "content": "Extract a de-duplicated list of professional skills, technologies, frameworks, and tools from the resume text. Return ONLY JSON array of strings. No explanations."},
-                        {"role": "user", "content": text},
-                    ],
-                    response_format={
-                        "type": "json_schema",
-                        "json_schema": {
-                            "name": "skills_schema",
-                            "schema": {
-                                "type": "array",
-                                "items": {"type": "string"}
-                            }
-                        }
-                    },
-                    temperature=0.0
-                )
-                content = completion.choices[0].message.content or "[]"
-                data = json.loads(content)
-                if isinstance(data, list):
-                    # Normalize skills
-                    skills = sorted({str(s).strip() for s in data if str(s).strip()})
-                    return Response({"skills": skills})
-            except Exception:
-                # Fallback to keyword-based extraction
-                pass
+        # Try LLM extraction first if configured (responses are cached per text/model/schema)
+        try:
+            data = complete_json(
+                [
+                    {"role": "system", "content": "Extract a de-duplicated list of professional skills, technologies, frameworks, and tools from the resume text. Return ONLY JSON array of strings. No explanations."},
+                    {"role": "user", "content": text},
+                ],
+                {"type": "array", "items": {"type": "string"}},
+                schema_name="skills_schema",
+                temperature=0.0,
+            )
+            if isinstance(data, list):
+                # Canonicalize synonyms through the taxonomy; keep unknown skills verbatim
+                taxonomy = get_taxonomy()
+                raw = [str(s).strip() for s in data if str(s).strip()]
+                skill_ids = taxonomy.resolve_many(raw)
+                unknown = {s for s in raw if taxonomy.resolve(s) is None}
+                skills = sorted(set(taxonomy.names(skill_ids)) | unknown)
+                return Response({"skills": skills, "skill_ids": sorted(skill_ids)})
+        except Exception:
+            # Fallback to keyword-based extraction
+            pass
 
-        lower = text.lower()
-        found = sorted({kw for kw in self.SKILL_KEYWORDS if kw in lower})
-        return Response({"skills": found})
+        taxonomy = get_taxonomy()
+        skill_ids = taxonomy.extract(text)
+        return Response({"skills": taxonomy.names(skill_ids), "skill_ids": sorted(skill_ids)})
 
 
 class ParseResumeView(APIView):
@@ -108,83 +86,10 @@ class ParseResumeView(APIView):
         if not text:
             return Response({"detail": "No resume text provided"}, status=400)
 
-        if not _openai_available:
-            return Response({"detail": "OpenAI client not available on server"}, status=500)
-
-        api_key = os.getenv('OPENAI_API_KEY') or os.getenv('OPENAI_APIKEY')
-        if not api_key:
-            return Response({"detail": "OPENAI_API_KEY not configured"}, status=500)
-
-        client = OpenAI(api_key=api_key)
-
-        schema: Dict[str, Any] = {
-            "type": "object",
-            "properties": {
-                "summary": {"type": "string"},
-                "skills": {
-                    "type": "array",
-                    "items": {"type": "string"}
-                },
-                "experience": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "company": {"type": "string"},
-                            "title": {"type": "string"},
-                            "location": {"type": "string"},
-                            "start_date": {"type": "string"},
-                            "end_date": {"type": "string"},
-                            "bullets": {"type": "array", "items": {"type": "string"}}
-                        },
-                        "required": ["company", "title"]
-                    }
-                },
-                "education": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "institution": {"type": "string"},
-                            "degree": {"type": "string"},
-                            "field": {"type": "string"},
-                            "start_date": {"type": "string"},
-                            "end_date": {"type": "string"}
-                        },
-                        "required": ["institution"]
-                    }
-                }
-            },
-            "required": ["skills", "experience"]
-        }
-
-        prompt = (
-            "You are a resume parser. Extract structured JSON from the provided resume text. "
-            "Return ONLY JSON matching the provided JSON schema. "
-            "Include a concise professional summary if apparent, an array of normalized skills, "
-            "experience items (company, title, dates, bullets), and education entries."
-        )
-
         try:
-            # Using Chat Completions with JSON schema (OpenAI Python SDK v1+)
-            completion = client.chat.completions.create(
-                model=os.getenv('OPENAI_MODEL', 'gpt-4o-mini'),
-                messages=[
-                    {"role": "system", "content": prompt},
-                    {"role": "user", "content": text},
-                ],
-                response_format={
-                    "type": "json_schema",
-                    "json_schema": {
-                        "name": "resume_schema",
-                        "schema": schema
-                    }
-                },
-                temperature=0.2
-            )
-
-            content = completion.choices[0].message.content or "{}"
-            data = json.loads(content)
+            data = parse_resume_text(text)
+        except LLMNotConfigured as e:
+            return Response({"detail": str(e)}, status=500)
         except Exception as e:
             return Response({"detail": f"LLM parsing failed: {str(e)}"}, status=500)
 
@@ -210,7 +115,7 @@ class ResumeTextCreateView(APIView):
                 title=title,
                 raw_text=text,
                 file_type='txt',
-                parsed_at=datetime.utcnow(),
+                processing_status='pending',
             )
             # Set primary if none exists
             try:
@@ -220,7 +125,12 @@ class ResumeTextCreateView(APIView):
             except Exception:
                 pass
             r.save()
-            return Response(r.to_dict(), status=201)
+            # Structuring (LLM parse, skills) runs on the worker pool like uploads
+            enqueue(r.resume_id)
+            return Response({
+                'resume': r.to_dict(),
+                'status_url': f'/api/resumes/{r.resume_id}/status/',
+            }, status=202)
         except Exception as e:
             return Response({"detail": f"Failed to save resume: {str(e)}"}, status=500)
 
@@ -234,18 +144,7 @@ class ResumeListView(APIView):
             if not user_id:
                 return Response([], status=200)
             qs = Resume.objects(user_id=user_id).order_by('-created_at')
-            items = []
-            for r in qs:
-                items.append({
-                    'resume_id': r.resume_id,
-                    'title': r.title,
-                    'is_primary': r.is_primary,
-                    'created_at': r.created_at.isoformat() if r.created_at else None,
-                    'parsed_at': r.parsed_at.isoformat() if r.parsed_at else None,
-                    'file_type': r.file_type,
-                    'file_size': r.file_size,
-                })
-            return Response(items)
+            return Response(RESUME_LIST_PROJECTION.rows(RESUME_LIST_PROJECTION.fetch(qs)))
         except Exception:
             return Response([], status=200)
 
@@ -265,33 +164,25 @@ class ResumeUploadView(APIView):
         if ext not in ('pdf', 'docx'):
             return Response({'detail': 'Unsupported file type. Please upload a PDF or DOCX.'}, status=400)
 
+        blob = saved = None
         try:
             user_id = request.user.get('user_id') if hasattr(request.user, 'get') else None
             if not user_id:
                 return Response({'detail': 'Invalid user'}, status=401)
 
-            # Save file to media
-            base_dir = os.path.join(settings.MEDIA_ROOT, 'resumes', user_id)
-            os.makedirs(base_dir, exist_ok=True)
-            safe_name = name.replace('/', '_').replace('\\', '_')
-            target_path = os.path.join(base_dir, safe_name)
-            with open(target_path, 'wb') as f:
-                for chunk in file.chunks():
-                    f.write(chunk)
+            # Save file to the content-addressed store (one blob per SHA-256)
+            blob = save_upload(file, ext)
 
-            # Extract text
-            text = extract_text_from_file(target_path, ext)
-
-            # Create resume document
+            # Create resume document; extraction happens on the worker pool
             r = Resume(
                 user_id=user_id,
                 title=title,
                 original_filename=name,
-                file_path=target_path,
-                file_size=getattr(file, 'size', None),
+                file_path=blob.path,
+                file_size=blob.size,
                 file_type=ext,
-                raw_text=text,
-                parsed_at=datetime.utcnow()
+                content_hash=blob.sha256,
+                processing_status='pending',
             )
             # Set primary if none exists
             try:
@@ -300,11 +191,107 @@ class ResumeUploadView(APIView):
                     r.is_primary = True
             except Exception:
                 pass
+
+            status_url = f'/api/resumes/{r.resume_id}/status/'
+
+            # Identical bytes were extracted before: reuse the memoized results
+            if apply_memoized(r, blob):
+                complete(r)
+                saved = True
+                return Response({
+                    'resume': r.to_dict(),
+                    'status_url': status_url,
+                    'text': r.raw_text or '',
+                }, status=201)
+
             r.save()
+            saved = True
+            enqueue(r.resume_id)
 
             return Response({
                 'resume': r.to_dict(),
-                'text': text,
-            }, status=201)
+                'status_url': status_url,
+            }, status=202)
         except Exception as e:
+            # The blob reference belongs to the resume only once the resume is stored
+            if blob is not None and not saved:
+                release_blob(blob.sha256)
             return Response({'detail': f'Upload failed: {str(e)}'}, status=500)
+
+
+class ResumeStatusView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, resume_id):
+        user_id = request.user.get('user_id') if hasattr(request.user, 'get') else None
+        if not user_id:
+            return Response({'detail': 'Invalid user'}, status=401)
+
+        r = Resume.objects(user_id=user_id, resume_id=resume_id).only(
+            'resume_id', 'processing_status', 'processing_error', 'parsed_at', 'raw_text', 'text_delta',
+            'delta_base_id', 'parsed_content'
+        ).first()
+        if not r:
+            return Response({'detail': 'Resume not found'}, status=404)
+
+        data = {
+            'resume_id': r.resume_id,
+            'processing_status': r.processing_status,
+            'processing_error': r.processing_error,
+            'parsed_at': r.parsed_at.isoformat() if r.parsed_at else None,
+        }
+        if r.processing_status == 'completed':
+            data['text'] = r.get_text()
+            data['skills'] = r.parsed_content.skills_extracted if r.parsed_content else []
+        return Response(data)
+
+
+class ResumeVersionsView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, resume_id):
+        user_id = request.user.get('user_id') if hasattr(request.user, 'get') else None
+        if not user_id:
+            return Response({'detail': 'Invalid user'}, status=401)
+
+        versions = Resume.objects(user_id=user_id, parent_resume_id=resume_id).only(
+            'resume_id', 'title', 'version', 'processing_status', 'created_at', 'text_delta', 'delta_depth'
+        ).order_by('version')
+        return Response([
+            {
+                'resume_id': v.resume_id,
+                'title': v.title,
+                'version': v.version,
+                'processing_status': v.processing_status,
+                'created_at': v.created_at.isoformat() if v.created_at else None,
+                'stored_as_delta': v.text_delta is not None,
+                'delta_bytes': len(v.text_delta) if v.text_delta is not None else None,
+                'delta_depth': v.delta_depth,
+            } for v in versions
+        ])
+
+    def post(self, request, resume_id):
+        text = request.data.get('text')
+        if not text:
+            return Response({'detail': 'No resume text provided'}, status=400)
+
+        user_id = request.user.get('user_id') if hasattr(request.user, 'get') else None
+        if not user_id:
+            return Response({'detail': 'Invalid user'}, status=401)
+
+        parent = Resume.objects(user_id=user_id, resume_id=resume_id).first()
+        if not parent:
+            return Response({'detail': 'Resume not found'}, status=404)
+
+        try:
+            r = create_version(parent, text, title=request.data.get('title'))
+        except ResumeVersionError as e:
+            return Response({'detail': str(e)}, status=409)
+        except Exception as e:
+            return Response({'detail': f'Failed to save resume version: {str(e)}'}, status=500)
+
+        enqueue(r.resume_id)
+        return Response({
+            'resume': r.to_dict(),
+            'status_url': f'/api/resumes/{r.resume_id}/status/',
+        }, status=202)
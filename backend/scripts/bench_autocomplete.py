@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""
+Benchmark autocomplete latency against the 5 ms budget.
+
+Builds a ``JobAutocomplete`` in memory from synthetic jobs (titles, companies
+and taxonomy skills), deactivates a share of them, then times ``complete``
+for random prefixes of every length across all kinds. Reports p50, p95, p99
+and max per prefix length, checks that deactivated-only titles and companies
+are never suggested, and exits non-zero if p99 is over the budget.
+No database connection is needed.
+
+Usage: python scripts/bench_autocomplete.py [--jobs 200000] [--queries 20000] [--budget-ms 5]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+import django
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ajat_backend.settings')
+django.setup()
+
+from core.taxonomy import get_taxonomy
+from jobs.autocomplete import KINDS, JobAutocomplete, normalize_term
+
+SENIORITY = ['', 'Junior', 'Senior', 'Staff', 'Principal', 'Lead', 'Head of', 'Intern']
+ROLES = ['Software Engineer', 'Data Scientist', 'Product Manager', 'Designer', 'Data Engineer', 'Analyst',
+         'DevOps Engineer', 'Frontend Developer', 'Backend Developer', 'QA Engineer', 'Sales Manager',
+         'Account Executive', 'Support Specialist', 'Recruiter', 'Accountant', 'Nurse', 'Teacher']
+SPECIALTIES = ['', 'Platform', 'Payments', 'Growth', 'Machine Learning', 'Mobile', 'Security', 'Infrastructure',
+               'Search', 'Healthcare', 'Fintech', 'Analytics', 'Cloud']
+SYLLABLES = ['ac', 'me', 'zen', 'lo', 'tri', 'vo', 'nex', 'ar', 'is', 'tel', 'on', 'qu', 'bit', 'ra', 'so', 'fy']
+
+
+def synthetic_jobs(n, rng):
+    skill_ids = [entry.id for entry in get_taxonomy().entries()]
+    companies = [
+        ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title() + rng.choice(['', ' Labs', ' Inc'])
+        for _ in range(max(1, n // 20))
+    ]
+    for i in range(n):
+        title = ' '.join(part for part in (
+            rng.choice(SENIORITY), rng.choice(SPECIALTIES), rng.choice(ROLES),
+        ) if part)
+        if rng.random() < 0.3:
+            title += f' {rng.randint(1, 5000)}'  # long tail of one-off titles
+        yield {
+            '_id': f'job-{i}',
+            'title': title,
+            'company': {'name': rng.choice(companies)},
+            'requirements': {'required_skill_ids': rng.sample(skill_ids, min(len(skill_ids), rng.randint(2, 8)))},
+            'is_active': True,
+        }
+
+
+def percentile(values, q):
+    return sorted(values)[min(len(values) - 1, int(q * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--jobs', type=int, default=200000)
+    parser.add_argument('--queries', type=int, default=20000)
+    parser.add_argument('--deactivate', type=float, default=0.2, help='Share of jobs deactivated after the build')
+    parser.add_argument('--budget-ms', type=float, default=5.0)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    autocomplete = JobAutocomplete(refresh_interval=0)
+    started = time.perf_counter()
+    for entry in get_taxonomy().entries():
+        autocomplete.indexes['skill'].add(entry.name, 0)
+    jobs = list(synthetic_jobs(args.jobs, rng))
+    for raw in jobs:
+        autocomplete.apply(raw)
+    for index in autocomplete.indexes.values():
+        index.rank()
+    print(f"built from {len(jobs):,} jobs in {time.perf_counter() - started:.2f}s "
+          f"({', '.join(f'{kind}: {len(index):,}' for kind, index in autocomplete.indexes.items())})")
+
+    # Deactivate a share of the jobs through the same path the change feed uses
+    retired = rng.sample(jobs, int(len(jobs) * args.deactivate))
+    for raw in retired:
+        autocomplete.apply({'_id': raw['_id'], 'is_active': False})
+    for index in autocomplete.indexes.values():
+        index.rank()
+    live = {kind: set() for kind in ('title', 'company')}
+    for raw in jobs:
+        if autocomplete._seen.get(raw['_id']):
+            live['title'].add(normalize_term(raw['title']))
+            live['company'].add(normalize_term(raw['company']['name']))
+
+    vocab = [term for kind in KINDS for term in autocomplete.indexes[kind]._terms]
+    timings = {}
+    stale = 0
+    for _ in range(args.queries):
+        term = rng.choice(vocab)
+        words = normalize_term(term).split(' ')
+        word = rng.choice(words)
+        prefix = word[:rng.randint(1, max(1, len(word)))]
+        began = time.perf_counter()
+        result = autocomplete.complete(prefix, KINDS, 8)
+        timings.setdefault(min(len(prefix), 6), []).append((time.perf_counter() - began) * 1000)
+        for kind in ('title', 'company'):
+            stale += sum(1 for row in result[kind] if normalize_term(row['value']) not in live[kind])
+
+    all_timings = [t for values in timings.values() for t in values]
+    print(f"{'prefix':>8} {'queries':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for length in sorted(timings):
+        values = timings[length]
+        label = f"{length}+" if length == 6 else str(length)
+        print(f"{label:>8} {len(values):>8} {statistics.median(values):>8.3f} {percentile(values, 0.95):>8.3f} "
+              f"{percentile(values, 0.99):>8.3f} {max(values):>8.3f}")
+    p99 = percentile(all_timings, 0.99)
+    print(f"{'all':>8} {len(all_timings):>8} {statistics.median(all_timings):>8.3f} "
+          f"{percentile(all_timings, 0.95):>8.3f} {p99:>8.3f} {max(all_timings):>8.3f}")
+    print(f"suggestions for titles/companies no active job carries: {stale}")
+
+    if stale or p99 > args.budget_ms:
+        print(f"FAIL: p99 {p99:.3f} ms (budget {args.budget_ms} ms), {stale} stale suggestion(s)")
+        sys.exit(1)
+    print(f"OK: p99 {p99:.3f} ms within {args.budget_ms} ms")
+
+
+if __name__ == '__main__':
+    main()
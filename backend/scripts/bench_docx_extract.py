@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""
+Benchmark the streaming DOCX extractor against the python-docx object model.
+
+Generates synthetic resumes of increasing size and reports wall time and
+peak Python memory (tracemalloc) for both paths.
+
+Usage: python scripts/bench_docx_extract.py [--paragraphs 1000 10000 50000] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from xml.sax.saxutils import escape
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resumes.utils import iter_docx_text
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+
+def _paragraph(text):
+    return f'<w:p><w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+
+
+def build_docx(path, paragraphs, table_every=50, table_rows=10):
+    """Write a synthetic .docx with ``paragraphs`` paragraphs and a small table every ``table_every``"""
+    body = []
+    for i in range(paragraphs):
+        body.append(_paragraph(
+            f"Senior engineer {i}: built Python, Django and React services on AWS with Kubernetes and PostgreSQL."
+        ))
+        if table_every and i % table_every == table_every - 1:
+            rows = ''.join(
+                '<w:tr>' + ''.join(f'<w:tc>{_paragraph(f"cell {r}.{c}")}</w:tc>' for c in range(4)) + '</w:tr>'
+                for r in range(table_rows)
+            )
+            body.append(f'<w:tbl>{rows}</w:tbl>')
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{"".join(body)}</w:body></w:document>'
+    )
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', CONTENT_TYPES)
+        archive.writestr('_rels/.rels', RELS)
+        archive.writestr('word/document.xml', document)
+
+
+def extract_streaming(path):
+    return "\n".join(iter_docx_text(path))
+
+
+def extract_python_docx(path):
+    """The previous extractor: full python-docx object model"""
+    from docx import Document
+    doc = Document(path)
+    parts = [p.text for p in doc.paragraphs if p.text]
+    for table in doc.tables:
+        for row in table.rows:
+            row_text = "\t".join(cell.text.strip() for cell in row.cells)
+            if row_text:
+                parts.append(row_text)
+    return "\n".join(parts)
+
+
+def measure(fn, path, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(path)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    text = fn(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, len(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--paragraphs', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    try:
+        import docx  # noqa: F401
+        candidates = [('streaming', extract_streaming), ('python-docx', extract_python_docx)]
+    except ImportError:
+        print("python-docx not installed; benchmarking the streaming extractor only")
+        candidates = [('streaming', extract_streaming)]
+
+    print(f"{'paragraphs':>10} {'file KB':>8} {'extractor':>12} {'best ms':>9} {'peak MB':>8} {'chars':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in args.paragraphs:
+            path = os.path.join(tmp, f'resume_{count}.docx')
+            build_docx(path, count)
+            size_kb = os.path.getsize(path) // 1024
+            for name, fn in candidates:
+                best, peak, chars = measure(fn, path, args.repeat)
+                print(f"{count:>10} {size_kb:>8} {name:>12} {best * 1000:>9.1f} {peak / 1e6:>8.1f} {chars:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Benchmark resume version storage: full copies vs. line deltas.
+
+Builds a synthetic resume, derives a chain of tailored versions (a few
+bullets edited per version) and reports stored bytes per version plus
+reconstruction latency by chain depth, cold (replaying every delta) and
+with the per-version text cache warm.
+
+Usage: python scripts/bench_resume_versions.py [--bullets 60] [--versions 30] [--edits 3] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resumes.deltas import apply_delta, compressed_size, make_delta
+
+SKILLS = ['Python', 'Django', 'React', 'AWS', 'Kubernetes', 'PostgreSQL', 'Go', 'Terraform', 'Kafka', 'Redis']
+
+
+def build_resume(bullets, rng):
+    lines = ["Jane Doe", "Senior Software Engineer", "", "SUMMARY",
+             "Engineer with ten years of experience building data-heavy web platforms.", "", "EXPERIENCE"]
+    for i in range(bullets):
+        if i % 10 == 0:
+            lines += ["", f"Company {i // 10} - Engineer (2015 - 2020)"]
+        lines.append(f"- Built {rng.choice(SKILLS)} services handling {rng.randint(1, 900)}k requests per day "
+                     f"and cut latency by {rng.randint(5, 60)}% for team {i}.")
+    lines += ["", "EDUCATION", "BSc Computer Science, State University (2011 - 2015)", "",
+              "SKILLS", ", ".join(SKILLS)]
+    return "\n".join(lines) + "\n"
+
+
+def tailor(text, edits, rng):
+    lines = text.splitlines(keepends=True)
+    bullet_idx = [i for i, line in enumerate(lines) if line.startswith('- ')]
+    for i in rng.sample(bullet_idx, min(edits, len(bullet_idx))):
+        lines[i] = f"- Led {rng.choice(SKILLS)} migration for a {rng.randint(2, 40)}-person org.\n"
+    return ''.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--bullets', type=int, default=60)
+    parser.add_argument('--versions', type=int, default=30)
+    parser.add_argument('--edits', type=int, default=3, help='bullets rewritten per version')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    texts = [build_resume(args.bullets, rng)]
+    for _ in range(args.versions):
+        texts.append(tailor(texts[-1], args.edits, rng))
+    deltas = [make_delta(texts[i - 1], texts[i]) for i in range(1, len(texts))]
+
+    full = sum(len(t.encode('utf-8')) for t in texts[1:])
+    packed = sum(compressed_size(t) for t in texts[1:])
+    stored = sum(len(d) for d in deltas)
+    print(f"resume: {len(texts[0])} chars, {args.versions} versions, {args.edits} edited bullets each")
+    print(f"{'full copies':>16}: {full:>9} bytes")
+    print(f"{'compressed full':>16}: {packed:>9} bytes")
+    print(f"{'deltas':>16}: {stored:>9} bytes ({stored / full:.1%} of full, {stored // len(deltas)} per version)")
+
+    def reconstruct(depth):
+        text = texts[0]
+        for delta in deltas[:depth]:
+            text = apply_delta(text, delta)
+        return text
+
+    cache = {depth: reconstruct(depth) for depth in range(len(deltas) + 1)}
+    print(f"\n{'depth':>6} {'cold ms':>9} {'warm ms':>9}")
+    for depth in sorted({1, 2, 5, 10, len(deltas)} & set(range(1, len(deltas) + 1))):
+        assert reconstruct(depth) == texts[depth]
+        best = min(_timed(reconstruct, depth) for _ in range(args.repeat))
+        # Warm: the parent's text is cached, so only this version's delta is applied
+        warm = min(_timed(apply_delta, cache[depth - 1], deltas[depth - 1]) for _ in range(args.repeat))
+        print(f"{depth:>6} {best * 1000:>9.3f} {warm * 1000:>9.3f}")
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - started
+
+
+if __name__ == '__main__':
+    main()
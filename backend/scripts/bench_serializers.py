@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+"""
+Microbenchmark per-document serialization cost for each model.
+
+For a fully populated Job, Resume, Application and User it reports:
+  * attribute walk - the previous hand-written style (descriptor access and
+    isoformat per field), driven by the same schema
+  * compiled       - the CompiledSerializer ``to_dict``
+  * stdlib json    - encoding the dict with DRF's JSONRenderer
+  * orjson         - encoding the dict with core.renderers.ORJSONRenderer
+No database connection is needed; documents are built in memory.
+
+Usage: python scripts/bench_serializers.py [--number 2000] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+import django
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ajat_backend.settings')
+django.setup()
+
+from mongoengine import fields
+from rest_framework.renderers import JSONRenderer
+
+from applications.models import (
+    Application, ApplicationDocument, ApplicationTimeline, InterviewRound, OfferDetails,
+)
+from core.renderers import ORJSONRenderer
+from jobs.models import CompanyInfo, Job, JobBenefits, JobRequirements, SalaryInfo
+from resumes.models import Education, ExtractionMetadata, ParsedContent, Project, Resume, Skill, WorkExperience
+from users.models import User, UserProfile, UserSettings
+
+NOW = datetime(2024, 5, 1, 12, 30)
+SKILLS = ['Python', 'Django', 'React', 'AWS', 'Kubernetes', 'PostgreSQL', 'Go', 'Terraform']
+
+
+def sample_job():
+    return Job(
+        title='Senior Backend Engineer', description='Build APIs. ' * 200, location='Austin, TX',
+        city='Austin', state='TX', source='LinkedIn', source_url='https://example.com/jobs/1',
+        company=CompanyInfo(name='Acme', industry='Software', size='large', website='https://acme.example',
+                            description='We make everything.', rating=4.2),
+        requirements=JobRequirements(required_skills=SKILLS[:5], preferred_skills=SKILLS[5:],
+                                     required_skill_ids=[1, 2, 3, 4, 5], experience_years_min=5),
+        salary=SalaryInfo(min_salary=150000, max_salary=190000),
+        benefits=JobBenefits(health_insurance=True, paid_time_off=25, other_benefits=['401k match']),
+        posted_date=NOW, application_deadline=NOW + timedelta(days=30), ai_tags=['backend', 'python'],
+    )
+
+
+def sample_resume():
+    return Resume(
+        user_id='u1', title='Backend resume', original_filename='resume.pdf', file_type='pdf', file_size=120000,
+        raw_text='Experienced engineer. ' * 300,
+        work_experience=[
+            WorkExperience(company=f'Company {i}', position='Engineer', start_date=NOW - timedelta(days=400 * (i + 1)),
+                           end_date=NOW - timedelta(days=400 * i), achievements=[f'Shipped feature {j}' for j in range(5)],
+                           technologies=SKILLS[:4])
+            for i in range(6)
+        ],
+        education=[Education(institution='State University', degree='BSc', field_of_study='CS',
+                             start_date=NOW - timedelta(days=5000), end_date=NOW - timedelta(days=3600))],
+        projects=[Project(name=f'Project {i}', description='Side project', technologies=SKILLS[:3]) for i in range(3)],
+        skills=[Skill(name=name, skill_id=i + 1, category='framework') for i, name in enumerate(SKILLS)],
+        parsed_content=ParsedContent(summary='Backend engineer', skills_extracted=SKILLS, skill_ids=list(range(1, 9)),
+                                     total_experience_years=8),
+        extraction=ExtractionMetadata(page_count=2, pages_extracted=2, duration_ms=120),
+        parsed_at=NOW,
+    )
+
+
+def sample_application():
+    return Application(
+        user_id='u1', job_id='j1', status='interviewing', applied_date=NOW, application_method='linkedin',
+        recruiter_name='Sam Recruiter', recruiter_email='sam@example.com',
+        documents=[ApplicationDocument(document_type='resume', file_name='resume.pdf', uploaded_at=NOW)],
+        cover_letter_text='Dear hiring manager, ' * 100,
+        interviews=[InterviewRound(round_type='technical', scheduled_date=NOW + timedelta(days=i), duration_minutes=60)
+                    for i in range(3)],
+        offer=OfferDetails(base_salary=180000, offer_date=NOW, response_deadline=NOW + timedelta(days=7)),
+        timeline=[ApplicationTimeline(event_type='applied', description='Applied', timestamp=NOW) for _ in range(8)],
+        next_follow_up=NOW + timedelta(days=3), ai_recommendations=['Prepare system design'],
+    )
+
+
+def sample_user():
+    return User(
+        username='demo', email='demo@example.com', last_login=NOW,
+        profile=UserProfile(first_name='Demo', last_name='User', location='Austin, TX', current_title='Engineer',
+                            skills=SKILLS, skill_ids=list(range(1, 9)), preferred_locations=['Remote']),
+        settings=UserSettings(),
+    )
+
+
+def attribute_walk(obj, schema):
+    """Reference serializer in the previous hand-written style: attribute access per field"""
+    out = {}
+    for entry in schema:
+        name, sub_schema = (entry, None) if isinstance(entry, str) else entry
+        value = getattr(obj, name)
+        field = obj._fields[name]
+        if sub_schema is not None:
+            if isinstance(field, fields.ListField):
+                value = [attribute_walk(item, sub_schema) for item in value]
+            else:
+                value = attribute_walk(value, sub_schema) if value else None
+        elif isinstance(field, fields.DateTimeField):
+            value = value.isoformat() if value else None
+        elif isinstance(field, fields.ListField):
+            value = list(value) if value is not None else None
+        out[name] = value
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    stdlib, fast = JSONRenderer(), ORJSONRenderer()
+
+    def per_doc_us(fn):
+        return min(timeit.repeat(fn, number=args.number, repeat=args.repeat)) / args.number * 1e6
+
+    print(f"{'model':>12} {'attr walk us':>13} {'compiled us':>12} {'stdlib json us':>15} {'orjson us':>10} {'bytes':>7}")
+    for doc in (sample_job(), sample_resume(), sample_application(), sample_user()):
+        model = type(doc)
+        schema = model.__dict__['to_dict'].schema
+        data = doc.to_dict()
+        assert data == attribute_walk(doc, schema), f"{model.__name__}: compiled output differs"
+        assert stdlib.render(data) and fast.render(data)
+        print(
+            f"{model.__name__:>12} "
+            f"{per_doc_us(lambda: attribute_walk(doc, schema)):>13.1f} "
+            f"{per_doc_us(doc.to_dict):>12.1f} "
+            f"{per_doc_us(lambda: stdlib.render(data)):>15.1f} "
+            f"{per_doc_us(lambda: fast.render(data)):>10.1f} "
+            f"{len(fast.render(data)):>7}"
+        )
+
+
+if __name__ == '__main__':
+    main()
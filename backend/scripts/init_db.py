@@ -265,7 +265,7 @@ def create_indexes():
         Job.create_index([('company.name', 1)])
         Job.create_index([('location', 1)])
         Job.create_index([('posted_date', -1)])
-        Job.create_index([('is_active', 1)])
+        Job.create_index([('is_active', 1), ('updated_at', 1)])
         
         # Application indexes
         Application.create_index([('user_id', 1)])
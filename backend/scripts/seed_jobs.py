@@ -1,16 +1,26 @@
-# Simple CSV loader for jobs (run with: python manage.py shell < scripts/seed_jobs.py)
-import csvfrom jobs.models 
-import Job
+#!/usr/bin/env python
+"""
+Seed jobs from a CSV/JSONL feed.
+
+Thin wrapper around ``manage.py ingest_jobs`` (see that command for the
+accepted columns and options).
+
+Usage: python scripts/seed_jobs.py jobs.csv [--source mysource]
+       python scripts/seed_jobs.py - < jobs.csv
+"""
+
+import os
 import sys
-reader = csv.DictReader(sys.stdin)
-for row in reader:
-    Job.objects.create(
-        title=row.get("title",""),
-        company=row.get("company",""),
-        location=row.get("location",""),
-        source=row.get("source",""),
-        url=row.get("url",""),
-        posted_at=row.get("posted_at") or None,
-        description_text=row.get("description_text",""),
-    )
-print("Seeded jobs")
+
+import django
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ajat_backend.settings')
+django.setup()
+
+from django.core.management import call_command
+
+
+if __name__ == '__main__':
+    call_command('ingest_jobs', *(sys.argv[1:] or ['-']))
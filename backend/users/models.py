@@ -1,6 +1,8 @@
 from mongoengine import Document, EmbeddedDocument, fields
 from django.contrib.auth.hashers import make_password, check_password
 from datetime import datetime
+from core.taxonomy import get_taxonomy
+from core.serialization import CompiledSerializer
 import uuid
 
 
@@ -30,6 +32,7 @@ class UserProfile(EmbeddedDocument):
         default='entry'
     )
     skills = fields.ListField(fields.StringField(max_length=50))
+    skill_ids = fields.ListField(fields.IntField())  # Canonical taxonomy ids for skills
     industries = fields.ListField(fields.StringField(max_length=50))
     
     # Preferences
@@ -91,7 +94,7 @@ class User(Document):
             'username',
             'email',
             'created_at',
-            ('profile.skills', 'profile.experience_level'),
+            ('profile.skill_ids', 'profile.experience_level'),
         ]
     }
     
@@ -104,49 +107,22 @@ class User(Document):
         return check_password(raw_password, self.password_hash)
     
     def save(self, *args, **kwargs):
-        """Override save to update timestamp"""
+        """Override save to update timestamp and canonical skill ids"""
         self.updated_at = datetime.utcnow()
+        if self.profile:
+            self.profile.skill_ids = get_taxonomy().resolve_many(self.profile.skills)
         return super().save(*args, **kwargs)
     
-    def to_dict(self):
-        """Convert to dictionary for API responses"""
-        return {
-            'user_id': self.user_id,
-            'username': self.username,
-            'email': self.email,
-            'is_active': self.is_active,
-            'is_verified': self.is_verified,
-            'is_premium': self.is_premium,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'last_login': self.last_login.isoformat() if self.last_login else None,
-            'profile': {
-                'first_name': self.profile.first_name,
-                'last_name': self.profile.last_name,
-                'phone': self.profile.phone,
-                'location': self.profile.location,
-                'linkedin_url': self.profile.linkedin_url,
-                'github_url': self.profile.github_url,
-                'portfolio_url': self.profile.portfolio_url,
-                'bio': self.profile.bio,
-                'avatar': self.profile.avatar,
-                'current_title': self.profile.current_title,
-                'experience_level': self.profile.experience_level,
-                'skills': self.profile.skills,
-                'industries': self.profile.industries,
-                'desired_salary_min': self.profile.desired_salary_min,
-                'desired_salary_max': self.profile.desired_salary_max,
-                'preferred_locations': self.profile.preferred_locations,
-                'remote_preference': self.profile.remote_preference,
-            },
-            'settings': {
-                'email_notifications': self.settings.email_notifications,
-                'push_notifications': self.settings.push_notifications,
-                'weekly_digest': self.settings.weekly_digest,
-                'job_alerts': self.settings.job_alerts,
-                'theme': self.settings.theme,
-                'timezone': self.settings.timezone,
-            }
-        }
+    # API representation (compiled from this schema on first use)
+    to_dict = CompiledSerializer([
+        'user_id', 'username', 'email', 'is_active', 'is_verified', 'is_premium', 'created_at', 'last_login',
+        ('profile', [
+            'first_name', 'last_name', 'phone', 'location', 'linkedin_url', 'github_url', 'portfolio_url',
+            'bio', 'avatar', 'current_title', 'experience_level', 'skills', 'skill_ids', 'industries',
+            'desired_salary_min', 'desired_salary_max', 'preferred_locations', 'remote_preference',
+        ]),
+        ('settings', ['email_notifications', 'push_notifications', 'weekly_digest', 'job_alerts', 'theme', 'timezone']),
+    ])
     
     def __str__(self):
         return f"{self.username} ({self.email})"
\ No newline at end of file
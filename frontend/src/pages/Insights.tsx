@@ -1,5 +1,6 @@
 import React, { useEffect, useMemo, useState } from 'react';
 import toast from 'react-hot-toast';
+import { fetchAllPages } from '../utils/helpers';
 import { Bar, BarChart, CartesianGrid, Legend, Line, LineChart, ResponsiveContainer, Tooltip, XAxis, YAxis } from 'recharts';
 
 type Gap = { job_id: string; missing_keywords: string[]; coverage: number };
@@ -16,11 +17,9 @@ export default function Insights() {
     (async function loadApps(){
       setAppsLoading(true);
       try{
-        const res = await fetch('/api/applications/', { headers:{ 'Authorization':'Bearer '+localStorage.getItem('access') } })
-        if(!res.ok) throw new Error('Failed to load applications')
-        const data = await res.json()
-        setApps(data || [])
-      }catch(err:any){ toast.error(err.message || 'Error loading applications') }
+        const rows = await fetchAllPages<Application>('/api/applications/?page_size=100', { headers:{ 'Authorization':'Bearer '+localStorage.getItem('access') } })
+        setApps(rows)
+      }catch(err:any){ toast.error(err.message ? `Failed to load applications: ${err.message}` : 'Error loading applications') }
       finally{ setAppsLoading(false) }
     })();
   }, []);
@@ -97,6 +97,21 @@ export default function Resumes() {
     if (saved) await refreshRecommendations();
   }
 
+  async function waitForProcessing(statusUrl: string): Promise<string>{
+    // Uploads are processed in the background; poll until extraction finishes
+    for (let attempt = 0; attempt < 60; attempt++){
+      const res = await fetch(statusUrl, {
+        headers: { 'Authorization': 'Bearer ' + localStorage.getItem('access') },
+      });
+      if (!res.ok) throw new Error('Failed to check resume status');
+      const data = await res.json();
+      if (data.processing_status === 'completed') return data.text || '';
+      if (data.processing_status === 'failed') throw new Error(data.processing_error || 'Resume processing failed');
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+    }
+    throw new Error('Resume processing is taking longer than expected');
+  }
+
   async function uploadFile(file: File){
     const name = file.name || ''
     const ext = name.split('.').pop()?.toLowerCase()
@@ -117,7 +132,10 @@ export default function Resumes() {
         throw new Error(t || 'Upload failed');
       }
       const data = await res.json();
-      const txt = data.text || '';
+      // Re-uploads of an already extracted file complete immediately
+      const txt = data.resume?.processing_status === 'completed'
+        ? (data.text || '')
+        : await waitForProcessing(data.status_url);
       setText(txt);
       toast.success('Resume uploaded and text extracted');
       await tryAiParse(txt);
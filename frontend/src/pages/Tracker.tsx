@@ -1,6 +1,7 @@
 import { useEffect, useMemo, useState } from 'react'
 import { ResponsiveContainer, BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, Cell } from 'recharts'
 import toast from 'react-hot-toast'
+import { fetchAllPages } from '../utils/helpers'
 
 type Application = { id: number|string; job?: number|string; job_id?: string; title?: string; company?: string; status: string; notes?: string }
 
@@ -20,11 +21,9 @@ export default function Tracker(){
 
   async function load(){
     try{
-      const res = await fetch('/api/applications/', { headers:{'Authorization': 'Bearer '+localStorage.getItem('access')} })
-      if(!res.ok) throw new Error('Failed to load applications')
-      const data = await res.json()
-      setApps(data || [])
-    }catch(err:any){ toast.error(err.message || 'Error loading applications') }
+      const rows = await fetchAllPages<Application>('/api/applications/?page_size=100', { headers:{'Authorization': 'Bearer '+localStorage.getItem('access')} })
+      setApps(rows)
+    }catch(err:any){ toast.error(err.message ? `Failed to load applications: ${err.message}` : 'Error loading applications') }
   }
   useEffect(()=>{ load() }, [])
 
@@ -109,6 +109,9 @@ export const jobsAPI = {
 
   searchJobs: (query: string) => api.get(`/jobs/search/?q=${query}`),
 
+  autocomplete: (q: string, kind?: 'title' | 'company' | 'skill', limit?: number) =>
+    api.get('/jobs/autocomplete/', { params: { q, kind, limit } }),
+
   getRecommendations: (userId: string) =>
     api.get(`/recommendations/user/${userId}/`),
 };
@@ -269,4 +269,23 @@ export const parseQueryString = (queryString: string): Record<string, string> =>
   });
   
   return result;
-};
\ No newline at end of file
+};
+// Pagination utilities
+// Fetches every row of a cursor-paginated list endpoint by following `next` until it is null.
+// `next` is an absolute URL built by the backend; only its path and query are reused, so requests
+// keep going through the same origin (and dev proxy) as the first one.
+export const fetchAllPages = async <T>(path: string, init?: RequestInit): Promise<T[]> => {
+  const rows: T[] = [];
+  let url: string | null = path;
+  while (url) {
+    const res: Response = await fetch(url, init);
+    if (!res.ok) throw new Error(`Request failed (${res.status})`);
+    const data = await res.json();
+    if (Array.isArray(data)) return rows.concat(data);
+    rows.push(...(data.results || []));
+    if (!data.next) break;
+    const next = new URL(data.next, window.location.origin);
+    url = next.pathname + next.search;
+  }
+  return rows;
+};